@@ -0,0 +1,93 @@
+"""
+Microbenchmark of the per-format result kernels in src/multi_sim.py against the
+previous path, which cast draws to int, wrote int32 DNF sentinels and fully sorted
+every simulated round.
+
+Run from the repository root with `python bench/bench_kernels.py`.
+"""
+
+import os
+import sys
+from argparse import ArgumentParser
+from timeit import repeat
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "src"))
+
+from multi_sim import format_kernels  # noqa: E402
+
+NUM_ATTEMPTS = {"a": 5, "m": 3, "b": 3}
+
+
+def sentinel_kernel(values, dnf, format):
+    """
+    The previous result computation, kept here as the benchmark baseline.
+
+    Parameters
+    ----------
+    values : numpy.ndarray
+        Attempt results, with attempts along the last axis.
+    dnf : numpy.ndarray
+        Boolean mask of the attempts that are DNFs.
+    format : str
+        The round format.
+
+    Returns
+    -------
+    numpy.ndarray
+        The result of each round.
+    """
+    random_values = values.astype(int)
+    random_values[np.where(dnf)] = np.iinfo(np.int32).max
+
+    sorted_by_instance = np.sort(random_values, axis=-1)
+
+    if format == "a":
+        return np.mean(sorted_by_instance[..., 1:4], axis=-1)
+    elif format == "m":
+        return np.mean(sorted_by_instance, axis=-1)
+    return sorted_by_instance[..., 0]
+
+
+def main():
+    """
+    Times each kernel on a block of random attempts and prints a table.
+    """
+    parser = ArgumentParser(description="Benchmark the simulation result kernels")
+    parser.add_argument("--competitors", type=int, default=16)
+    parser.add_argument("--simulations", type=int, default=1 << 16)
+    parser.add_argument("--dnf_rate", type=float, default=0.05)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'format':<7} {'kernel':<16} {'ms':>8} {'speedup':>8}")
+
+    for format, kernel in format_kernels.items():
+        size = (NUM_ATTEMPTS[format], args.competitors, args.simulations)
+        values = np.random.gamma(50.0, 20.0, size)
+        dnf = np.random.rand(*size) < args.dnf_rate
+        values32 = values.astype(np.float32)
+
+        # The previous path drew attempts along the last axis.
+        rows = np.moveaxis(values, 0, -1).copy()
+        row_dnf = np.moveaxis(dnf, 0, -1).copy()
+
+        candidates = {
+            "sentinel+sort": lambda: sentinel_kernel(rows, row_dnf, format),
+            "kernel float64": lambda: kernel(values, dnf),
+            "kernel float32": lambda: kernel(values32, dnf),
+        }
+
+        baseline = None
+        for name, run in candidates.items():
+            seconds = min(repeat(run, number=1, repeat=args.repeat))
+            baseline = baseline or seconds
+            print(
+                f"{format:<7} {name:<16} {seconds * 1000:>8.2f} "
+                f"{baseline / seconds:>7.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,464 @@
+"""
+End-to-end benchmark of the pipeline, timing each stage on its own: converting
+the export (ETL), building the partitioned feather store, querying a field's
+results, fitting competitors and simulating, across field sizes and simulation
+counts.
+
+Runs fully offline against a synthetic export from `make_dataset.py`, generated
+on the fly unless one is given, in a temporary working directory. Loading the
+export into PostgreSQL is only timed when a database is given with `--psql`, and
+building and querying the SQLite backend with `--sqlite`. Results are written as JSON, and a previous run can be passed as a baseline to compare
+against.
+
+Run from the repository root with
+`python bench/bench_stages.py -o bench.json [--baseline old.json]`.
+"""
+
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from argparse import ArgumentParser
+from contextlib import contextmanager
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(0, os.path.join(ROOT, "db"))
+
+from csvparser import CSVParser  # noqa: E402
+from dist_sample import DistributionSamplingSimulator, fit_field  # noqa: E402
+from empirical_sample import EmpiricalSamplingSimulator, build_tables  # noqa: E402
+from formats import event_formats  # noqa: E402
+from get_results import (  # noqa: E402
+    export_feather,
+    process_competitions,
+    process_results,
+    unzip_file,
+)
+from load_sqlite import load as load_sqlite  # noqa: E402
+from make_dataset import make_export  # noqa: E402
+from sqliteconnection import SQLITE_PATH, SQLiteConnection  # noqa: E402
+
+# Record fields that are measurements rather than benchmark parameters.
+MEASURED = ("seconds", "rows", "competitors")
+
+SIMULATORS = {
+    "distribution": DistributionSamplingSimulator,
+    "empirical": EmpiricalSamplingSimulator,
+}
+
+
+@contextmanager
+def working_directory(path: str):
+    """
+    Runs the enclosed block with `path` as the working directory.
+
+    The backends use paths relative to the repository root, so the benchmark runs
+    them from a scratch directory laid out the same way.
+
+    Parameters
+    ----------
+    path : str
+        The directory to switch to.
+    """
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def time_call(function, repeat: int = 1) -> float:
+    """
+    Times a call, keeping the fastest of several runs.
+
+    Parameters
+    ----------
+    function : callable
+        The call to time, without arguments.
+    repeat : int, optional
+        Number of runs (default is 1).
+
+    Returns
+    -------
+    float
+        The fastest run, in seconds.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = perf_counter()
+        function()
+        best = min(best, perf_counter() - start)
+
+    return best
+
+
+def run_etl(zip_path: str, source: str) -> None:
+    """
+    Converts the export zip into the source files `CSVParser` reads.
+
+    Parameters
+    ----------
+    zip_path : str
+        Path to the export zip.
+    source : str
+        'csv' to extract and convert the TSV members, 'feather' to stream them into
+        feather files.
+
+    Returns
+    -------
+    None
+    """
+    output_dir = os.path.join("db", "results_dump")
+    os.makedirs(output_dir, exist_ok=True)
+
+    if source == "feather":
+        export_feather(zip_path, output_dir)
+        return
+
+    unzip_file(zip_path, output_dir)
+    for name, process in [
+        ("Competitions", process_competitions),
+        ("Results", process_results),
+    ]:
+        tsv_path = os.path.join(output_dir, f"WCA_export_{name}.tsv")
+        process(tsv_path, os.path.join(output_dir, f"{name}.csv"))
+        os.remove(tsv_path)
+
+
+def pick_fields(event: str, sizes: list[int]) -> dict[int, list[str]]:
+    """
+    Picks the competitors with the most results in an event as benchmark fields.
+
+    Parameters
+    ----------
+    event : str
+        The event.
+    sizes : list[int]
+        The field sizes.
+
+    Returns
+    -------
+    dict[int, list[str]]
+        The person IDs of the field of each size.
+    """
+    source = os.path.join("db", "results_dump", "Results")
+    columns = ["eventId", "personId"]
+
+    if os.path.exists(f"{source}.feather"):
+        results = pd.read_feather(f"{source}.feather", columns=columns)
+    else:
+        # Event IDs such as 333 would otherwise be read as numbers in some chunks.
+        results = pd.read_csv(f"{source}.csv", usecols=columns, dtype=str)
+
+    counts = results.loc[results["eventId"] == event, "personId"].value_counts()
+    people = counts.index.tolist()
+
+    return {size: people[:size] for size in sizes}
+
+
+def run(args) -> list[dict]:
+    """
+    Runs every stage and collects its timings.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        The parsed command line.
+
+    Returns
+    -------
+    list[dict]
+        One record per timing, with the `stage`, its parameters and `seconds`.
+    """
+    records = []
+
+    def record(stage, seconds, **params):
+        records.append({"stage": stage, **params, "seconds": seconds})
+        details = " ".join(f"{key}={value}" for key, value in params.items())
+        print(f"{stage:<10} {details:<50} {seconds:>9.4f}s")
+
+    zip_path = args.export
+    if zip_path is None:
+        zip_path = os.path.join(args.workdir, "export.zip")
+        seconds = time_call(
+            lambda: make_export(
+                zip_path, args.people, args.competitions, seed=args.seed
+            )
+        )
+        record("generate", seconds, people=args.people, competitions=args.competitions)
+    zip_path = os.path.abspath(zip_path)
+
+    if args.psql is not None:
+        # Only needed for this stage, and the rest runs without a database.
+        import sqlalchemy
+        from load_psql import load
+
+        engine = sqlalchemy.create_engine(args.psql)
+        record("psql_load", time_call(lambda: load(engine, zip_path)))
+
+    with working_directory(args.workdir):
+        record(
+            "etl", time_call(lambda: run_etl(zip_path, args.source)), source=args.source
+        )
+
+        db = None
+
+        def build():
+            nonlocal db
+            db = CSVParser()
+
+        record("build", time_call(build))
+        # A second open finds the store up to date and only reads the manifest.
+        record("open", time_call(CSVParser, args.repeat))
+
+        sqlite = None
+        if args.sqlite:
+            record("sqlite_load", time_call(lambda: load_sqlite(SQLITE_PATH, zip_path)))
+            sqlite = SQLiteConnection()
+
+        for event in args.events:
+            num_attempts = event_formats[event]["num_attempts"]
+            fields = pick_fields(event, args.fields)
+
+            for size, ids in fields.items():
+                if not ids:
+                    print(f"No results for {event}, skipping it")
+                    break
+
+                frame = db.query_frame(event, ids, args.window)
+                record(
+                    "query",
+                    time_call(
+                        lambda: db.query_frame(event, ids, args.window), args.repeat
+                    ),
+                    event=event,
+                    field=size,
+                    rows=len(frame),
+                )
+                if sqlite is not None:
+                    record(
+                        "query",
+                        time_call(
+                            lambda: sqlite.query_frame(event, ids, args.window),
+                            args.repeat,
+                        ),
+                        event=event,
+                        field=size,
+                        backend="sqlite",
+                    )
+                record(
+                    "fit",
+                    time_call(
+                        lambda: fit_field(frame, num_attempts, "180 days"), args.repeat
+                    ),
+                    event=event,
+                    field=size,
+                    model="distribution",
+                )
+                record(
+                    "fit",
+                    time_call(
+                        lambda: build_tables(frame, num_attempts, "180 days"),
+                        args.repeat,
+                    ),
+                    event=event,
+                    field=size,
+                    model="empirical",
+                )
+
+                competitors = [{"id": id, "name": id} for id in ids]
+                for model in args.models:
+                    simulator = SIMULATORS[model](db)
+                    simulator.prepare_data(event, competitors, window=args.window)
+
+                    for count in args.simulations:
+                        seconds = time_call(
+                            lambda: simulator.run_simulation(
+                                count, engine=args.engine, seed=args.seed
+                            ),
+                            args.repeat,
+                        )
+                        record(
+                            "simulate",
+                            seconds,
+                            event=event,
+                            field=size,
+                            model=model,
+                            simulations=count,
+                            competitors=len(simulator.competitors),
+                        )
+
+    return records
+
+
+def compare(records: list[dict], baseline: list[dict]) -> None:
+    """
+    Prints how each timing changed against a baseline run.
+
+    Parameters
+    ----------
+    records : list[dict]
+        The timings of this run.
+    baseline : list[dict]
+        The timings of the baseline run.
+
+    Returns
+    -------
+    None
+    """
+
+    def key(record):
+        return tuple(
+            sorted(
+                (name, value) for name, value in record.items() if name not in MEASURED
+            )
+        )
+
+    previous = {key(record): record["seconds"] for record in baseline}
+
+    print()
+    print(f"{'stage':<10} {'parameters':<50} {'baseline':>10} {'now':>10} {'ratio':>7}")
+    for record in records:
+        if key(record) not in previous:
+            continue
+        old = previous[key(record)]
+        params = " ".join(
+            f"{name}={value}"
+            for name, value in record.items()
+            if name != "stage" and name not in MEASURED
+        )
+        print(
+            f"{record['stage']:<10} {params:<50} {old:>9.4f}s "
+            f"{record['seconds']:>9.4f}s {record['seconds'] / old:>6.2f}x"
+        )
+
+
+def environment() -> dict:
+    """
+    Describes the machine and code the benchmark ran on.
+
+    Returns
+    -------
+    dict
+        Versions, CPU count and the git commit, if known.
+    """
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def main():
+    """
+    Runs the stage benchmark and writes its results.
+    """
+    parser = ArgumentParser(description="Benchmark each stage of the odds pipeline")
+    parser.add_argument(
+        "export", nargs="?", help="Export zip to use (default: generate one)"
+    )
+    parser.add_argument("-o", "--output", help="Write the results as JSON here")
+    parser.add_argument("--baseline", help="JSON results of a run to compare with")
+    parser.add_argument("--people", type=int, default=5000)
+    parser.add_argument("--competitions", type=int, default=500)
+    parser.add_argument(
+        "--source",
+        default="csv",
+        choices=["csv", "feather"],
+        help="Source files the ETL stage writes for the feather store build",
+    )
+    parser.add_argument(
+        "--events", type=lambda value: value.split(","), default=["333", "333bf"]
+    )
+    parser.add_argument(
+        "--fields",
+        type=lambda value: [int(i) for i in value.split(",")],
+        default=[16, 64, 256],
+        help="Comma separated field sizes",
+    )
+    parser.add_argument(
+        "--simulations",
+        type=lambda value: [int(i) for i in value.split(",")],
+        default=[10000, 100000],
+        help="Comma separated simulation counts",
+    )
+    parser.add_argument(
+        "--models",
+        type=lambda value: value.split(","),
+        default=list(SIMULATORS),
+        help="Comma separated simulators",
+    )
+    parser.add_argument("--engine", default="vectorized")
+    parser.add_argument("--window", type=int, default=365)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--psql",
+        metavar="URL",
+        help="Also time loading the export into this PostgreSQL database, as a "
+        "SQLAlchemy URL",
+    )
+    parser.add_argument(
+        "--sqlite",
+        action="store_true",
+        help="Also time building the SQLite backend and querying it",
+    )
+    parser.add_argument(
+        "--workdir", help="Scratch directory (default: a temporary directory)"
+    )
+    args = parser.parse_args()
+
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+
+    with tempfile.TemporaryDirectory() as scratch:
+        args.workdir = os.path.abspath(args.workdir or scratch)
+        os.makedirs(args.workdir, exist_ok=True)
+        records = run(args)
+
+    if args.output is not None:
+        parameters = {
+            name: value
+            for name, value in vars(args).items()
+            if name not in ("output", "baseline", "workdir", "psql")
+        }
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "environment": environment(),
+                    "parameters": parameters,
+                    "results": records,
+                },
+                f,
+                indent=2,
+            )
+
+    if args.baseline is not None:
+        compare(records, baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Checks the import-time budget of the command line entry points.
+
+Each entry point's `--help` is run under `python -X importtime`, and the import
+time of every module the interpreter does not load on its own is summed, keeping
+the fastest of several runs. The run fails if that exceeds the budget, or if any
+heavy dependency is imported just to print the help. The import time of each
+registered backend and simulator, which is paid only by runs that select it, is
+reported alongside.
+
+Run from the repository root with `python bench/bench_startup.py [--budget 50]`.
+It exits with status 1 if a check fails. The same checks run as part of the test
+suite in tests/test_startup.py.
+"""
+
+import os
+import subprocess
+import sys
+from argparse import ArgumentParser
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+SRC = os.path.join(ROOT, "src")
+sys.path.insert(0, SRC)
+
+from registry import BACKENDS, SIMULATORS  # noqa: E402
+
+# Entry points whose --help must stay within the budget.
+ENTRY_POINTS = ["main.py"]
+
+# Dependencies that should only be imported once a run needs them.
+HEAVY_MODULES = ["numpy", "pandas", "pyarrow", "sqlalchemy", "requests", "dotenv"]
+
+# Most milliseconds of imports --help may add to the interpreter.
+BUDGET = 50
+
+
+def import_times(args: list[str]) -> dict[str, int] | None:
+    """
+    Runs Python with `-X importtime` and collects the modules it imported.
+
+    Parameters
+    ----------
+    args : list[str]
+        The arguments to the interpreter after `-X importtime`.
+
+    Returns
+    -------
+    dict[str, int] or None
+        The time each module took to import, excluding its own imports, in
+        microseconds, or None if the command failed.
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=SRC,
+        capture_output=True,
+        text=True,
+    )
+    if process.returncode != 0:
+        return None
+
+    times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_time, _, module = line[len("import time:") :].split("|")
+        if self_time.strip().isdigit():
+            times[module.strip()] = int(self_time)
+
+    return times
+
+
+def added_time(
+    args: list[str], baseline: set[str], repeat: int
+) -> tuple[float, set] | None:
+    """
+    Measures the import time a command adds to the bare interpreter.
+
+    Parameters
+    ----------
+    args : list[str]
+        The arguments to the interpreter.
+    baseline : set[str]
+        The modules the bare interpreter imports.
+    repeat : int
+        Number of runs, the fastest is kept.
+
+    Returns
+    -------
+    tuple[float, set] or None
+        The added import time in milliseconds, and the modules imported, or None
+        if the command failed.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        times = import_times(args)
+        if times is None:
+            return None
+        added = sum(time for module, time in times.items() if module not in baseline)
+        best = min(best, added / 1000)
+
+    return best, set(times)
+
+
+def heavy_imports(modules: set[str], baseline: set[str]) -> list[str]:
+    """
+    Lists the heavy dependencies a command imported.
+
+    Parameters
+    ----------
+    modules : set[str]
+        The modules the command imported.
+    baseline : set[str]
+        The modules the bare interpreter imports.
+
+    Returns
+    -------
+    list[str]
+        The modules of `HEAVY_MODULES` imported by the command but not the bare
+        interpreter.
+    """
+    return [
+        module
+        for module in HEAVY_MODULES
+        if module in modules and module not in baseline
+    ]
+
+
+def main():
+    """
+    Runs the startup checks and reports the import cost of each implementation.
+    """
+    parser = ArgumentParser(description="Check the import-time budget of the CLI")
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=BUDGET,
+        help="Most milliseconds of imports --help may add to the interpreter",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    baseline = set(import_times(["-c", "pass"]))
+    failed = False
+
+    for entry_point in ENTRY_POINTS:
+        measured = added_time([entry_point, "--help"], baseline, args.repeat)
+        if measured is None:
+            print(f"{entry_point + ' --help':<24} FAILED to run")
+            failed = True
+            continue
+        milliseconds, modules = measured
+        heavy = heavy_imports(modules, baseline)
+        passed = milliseconds <= args.budget and not heavy
+        failed = failed or not passed
+
+        print(
+            f"{entry_point + ' --help':<24} {milliseconds:>8.1f} ms "
+            f"(budget {args.budget:g} ms) {'ok' if passed else 'FAILED'}"
+        )
+        if heavy:
+            print(f"  imports heavy dependencies: {', '.join(heavy)}")
+
+    print()
+    for variable, registry in [("BACKENDS", BACKENDS), ("SIMULATORS", SIMULATORS)]:
+        for name in registry.names():
+            load = f"from registry import {variable}; {variable}.load({name!r})"
+            measured = added_time(["-c", load], baseline, args.repeat)
+            label = f"{registry.kind} {name}"
+            if measured is None:
+                print(f"{label:<24} unavailable")
+            else:
+                print(f"{label:<24} {measured[0]:>8.1f} ms")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
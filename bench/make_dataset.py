@@ -0,0 +1,380 @@
+"""
+Generates a synthetic WCA results export, so the pipeline can be benchmarked
+offline and at any size without the real export.
+
+The zip has the members and column layout of the real export, so it can be fed
+to `db/get_results.py`'s processing functions, `db/load_psql.py` or the stage
+benchmark in this directory. Competitors have a persistent skill level and DNF
+rate per event, competitions are spread evenly up to today, and events with
+more than 16 entrants get a first round followed by a final for the faster
+half.
+
+Run from the repository root with
+`python bench/make_dataset.py -o export.zip --people 5000 --competitions 500`,
+and load it into Postgres with `python db/load_psql.py export.zip`.
+"""
+
+import io
+import os
+import sys
+import zipfile
+from argparse import ArgumentParser
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "src"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "db"))
+
+from formats import event_formats  # noqa: E402
+from get_results import COMPETITIONS_MEMBER, RESULTS_MEMBER  # noqa: E402
+
+# Columns of the export, with year, month and day where `process_competitions`
+# expects them.
+COMPETITIONS_HEADER = [
+    "id",
+    "name",
+    "cityName",
+    "countryId",
+    "information",
+    "venue",
+    "venueAddress",
+    "venueDetails",
+    "external_website",
+    "cellName",
+    "latitude",
+    "longitude",
+    "cancelled",
+    "eventSpecs",
+    "wcaDelegate",
+    "organiser",
+    "year",
+    "month",
+    "day",
+    "endMonth",
+    "endDay",
+]
+RESULTS_HEADER = [
+    "competitionId",
+    "eventId",
+    "roundTypeId",
+    "pos",
+    "best",
+    "average",
+    "personName",
+    "personId",
+    "formatId",
+    "value1",
+    "value2",
+    "value3",
+    "value4",
+    "value5",
+    "personCountryId",
+]
+
+# Typical time of each event relative to 3x3x3, the share of competitors who
+# enter it, the spread of a single attempt and the typical DNF rate.
+EVENT_PROFILES = {
+    "333": (1.0, 0.95, 0.12, 0.02),
+    "222": (0.3, 0.75, 0.2, 0.03),
+    "444": (3.5, 0.45, 0.1, 0.03),
+    "555": (6.5, 0.3, 0.08, 0.03),
+    "666": (12.0, 0.12, 0.07, 0.04),
+    "777": (18.0, 0.1, 0.07, 0.04),
+    "333oh": (2.0, 0.35, 0.15, 0.03),
+    "333bf": (6.0, 0.15, 0.25, 0.35),
+    "444bf": (30.0, 0.03, 0.2, 0.5),
+    "555bf": (60.0, 0.02, 0.2, 0.55),
+    "pyram": (0.35, 0.5, 0.25, 0.04),
+    "skewb": (0.4, 0.45, 0.25, 0.04),
+    "sq1": (1.5, 0.25, 0.2, 0.04),
+    "clock": (0.7, 0.25, 0.15, 0.05),
+    "333fm": (1.0, 0.05, 0.1, 0.05),
+}
+
+# Average 3x3x3 single of the median competitor, in centiseconds.
+MEDIAN_333 = 2000
+
+# Entrants above which an event gets a first round and a final.
+FINAL_THRESHOLD = 16
+
+
+def person_ids(num_people: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Makes unique WCA IDs of the form YYYYLLLLNN.
+
+    Parameters
+    ----------
+    num_people : int
+        Number of IDs.
+    rng : np.random.Generator
+        The generator for the registration years.
+
+    Returns
+    -------
+    np.ndarray
+        The IDs.
+    """
+    years = rng.integers(2005, 2025, num_people)
+    letters = np.arange(num_people) // 100
+    name = [
+        "".join(chr(65 + (i // 26**k) % 26) for k in range(3, -1, -1)) for i in letters
+    ]
+
+    return np.array(
+        [
+            f"{year}{word}{i % 100:02d}"
+            for i, (year, word) in enumerate(zip(years, name))
+        ]
+    )
+
+
+def make_competitions(num_competitions: int, days: int) -> pd.DataFrame:
+    """
+    Spreads competitions evenly over the days up to today.
+
+    Parameters
+    ----------
+    num_competitions : int
+        Number of competitions.
+    days : int
+        Number of days the competitions span.
+
+    Returns
+    -------
+    pd.DataFrame
+        The competitions in the export's column layout.
+    """
+    today = date.today()
+    dates = [
+        today - timedelta(days=int(days * (1 - i / max(num_competitions - 1, 1))))
+        for i in range(num_competitions)
+    ]
+
+    competitions = pd.DataFrame(
+        "", index=range(num_competitions), columns=COMPETITIONS_HEADER
+    )
+    competitions["id"] = [f"Synthetic{i}{d.year}" for i, d in enumerate(dates)]
+    competitions["name"] = [f"Synthetic {i} {d.year}" for i, d in enumerate(dates)]
+    competitions["countryId"] = "Synthetic"
+    competitions["cancelled"] = 0
+    competitions["year"] = [d.year for d in dates]
+    competitions["month"] = competitions["endMonth"] = [d.month for d in dates]
+    competitions["day"] = competitions["endDay"] = [d.day for d in dates]
+
+    return competitions
+
+
+def make_results(
+    competitions: pd.DataFrame,
+    num_people: int,
+    events: list[str],
+    competition_size: int,
+    rng: np.random.Generator,
+) -> pd.DataFrame:
+    """
+    Simulates the rounds of every competition.
+
+    Parameters
+    ----------
+    competitions : pd.DataFrame
+        The competitions from `make_competitions`.
+    num_people : int
+        Number of people in the population.
+    events : list[str]
+        The events held at every competition.
+    competition_size : int
+        Average number of competitors at a competition.
+    rng : np.random.Generator
+        The generator to draw from.
+
+    Returns
+    -------
+    pd.DataFrame
+        The results in the export's column layout.
+    """
+    ids = person_ids(num_people, rng)
+    skill = np.exp(rng.normal(0, 0.45, num_people))
+    dnf_skill = np.exp(rng.normal(0, 0.5, num_people))
+
+    frames = []
+    for event in events:
+        ratio, popularity, spread, dnf_rate = EVENT_PROFILES[event]
+        format = event_formats[event]["default_format"]
+        num_attempts = event_formats[event]["num_attempts"]
+
+        # Entrants of the event at every competition, as (competition, person).
+        sizes = rng.poisson(competition_size * popularity, len(competitions))
+        sizes = np.minimum(np.maximum(sizes, 2), num_people)
+        competition = np.repeat(np.arange(len(competitions)), sizes)
+        person = np.concatenate(
+            [rng.choice(num_people, n, replace=False) for n in sizes]
+        )
+
+        # The faster half of a large field goes on to the final.
+        order = np.lexsort((skill[person], competition))
+        rank = np.empty(len(order), dtype=np.int64)
+        starts = np.repeat(np.cumsum(sizes) - sizes, sizes)
+        rank[order] = np.arange(len(order)) - starts
+        large = sizes[competition] > FINAL_THRESHOLD
+        finalist = large & (rank < sizes[competition] // 2)
+
+        rounds = [
+            (competition[large], person[large], "1"),
+            (competition[~large | finalist], person[~large | finalist], "f"),
+        ]
+
+        for round_competition, round_person, round_type in rounds:
+            n = len(round_person)
+            if event == "333fm":
+                mean = 30 * np.sqrt(skill[round_person])
+            else:
+                mean = MEDIAN_333 * ratio * skill[round_person]
+
+            values = rng.normal(mean[:, None], (spread * mean)[:, None], (n, 5))
+            values = np.maximum(values, mean[:, None] * 0.4).astype(np.int64)
+            dnf = (
+                rng.random((n, 5))
+                < np.minimum(dnf_rate * dnf_skill[round_person], 0.9)[:, None]
+            )
+            values[dnf] = -1
+            values[:, num_attempts:] = 0
+
+            solved = np.where(values > 0, values, np.iinfo(np.int64).max)
+            best = solved.min(axis=1)
+            best[best == np.iinfo(np.int64).max] = -1
+
+            frames.append(
+                pd.DataFrame(
+                    {
+                        "competitionId": competitions["id"].to_numpy()[
+                            round_competition
+                        ],
+                        "eventId": event,
+                        "roundTypeId": round_type,
+                        "pos": 0,
+                        "best": best,
+                        "average": 0,
+                        "personName": np.char.add("Synthetic ", ids[round_person]),
+                        "personId": ids[round_person],
+                        "formatId": format if format != "b" else str(num_attempts),
+                        **{f"value{i + 1}": values[:, i] for i in range(5)},
+                        "personCountryId": "Synthetic",
+                    }
+                )
+            )
+
+    return pd.concat(frames, ignore_index=True)[RESULTS_HEADER]
+
+
+def write_export(path: str, competitions: pd.DataFrame, results: pd.DataFrame) -> None:
+    """
+    Writes the tables as the TSV members of an export zip.
+
+    Parameters
+    ----------
+    path : str
+        Path of the zip to write.
+    competitions : pd.DataFrame
+        The competitions.
+    results : pd.DataFrame
+        The results.
+
+    Returns
+    -------
+    None
+    """
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zip_ref:
+        for member, table in [
+            (COMPETITIONS_MEMBER, competitions),
+            (RESULTS_MEMBER, results),
+        ]:
+            buffer = io.StringIO()
+            table.to_csv(buffer, sep="\t", index=False, lineterminator="\n")
+            zip_ref.writestr(member, buffer.getvalue())
+
+
+def make_export(
+    path: str,
+    num_people: int = 5000,
+    num_competitions: int = 500,
+    events: list[str] | None = None,
+    competition_size: int = 80,
+    days: int = 730,
+    seed: int = 0,
+) -> int:
+    """
+    Generates a synthetic export zip.
+
+    Parameters
+    ----------
+    path : str
+        Path of the zip to write.
+    num_people : int, optional
+        Number of people in the population (default is 5000).
+    num_competitions : int, optional
+        Number of competitions (default is 500).
+    events : list[str], optional
+        The events held at every competition, all timed events with a profile if
+        None (default is None).
+    competition_size : int, optional
+        Average number of competitors at a competition (default is 80).
+    days : int, optional
+        Number of days up to today the competitions span (default is 730).
+    seed : int, optional
+        Seed of the generator (default is 0).
+
+    Returns
+    -------
+    int
+        The number of result rows written.
+    """
+    rng = np.random.default_rng(seed)
+    if events is None:
+        events = [event for event in EVENT_PROFILES if event != "333fm"]
+
+    competitions = make_competitions(num_competitions, days)
+    results = make_results(competitions, num_people, events, competition_size, rng)
+    write_export(path, competitions, results)
+
+    return len(results)
+
+
+def main():
+    """
+    Writes a synthetic export zip of the requested size.
+    """
+    parser = ArgumentParser(description="Generate a synthetic WCA results export")
+    parser.add_argument("-o", "--output", default="export.zip", help="Zip to write")
+    parser.add_argument("--people", type=int, default=5000)
+    parser.add_argument("--competitions", type=int, default=500)
+    parser.add_argument(
+        "--events", help="Comma separated events (default: all timed events)"
+    )
+    parser.add_argument(
+        "--competition_size",
+        type=int,
+        default=80,
+        help="Average number of competitors at a competition",
+    )
+    parser.add_argument(
+        "--days", type=int, default=730, help="Days up to today to spread them over"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    num_rows = make_export(
+        args.output,
+        args.people,
+        args.competitions,
+        args.events.split(",") if args.events else None,
+        args.competition_size,
+        args.days,
+        args.seed,
+    )
+    print(f"Wrote {num_rows} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
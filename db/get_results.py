@@ -3,6 +3,43 @@ import csv
 import requests
 import zipfile
 import glob
+from argparse import ArgumentParser
+from datetime import date
+
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.ipc as pa_ipc
+
+COMPETITIONS_MEMBER = "WCA_export_Competitions.tsv"
+RESULTS_MEMBER = "WCA_export_Results.tsv"
+
+COMPETITIONS_SCHEMA = pa.schema(
+    [
+        ("id", pa.string()),
+        ("year", pa.int16()),
+        ("month", pa.int8()),
+        ("day", pa.int8()),
+    ]
+)
+
+RESULTS_SCHEMA = pa.schema(
+    [
+        ("competitionId", pa.string()),
+        ("eventId", pa.string()),
+        ("roundTypeId", pa.string()),
+        ("personName", pa.string()),
+        ("personId", pa.string()),
+        ("formatId", pa.string()),
+        ("value1", pa.int32()),
+        ("value2", pa.int32()),
+        ("value3", pa.int32()),
+        ("value4", pa.int32()),
+        ("value5", pa.int32()),
+    ]
+)
+
+# Size of each block read from the zip member, this bounds peak memory usage.
+BLOCK_SIZE = 1 << 24
 
 
 def download_file(url, output_dir):
@@ -110,17 +147,161 @@ def process_results(input_file, output_file):
             cres.writerow(newrow)
 
 
+def read_member(zip_ref, member, columns):
+    """
+    Streams the projected columns of a TSV member of the export zip.
+
+    Parameters
+    ----------
+    zip_ref : zipfile.ZipFile
+        The opened export zip.
+    member : str
+        The name of the TSV file inside the zip.
+    columns : list[str]
+        The columns to keep, in order.
+
+    Yields
+    ------
+    list[bytes]
+        The projected fields of each row, as UTF-8 encoded in the export.
+    """
+    with zip_ref.open(member) as src:
+        header = src.readline().rstrip(b"\r\n").decode().split("\t")
+        indices = [header.index(column) for column in columns]
+
+        for line in src:
+            line = line.rstrip(b"\r\n")
+            if not line:
+                continue
+            fields = line.split(b"\t")
+            yield [fields[i] for i in indices]
+
+
+def competition_dates(competitions):
+    """
+    Builds the date lookup used to denormalize dates onto the results.
+
+    Parameters
+    ----------
+    competitions : Iterable[list[bytes]]
+        The rows of `read_member` over the competitions, with the columns of
+        `COMPETITIONS_SCHEMA`.
+
+    Returns
+    -------
+    dict[bytes, bytes]
+        The ISO date of each competition, by its ID.
+    """
+    return {
+        row[0]: date(int(row[1]), int(row[2]), int(row[3])).isoformat().encode()
+        for row in competitions
+    }
+
+
+def stream_member_to_feather(zip_path, member, output_file, schema):
+    """
+    Stream a TSV member of the export zip into a feather file without extracting it.
+
+    Only the columns in `schema` are parsed, and the data is written one typed
+    record batch at a time, so memory usage is bounded by `BLOCK_SIZE`.
+
+    Parameters
+    ----------
+    zip_path : str
+        The path to the export zip file.
+    member : str
+        The name of the TSV file inside the zip.
+    output_file : str
+        The path to the output feather file.
+    schema : pyarrow.Schema
+        The columns to keep and their types.
+
+    Returns
+    -------
+    int
+        The number of rows written.
+    """
+    read_options = pa_csv.ReadOptions(block_size=BLOCK_SIZE)
+    parse_options = pa_csv.ParseOptions(delimiter="\t", quote_char=False)
+    convert_options = pa_csv.ConvertOptions(
+        include_columns=schema.names,
+        column_types={name: schema.field(name).type for name in schema.names},
+    )
+
+    num_rows = 0
+
+    with zipfile.ZipFile(zip_path, "r") as zip_ref, zip_ref.open(member) as src:
+        reader = pa_csv.open_csv(
+            src,
+            read_options=read_options,
+            parse_options=parse_options,
+            convert_options=convert_options,
+        )
+        with pa_ipc.new_file(output_file, schema) as writer:
+            for batch in reader:
+                writer.write_batch(batch)
+                num_rows += batch.num_rows
+
+    return num_rows
+
+
+def export_feather(zip_path, output_dir):
+    """
+    Write the competitions and results tables from the export zip as feather files.
+
+    Parameters
+    ----------
+    zip_path : str
+        The path to the export zip file.
+    output_dir : str
+        The directory where Competitions.feather and Results.feather are written.
+
+    Returns
+    -------
+    None
+    """
+    stream_member_to_feather(
+        zip_path,
+        COMPETITIONS_MEMBER,
+        os.path.join(output_dir, "Competitions.feather"),
+        COMPETITIONS_SCHEMA,
+    )
+    stream_member_to_feather(
+        zip_path,
+        RESULTS_MEMBER,
+        os.path.join(output_dir, "Results.feather"),
+        RESULTS_SCHEMA,
+    )
+
+
 def main():
     """
-    Main function to download WCA results, process them into CSV format,
-    and clean up unnecessary files.
+    Main function to download WCA results, process them into CSV or feather
+    format, and clean up unnecessary files.
     """
+    parser = ArgumentParser(description="Download and process the WCA results export")
+    parser.add_argument(
+        "-f",
+        "--format",
+        default="csv",
+        choices=["csv", "feather"],
+        help="Output format: 'csv' extracts and converts the export, 'feather' "
+        "streams it directly out of the zip into typed columnar files",
+    )
+    args = parser.parse_args()
+
     url = "https://www.worldcubeassociation.org/export/results/WCA_export.tsv"
     output_dir = "results_dump"
     sep = os.path.sep
 
-    # Download and unzip the file
     file_path = download_file(url, output_dir)
+
+    if args.format == "feather":
+        export_feather(file_path, output_dir)
+        os.remove(file_path)
+        return
+
+    # Unzip the file
     unzip_file(file_path, output_dir)
 
     # Process the files
@@ -3,3 +3,15 @@ SET SEARCH_PATH to wca_results
 \copy Competitions (id, year, month, day) FROM 'results_dump/Competitions.csv' DELIMITER ',' CSV HEADER; 
 
 \copy Results (competitionId, eventId, roundTypeId, personName, personId, formatId, value1, value2, value3, value4, value5) FROM 'results_dump/Results.csv' DELIMITER ',' CSV HEADER; 
+
+UPDATE Results SET date = Competitions.date FROM Competitions WHERE Competitions.id = Results.competitionId;
+
+ALTER TABLE Results ALTER COLUMN date SET NOT NULL;
+
+CREATE INDEX IF NOT EXISTS results_event_person_date_idx ON Results (eventId, personId, date);
+
+ANALYZE Competitions;
+
+ANALYZE Results;
+
+INSERT INTO DatasetInfo (version) VALUES (EXTRACT(EPOCH FROM now())::BIGINT);
@@ -0,0 +1,326 @@
+import io
+import os
+import zipfile
+from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
+
+import sqlalchemy
+from dotenv import load_dotenv
+
+from get_results import (
+    COMPETITIONS_MEMBER,
+    COMPETITIONS_SCHEMA,
+    RESULTS_MEMBER,
+    RESULTS_SCHEMA,
+    competition_dates,
+    download_file,
+    read_member,
+)
+
+SCHEMA = "wca_results"
+STAGING_SCHEMA = "wca_results_staging"
+
+STAGING_DDL = f"""
+DROP SCHEMA IF EXISTS {STAGING_SCHEMA} CASCADE;
+CREATE SCHEMA {STAGING_SCHEMA};
+SET search_path TO {STAGING_SCHEMA};
+
+CREATE TYPE {STAGING_SCHEMA}.event AS ENUM (
+    '333', '222', '444', '555', '666', '777', '333oh', '333bf', '333fm', 'pyram', 'minx', 'skewb', 'sq1', 'clock', '333mbf', '444bf', '555bf', '333mbo', '333ft', 'magic', 'mmagic'
+);
+
+CREATE TABLE Competitions (
+    id TEXT NOT NULL,
+    year INT NOT NULL,
+    month INT NOT NULL,
+    day INT NOT NULL,
+    date DATE GENERATED ALWAYS AS (make_date(year, month, day)) STORED
+);
+
+CREATE TABLE Results (
+    competitionId TEXT NOT NULL,
+    eventId event NOT NULL,
+    roundTypeId CHAR NOT NULL,
+    personName TEXT NOT NULL,
+    personId VARCHAR(10) NOT NULL,
+    formatId CHAR NOT NULL,
+    value1 INT,
+    value2 INT,
+    value3 INT,
+    value4 INT,
+    value5 INT,
+    date DATE NOT NULL
+);
+
+CREATE TABLE DatasetInfo (
+    version BIGINT NOT NULL
+);
+"""
+
+# Independent of each other, so they are built in parallel after the load.
+STAGING_INDEXES = [
+    "ALTER TABLE Competitions ADD PRIMARY KEY (id)",
+    "ALTER TABLE Results ADD PRIMARY KEY (competitionId, eventId, roundTypeId, personId)",
+    "CREATE INDEX results_event_person_date_idx ON Results (eventId, personId, date)",
+]
+
+# Validated in one pass once the referenced primary key exists.
+STAGING_CONSTRAINTS = [
+    "ALTER TABLE Results ADD FOREIGN KEY (competitionId) REFERENCES Competitions(id)",
+    "ANALYZE Competitions",
+    "ANALYZE Results",
+    "INSERT INTO DatasetInfo (version) VALUES (EXTRACT(EPOCH FROM now())::BIGINT)",
+]
+
+COMPETITIONS_COLUMNS = COMPETITIONS_SCHEMA.names
+RESULTS_COLUMNS = RESULTS_SCHEMA.names
+
+
+class RowStream(io.RawIOBase):
+    """
+    A read-only file object over an iterator of byte strings, used as a COPY source.
+
+    Attributes
+    ----------
+    rows : Iterator[bytes]
+        The lines to stream, each terminated by a newline.
+    """
+
+    def __init__(self, rows):
+        """
+        Initializes the stream.
+
+        Parameters
+        ----------
+        rows : Iterator[bytes]
+            The lines to stream, each terminated by a newline.
+        """
+        self.rows = rows
+        self._buffer = b""
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        """
+        Reads up to `size` bytes, or everything if `size` is negative.
+
+        Parameters
+        ----------
+        size : int, optional
+            The maximum number of bytes to read (default is -1).
+
+        Returns
+        -------
+        bytes
+            The data read, empty once the iterator is exhausted.
+        """
+        if size < 0:
+            data = self._buffer + b"".join(self.rows)
+            self._buffer = b""
+            return data
+
+        chunks = [self._buffer]
+        length = len(self._buffer)
+
+        for row in self.rows:
+            chunks.append(row)
+            length += len(row)
+            if length >= size:
+                break
+
+        data = b"".join(chunks)
+        self._buffer = data[size:]
+        return data[:size]
+
+
+def copy_line(fields):
+    """
+    Formats a row as a line of the COPY text format.
+
+    Parameters
+    ----------
+    fields : list[bytes]
+        The fields of the row.
+
+    Returns
+    -------
+    bytes
+        The escaped, tab separated fields, terminated by a newline.
+    """
+    return b"\t".join(field.replace(b"\\", b"\\\\") for field in fields) + b"\n"
+
+
+def copy_rows(engine, table, columns, rows):
+    """
+    Loads rows into a staging table with COPY.
+
+    Parameters
+    ----------
+    engine : sqlalchemy.engine.base.Engine
+        The engine to take a connection from.
+    table : str
+        The name of the staging table.
+    columns : list[str]
+        The columns being loaded.
+    rows : Iterator[bytes]
+        The rows in COPY text format.
+
+    Returns
+    -------
+    None
+    """
+    connection = engine.raw_connection()
+    try:
+        with connection.cursor() as cursor:
+            cursor.copy_expert(
+                f"COPY {STAGING_SCHEMA}.{table} ({', '.join(columns)}) FROM STDIN",
+                RowStream(rows),
+            )
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def execute(engine, statement):
+    """
+    Executes a statement against the staging schema in its own transaction.
+
+    Parameters
+    ----------
+    engine : sqlalchemy.engine.base.Engine
+        The engine to take a connection from.
+    statement : str
+        The statement to execute.
+
+    Returns
+    -------
+    None
+    """
+    with engine.begin() as connection:
+        connection.exec_driver_sql(f"SET search_path TO {STAGING_SCHEMA}")
+        connection.exec_driver_sql(statement)
+
+
+def load(engine, zip_path):
+    """
+    Loads the export zip into a staging schema and swaps it in for the live schema.
+
+    Competitions are read first to build a date lookup, then both tables are COPYed
+    in parallel with the date denormalized onto every result. Results of
+    competitions missing from the export are skipped and counted, as the foreign key
+    would reject them. Keys, the lookup index and the foreign key are only built
+    after the data is in, and the staging schema replaces the live one in a single
+    transaction.
+
+    Parameters
+    ----------
+    engine : sqlalchemy.engine.base.Engine
+        The engine for the target database.
+    zip_path : str
+        The path to the export zip file.
+
+    Returns
+    -------
+    None
+    """
+    with engine.begin() as connection:
+        connection.exec_driver_sql(STAGING_DDL)
+
+    with zipfile.ZipFile(zip_path, "r") as zip_ref:
+        competitions = list(
+            read_member(zip_ref, COMPETITIONS_MEMBER, COMPETITIONS_COLUMNS)
+        )
+
+    dates = competition_dates(competitions)
+    orphans = 0
+
+    def competition_rows():
+        for row in competitions:
+            yield copy_line(row)
+
+    def result_rows():
+        nonlocal orphans
+        with zipfile.ZipFile(zip_path, "r") as zip_ref:
+            for row in read_member(zip_ref, RESULTS_MEMBER, RESULTS_COLUMNS):
+                competition_date = dates.get(row[0])
+                if competition_date is None:
+                    orphans += 1
+                    continue
+                yield copy_line(row + [competition_date])
+
+    with ThreadPoolExecutor() as executor:
+        loads = [
+            executor.submit(
+                copy_rows,
+                engine,
+                "Competitions",
+                COMPETITIONS_COLUMNS,
+                competition_rows(),
+            ),
+            executor.submit(
+                copy_rows,
+                engine,
+                "Results",
+                RESULTS_COLUMNS + ["date"],
+                result_rows(),
+            ),
+        ]
+        for future in loads:
+            future.result()
+
+        if orphans:
+            print(f"Skipped {orphans} results of competitions missing from the export")
+
+        indexes = [
+            executor.submit(execute, engine, statement) for statement in STAGING_INDEXES
+        ]
+        for future in indexes:
+            future.result()
+
+    for statement in STAGING_CONSTRAINTS:
+        execute(engine, statement)
+
+    with engine.begin() as connection:
+        connection.exec_driver_sql(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        connection.exec_driver_sql(f"ALTER SCHEMA {STAGING_SCHEMA} RENAME TO {SCHEMA}")
+
+
+def main():
+    """
+    Main function to bulk load the WCA results export into PostgreSQL.
+    """
+    parser = ArgumentParser(
+        description="Bulk load the WCA results export into PostgreSQL"
+    )
+    parser.add_argument(
+        "zip_path",
+        nargs="?",
+        default=None,
+        help="Path to the export zip, downloaded to results_dump if omitted",
+    )
+    parser.add_argument("--host", default="localhost", help="Database host")
+    parser.add_argument("--dbname", default="wca_results", help="Database name")
+    args = parser.parse_args()
+
+    load_dotenv()
+    username = os.getenv("PSQL_USERNAME")
+    password = os.getenv("PSQL_PASSWORD")
+
+    engine = sqlalchemy.create_engine(
+        f"postgresql://{username}:{password}@{args.host}/{args.dbname}"
+    )
+
+    zip_path = args.zip_path
+    if zip_path is None:
+        url = "https://www.worldcubeassociation.org/export/results/WCA_export.tsv"
+        zip_path = download_file(url, "results_dump")
+
+    load(engine, zip_path)
+
+    if args.zip_path is None:
+        os.remove(zip_path)
+
+
+if __name__ == "__main__":
+    main()
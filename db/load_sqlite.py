@@ -0,0 +1,172 @@
+import os
+import sqlite3
+import time
+import zipfile
+from argparse import ArgumentParser
+
+from get_results import (
+    COMPETITIONS_MEMBER,
+    COMPETITIONS_SCHEMA,
+    RESULTS_MEMBER,
+    RESULTS_SCHEMA,
+    competition_dates,
+    download_file,
+    read_member,
+)
+
+SQLITE_NAME = "wca_results.sqlite3"
+
+# Written once and then only read, so the bulk load skips the journal entirely.
+# The build goes to a temporary file and is discarded if interrupted.
+BUILD_DDL = """
+PRAGMA journal_mode = OFF;
+PRAGMA synchronous = OFF;
+PRAGMA page_size = 8192;
+
+CREATE TABLE Competitions (
+    id TEXT NOT NULL PRIMARY KEY,
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    day INTEGER NOT NULL,
+    date TEXT NOT NULL
+);
+
+CREATE TABLE Results (
+    competitionId TEXT NOT NULL,
+    eventId TEXT NOT NULL,
+    roundTypeId TEXT NOT NULL,
+    personName TEXT NOT NULL,
+    personId TEXT NOT NULL,
+    formatId TEXT NOT NULL,
+    value1 INTEGER,
+    value2 INTEGER,
+    value3 INTEGER,
+    value4 INTEGER,
+    value5 INTEGER,
+    date TEXT NOT NULL
+);
+
+CREATE TABLE DatasetInfo (
+    version INTEGER NOT NULL
+);
+"""
+
+# Built once the data is in, which is much faster than maintaining it per row.
+INDEX_DDL = """
+CREATE INDEX results_event_person_date_idx ON Results (eventId, personId, date);
+ANALYZE;
+"""
+
+COMPETITIONS_COLUMNS = COMPETITIONS_SCHEMA.names
+RESULTS_COLUMNS = RESULTS_SCHEMA.names
+
+
+def load(db_path, zip_path):
+    """
+    Builds the SQLite database from the export zip and swaps it in for the old one.
+
+    Competitions are read first to build a date lookup, then results are inserted
+    with the date denormalized onto every row. Results of competitions missing
+    from the export are skipped and counted. The (eventId, personId, date) index
+    is built after the data is in. The database is written to a temporary file
+    and atomically renamed over `db_path`, so readers never see a partial build and
+    those still holding the old file keep reading it.
+
+    Parameters
+    ----------
+    db_path : str
+        The path of the database file.
+    zip_path : str
+        The path to the export zip file.
+
+    Returns
+    -------
+    None
+    """
+    temp_path = f"{db_path}.tmp"
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+
+    connection = sqlite3.connect(temp_path)
+    try:
+        connection.executescript(BUILD_DDL)
+
+        with zipfile.ZipFile(zip_path, "r") as zip_ref:
+            competitions = list(
+                read_member(zip_ref, COMPETITIONS_MEMBER, COMPETITIONS_COLUMNS)
+            )
+
+        dates = competition_dates(competitions)
+        orphans = 0
+
+        def result_rows():
+            nonlocal orphans
+            with zipfile.ZipFile(zip_path, "r") as zip_ref:
+                for row in read_member(zip_ref, RESULTS_MEMBER, RESULTS_COLUMNS):
+                    competition_date = dates.get(row[0])
+                    if competition_date is None:
+                        orphans += 1
+                        continue
+                    yield [field.decode() for field in row + [competition_date]]
+
+        with connection:
+            connection.executemany(
+                "INSERT INTO Competitions VALUES (?, ?, ?, ?, ?)",
+                (
+                    [field.decode() for field in row + [dates[row[0]]]]
+                    for row in competitions
+                ),
+            )
+            # Attempt values are stored as integers by the columns' affinity.
+            connection.executemany(
+                f"INSERT INTO Results VALUES ({', '.join('?' * 12)})", result_rows()
+            )
+
+            connection.executescript(INDEX_DDL)
+            connection.execute(
+                "INSERT INTO DatasetInfo (version) VALUES (?)", (int(time.time()),)
+            )
+    finally:
+        connection.close()
+
+    if orphans:
+        print(f"Skipped {orphans} results of competitions missing from the export")
+
+    os.replace(temp_path, db_path)
+
+
+def main():
+    """
+    Main function to build the SQLite database from the WCA results export.
+    """
+    parser = ArgumentParser(
+        description="Build an embedded SQLite database from the WCA results export"
+    )
+    parser.add_argument(
+        "zip_path",
+        nargs="?",
+        default=None,
+        help="Path to the export zip, downloaded to results_dump if omitted",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default=os.path.join("results_dump", SQLITE_NAME),
+        help="Database file to write",
+    )
+    args = parser.parse_args()
+
+    zip_path = args.zip_path
+    if zip_path is None:
+        url = "https://www.worldcubeassociation.org/export/results/WCA_export.tsv"
+        zip_path = download_file(url, "results_dump")
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    load(args.output, zip_path)
+
+    if args.zip_path is None:
+        os.remove(zip_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+-- Adds a real date column to Competitions, denormalizes it onto Results and
+-- indexes Results by (eventId, personId, date), so that competitor lookups in
+-- PSQLConnection are index range scans instead of a join and sequential scan.
+SET search_path TO wca_results;
+
+BEGIN;
+
+ALTER TABLE Competitions
+    ADD COLUMN date DATE GENERATED ALWAYS AS (make_date(year, month, day)) STORED;
+
+ALTER TABLE Results ADD COLUMN date DATE;
+
+UPDATE Results
+SET date = Competitions.date
+FROM Competitions
+WHERE Competitions.id = Results.competitionId;
+
+ALTER TABLE Results ALTER COLUMN date SET NOT NULL;
+
+CREATE INDEX results_event_person_date_idx ON Results (eventId, personId, date);
+
+COMMIT;
+
+ANALYZE Competitions;
+ANALYZE Results;
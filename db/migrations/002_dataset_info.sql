@@ -0,0 +1,9 @@
+-- Adds the DatasetInfo table, stamped with a version by import.sql and
+-- load_psql.py whenever results are loaded, so PSQLConnection.dataset_version can
+-- tell when cached competitor summaries are out of date. Databases created from
+-- wca_results.ddl already have it.
+SET search_path TO wca_results;
+
+CREATE TABLE IF NOT EXISTS DatasetInfo (
+    version BIGINT NOT NULL
+);
@@ -0,0 +1,249 @@
+from argparse import ArgumentParser
+from time import perf_counter
+import json
+import sys
+import numpy as np
+import pandas as pd
+
+from main import open_backend, print_results, verbose_logging
+from oddsservice import OddsService
+from registry import BACKENDS, SIMULATORS
+
+
+def read_requests(pairs: list[str], path: str | None = None) -> list[tuple[str, str]]:
+    """
+    Collects the (competition ID, event) pairs of a batch.
+
+    Parameters
+    ----------
+    pairs : list[str]
+        Pairs given on the command line as 'competitionId:event'.
+    path : str, optional
+        A file with one 'competitionId event' pair per line, separated by whitespace
+        or a comma, where blank lines and lines starting with '#' are skipped, or
+        '-' to read from standard input (default is None).
+
+    Returns
+    -------
+    list[tuple[str, str]]
+        The pairs, in the order given.
+
+    Raises
+    ------
+    ValueError
+        If a pair is not in the expected format.
+    """
+    lines = [pair.replace(":", " ") for pair in pairs]
+
+    if path is not None:
+        file = sys.stdin if path == "-" else open(path)
+        with file:
+            lines += [line for line in file]
+
+    requests = []
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+
+        fields = line.replace(",", " ").split()
+        if len(fields) != 2:
+            raise ValueError(f"Expected 'competitionId event', got '{line}'")
+        requests.append((fields[0], fields[1]))
+
+    return requests
+
+
+def combine_results(results: dict[tuple[str, str], pd.DataFrame]) -> pd.DataFrame:
+    """
+    Stacks the odds of every request into one table.
+
+    Parameters
+    ----------
+    results : dict[tuple[str, str], pd.DataFrame]
+        The odds of each (competition ID, event) pair.
+
+    Returns
+    -------
+    pd.DataFrame
+        The odds with `competitionId`, `event` and `simulations` columns added, and
+        the `final` odds if rounds were simulated.
+    """
+    frames = [
+        df.assign(
+            competitionId=competition_id,
+            event=event,
+            simulations=df.attrs["simulations"],
+        )
+        for (competition_id, event), df in results.items()
+    ]
+    columns = ["competitionId", "event", "name", "win", "podium"]
+    columns += ["win_ci", "podium_ci", "simulations"]
+
+    if not frames:
+        return pd.DataFrame(columns=columns)
+
+    combined = pd.concat(frames, ignore_index=True)
+    if "final" in combined:
+        columns[5:5] = ["final"]
+        columns[-1:-1] = ["final_ci"]
+    return combined[columns]
+
+
+def main():
+    """
+    Computes the odds of many competitions and events with one data load and pool.
+    """
+    parser = ArgumentParser(
+        prog="WCA Odds Batch",
+        description="Compute odds for many competitions and events in one run",
+    )
+
+    parser.add_argument(
+        "pairs", nargs="*", help="Competition and event pairs as 'competitionId:event'"
+    )
+    parser.add_argument(
+        "-f",
+        "--file",
+        help="File of 'competitionId event' lines, or '-' for standard input",
+    )
+    parser.add_argument(
+        "-d",
+        "--database",
+        default="psql",
+        choices=BACKENDS.names(),
+        help="Database type",
+    )
+    parser.add_argument(
+        "-n",
+        "--num_simulations",
+        default=1000000,
+        type=int,
+        help="Number of simulations to run per event, or the maximum number with "
+        "--tolerance or --time_budget",
+    )
+    parser.add_argument(
+        "-v", "--verbose", action="store_true", help="Enable verbose logging"
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default="table",
+        choices=["table", "csv", "json"],
+        help="Output format",
+    )
+    parser.add_argument(
+        "--processes", type=int, help="Number of worker processes (default: CPUs)"
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Tally results block by block so memory use does not grow with the "
+        "number of simulations",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        help="Stop once the standard error of every probability is below this",
+    )
+    parser.add_argument(
+        "--time_budget",
+        type=float,
+        help="Stop simulating each event after this many seconds",
+    )
+    parser.add_argument(
+        "--float32",
+        action="store_true",
+        help="Simulate attempts in single precision",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        help="Seed the simulation so runs with the same seed and number of "
+        "simulations give the same results",
+    )
+    parser.add_argument(
+        "-c",
+        "--num_competitors",
+        default=16,
+        type=int,
+        help="Number of top ranked competitors to simulate, 0 for the whole field",
+    )
+    parser.add_argument(
+        "-r",
+        "--rounds",
+        action="store_true",
+        help="Simulate every round of each event with its cutoffs, time limits and "
+        "advancement conditions, starting from all registered competitors",
+    )
+    parser.add_argument(
+        "-s",
+        "--summaries",
+        action="store_true",
+        help="Cache fitted competitor summaries in the database or a local file",
+    )
+    parser.add_argument(
+        "--simulator",
+        default="distribution",
+        choices=SIMULATORS.names(),
+        help="Attempt model: 'distribution' fits a gamma distribution to each "
+        "competitor's averages, 'empirical' samples from their weighted solves",
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Only use cached competition data, without contacting the WCA API",
+    )
+    args = parser.parse_args()
+
+    requests = read_requests(args.pairs, args.file)
+    if not requests:
+        parser.error("no competition and event pairs given")
+    if args.summaries and not SIMULATORS.load(args.simulator).uses_summaries:
+        parser.error(f"the {args.simulator} simulator does not use --summaries")
+
+    start_t = perf_counter()
+
+    with verbose_logging(args.verbose, "Loading results"):
+        db_connection, summary_store = open_backend(args.database, args.summaries)
+
+    with OddsService(
+        db_connection, summary_store, args.processes, args.offline
+    ) as service:
+        with verbose_logging(
+            args.verbose, f"Simulating {len(requests)} competitions and events"
+        ):
+            results = service.odds_many(
+                requests,
+                args.num_simulations,
+                rounds=args.rounds,
+                num_competitors=args.num_competitors or None,
+                simulator=args.simulator,
+                stream=args.stream,
+                tolerance=args.tolerance,
+                time_budget=args.time_budget,
+                dtype=np.float32 if args.float32 else np.float64,
+                seed=args.seed,
+            )
+
+    if args.output == "csv":
+        combine_results(results).to_csv(sys.stdout, index=False)
+    elif args.output == "json":
+        json.dump(combine_results(results).to_dict("records"), sys.stdout, indent=2)
+        print()
+    else:
+        adaptive = args.tolerance is not None or args.time_budget is not None
+        for (competition_id, event), df in results.items():
+            print(competition_id)
+            print_results(df, event, show_ci=adaptive)
+            print()
+
+    if args.verbose:
+        print(
+            f"Computed {len(results)} of {len(requests)} in "
+            f"{perf_counter() - start_t:.2f} seconds"
+        )
+
+
+if __name__ == "__main__":
+    main()
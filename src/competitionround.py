@@ -0,0 +1,94 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from formats import round_formats
+
+
+@dataclass
+class CompetitionRound:
+    """
+    Represents one round of an event as scheduled in the WCIF.
+
+    Attributes
+    ----------
+    id : str
+        The WCIF round ID, such as '333-r1'.
+    format : str
+        The WCIF format ID of the round, a key of `round_formats`.
+    time_limit : Optional[int], optional
+        The time limit of each attempt in centiseconds, or of all attempts together
+        if `cumulative` (default is None, no limit).
+    cumulative : bool, optional
+        Whether the time limit is shared by all attempts (default is False).
+    cutoff_attempts : int, optional
+        Number of attempts in which to make the cutoff, 0 if there is no cutoff
+        (default is 0).
+    cutoff_result : Optional[int], optional
+        The result one of the first `cutoff_attempts` attempts must beat to be
+        allowed the remaining attempts (default is None).
+    advancement_type : Optional[str], optional
+        'ranking', 'percent' or 'attemptResult', None for the final round
+        (default is None).
+    advancement_level : Optional[int], optional
+        The number of places, percentage of competitors or result that advances
+        (default is None).
+
+    Methods
+    -------
+    from_wcif(cls, round: dict) -> CompetitionRound
+        Creates a round from a WCIF round object.
+
+    num_attempts(self) -> int
+        The number of attempts in the round.
+    """
+
+    id: str
+    format: str
+    time_limit: Optional[int] = None
+    cumulative: bool = False
+    cutoff_attempts: int = 0
+    cutoff_result: Optional[int] = None
+    advancement_type: Optional[str] = None
+    advancement_level: Optional[int] = None
+
+    @classmethod
+    def from_wcif(cls, round: dict) -> "CompetitionRound":
+        """
+        Creates a round from a WCIF round object.
+
+        Parameters
+        ----------
+        round : dict
+            A round from the `rounds` of a WCIF event.
+
+        Returns
+        -------
+        CompetitionRound
+            The round's format, time limit, cutoff and advancement condition.
+        """
+        time_limit = round.get("timeLimit")
+        cutoff = round.get("cutoff")
+        advancement = round.get("advancementCondition")
+
+        return cls(
+            id=round["id"],
+            format=round["format"],
+            time_limit=time_limit["centiseconds"] if time_limit else None,
+            cumulative=bool(time_limit and time_limit["cumulativeRoundIds"]),
+            cutoff_attempts=cutoff["numberOfAttempts"] if cutoff else 0,
+            cutoff_result=cutoff["attemptResult"] if cutoff else None,
+            advancement_type=advancement["type"] if advancement else None,
+            advancement_level=advancement["level"] if advancement else None,
+        )
+
+    @property
+    def num_attempts(self) -> int:
+        """
+        The number of attempts in the round.
+
+        Returns
+        -------
+        int
+            The number of attempts of the round's format.
+        """
+        return round_formats[self.format]["num_attempts"]
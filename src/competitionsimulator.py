@@ -11,6 +11,9 @@ class CompetitionSimulator(ABC):
     ----------
     db_wrapper : DBWrapper
         Database wrapper instance used for data retrieval.
+    uses_summaries : bool
+        Whether `prepare_data` looks up and saves competitor summaries in a summary
+        store, so one should be passed to the constructor.
 
     Methods
     -------
@@ -24,6 +27,8 @@ class CompetitionSimulator(ABC):
         Abstract method to run the simulation for a given number of times.
     """
 
+    uses_summaries = False
+
     def __init__(self, db_wrapper: DBWrapper):
         """
         Initializes the CompetitionSimulator with a database wrapper instance.
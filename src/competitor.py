@@ -2,6 +2,7 @@ from dataclasses import dataclass, field
 from typing import Optional
 import pandas as pd
 import numpy as np
+from pandas.core.window.ewm import ExponentialMovingWindow
 
 
 @dataclass
@@ -15,12 +16,16 @@ class Competitor:
         Identifier of the competitor.
     name : str
         Name of the competitor.
-    results : pandas.DataFrame
-        DataFrame containing raw results of the competitor.
-    weighted_results : pandas.Series
-        Series containing weighted average results of the competitor.
     dnf_rate : float
         Rate of Did Not Finish (DNF) events for the competitor.
+    mean : float
+        Latest exponentially weighted mean of the competitor's averages.
+    stdev : float
+        Latest exponentially weighted standard deviation of the competitor's averages.
+    results : Optional[pandas.DataFrame], optional
+        DataFrame containing raw results of the competitor (default is None).
+    weighted_results : Optional[pandas.core.window.ewm.ExponentialMovingWindow], optional
+        Exponentially weighted window over the competitor's averages (default is None).
     generated_results : Optional[np.array], optional
         Array of generated results (default is None).
 
@@ -31,7 +36,9 @@ class Competitor:
 
     id: str
     name: str
-    results: pd.DataFrame
-    weighted_results: pd.Series
     dnf_rate: float
+    mean: float
+    stdev: float
+    results: Optional[pd.DataFrame] = None
+    weighted_results: Optional[ExponentialMovingWindow] = None
     generated_results: Optional[np.array] = field(default_factory=lambda: None)
@@ -1,17 +1,43 @@
 from dbwrapper import DBWrapper
+from filesummarystore import FileSummaryStore
+from formats import wca_events
 from pandas.core.api import DataFrame as DataFrame
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as pa_ipc
+import json
 import os
+import shutil
 
 sep = os.path.sep
 
-JOINED_RESULTS_PATH = f"db{sep}results_dump{sep}results_joined.feather"
+JOINED_RESULTS_PATH = f"db{sep}results_dump{sep}results_joined"
+MANIFEST_NAME = "manifest.json"
+INDEX_SUFFIX = ".index.feather"
+# Bumped whenever the partition layout changes, forcing a full rebuild.
+STORE_LAYOUT = 3
+
+VALUE_COLUMNS = ["value1", "value2", "value3", "value4", "value5", "date"]
 
 
 class CSVParser(DBWrapper):
     """
     A class implementing the DBWrapper interface for querying CSV data.
 
+    The joined results are stored as a directory of feather files partitioned by
+    event and competition year, alongside a manifest recording the dataset version
+    and a digest of every competition, so that only partitions with new or changed
+    competitions are rewritten when the source files are updated.
+
+    Each partition holds only the attempt values and date, sorted by (personId, date)
+    and stored uncompressed next to an index of the row range of every personId, so
+    a lookup memory-maps the partitions of a single event and reads only the
+    requested competitors' rows. An update writes partitions to new files and then
+    switches the manifest to them, so a reader never pairs a partition with
+    another version's index, and keeps the files it replaced until the next
+    update for readers that loaded the previous manifest.
+
     Attributes
     ----------
     None
@@ -19,13 +45,34 @@ class CSVParser(DBWrapper):
     Methods
     -------
     __init__(self, results_path: str=f"db{sep}results_dump{sep}Results.csv", comp_path: str=f"db{sep}results_dump{sep}Competitions.csv") -> None
-        Initializes the CSVParser with paths to CSV files and updates the feather file if necessary.
+        Initializes the CSVParser with paths to CSV files and updates the joined results if necessary.
 
     query(self, event: str, names: list[str], length: int=365) -> dict[str, DataFrame]
-        Queries data from the joined feather file based on event and competitor names, up to length days prior.
+        Queries data from the joined results based on event and competitor names, up to length days prior.
+
+    dataset_version(self) -> int
+        Returns the version of the joined results, incremented on every update.
+
+    _fetch_bulk(self, event: str, names: list[str], length: int=365) -> DataFrame
+        Fetches the results of all given competitors in an event with one read per partition.
+
+    _partitions(self, event: str, offset: pd.Timestamp) -> list[str]
+        Lists the partitions of an event that may hold results on or after a date.
 
-    _check_file_update(self, results_path: str, comp_path: str, feather_path: str) -> None
-        Checks and updates the feather file if CSV files are modified.
+    _read_rows(self, partition: str | None, names: list[str]) -> DataFrame
+        Reads the rows of the given competitors from an event partition.
+
+    _load_index(self, partition: str) -> tuple[np.ndarray, np.ndarray, np.ndarray]
+        Loads and caches the row range index of a partition.
+
+    _check_file_update(self, results_path: str, comp_path: str, store_path: str) -> None
+        Checks and incrementally updates the joined results if the source files are modified.
+
+    _resolve_source(path: str) -> str
+        Returns the columnar version of a source file if one was exported and is not older than the CSV file.
+
+    _read_source(path: str) -> DataFrame
+        Reads a CSV or feather source file.
     """
 
     def __init__(
@@ -34,7 +81,7 @@ class CSVParser(DBWrapper):
         comp_path: str = f"db{sep}results_dump{sep}Competitions.csv",
     ) -> None:
         """
-        Initializes the CSVParser with default paths to CSV files and updates the feather file if necessary.
+        Initializes the CSVParser with default paths to CSV files and updates the joined results if necessary.
 
         Parameters
         ----------
@@ -48,13 +95,21 @@ class CSVParser(DBWrapper):
         None
         """
         super().__init__()
-        self._check_file_update(results_path, comp_path, JOINED_RESULTS_PATH)
+        self._indexes = {}
+        self._check_file_update(
+            self._resolve_source(results_path),
+            self._resolve_source(comp_path),
+            JOINED_RESULTS_PATH,
+        )
 
     def query(
         self, event: str, names: list[str], length: int = 365
     ) -> dict[str, DataFrame]:
         """
-        Queries data from the joined feather file based on event and competitor names, up to length days prior.
+        Queries data from the joined results based on event and competitor names, up to length days prior.
+
+        Only partitions of the requested event for competition years that overlap the
+        requested window are read, and within them only the rows of the requested competitors.
 
         Parameters
         ----------
@@ -73,72 +128,566 @@ class CSVParser(DBWrapper):
         offset = pd.Timestamp.today() - pd.DateOffset(days=length)
 
         try:
+            partitions = self._partitions(event, offset)
+
             filtered_results = {}
-            results = pd.read_feather(JOINED_RESULTS_PATH)
             for name in names:
-                res = results.query(
-                    "eventId == @event and personId == @name and date >= @offset"
+                res = pd.concat(
+                    [self._read_rows(partition, [name]) for partition in partitions],
+                    ignore_index=True,
                 )
-                res = res[
-                    [
-                        "value1",
-                        "value2",
-                        "value3",
-                        "value4",
-                        "value5",
-                        "date",
-                    ]
-                ]
-                filtered_results[name] = res
+                res = res[res["date"] >= offset]
+                filtered_results[name] = res.drop(columns=["personId"])
 
             return filtered_results
         except Exception as e:
             print(f"Error querying data: {e}")
             return {}
 
+    def _fetch_bulk(self, event: str, names: list[str], length: int = 365) -> DataFrame:
+        """
+        Fetches the results of all given competitors in an event with one read per partition.
+
+        Parameters
+        ----------
+        event : str
+            The event identifier for filtering results.
+        names : list[str]
+            List of person IDs to retrieve results for.
+        length : int, optional
+            Number of days to limit results by age (default is 365).
+
+        Returns
+        -------
+        DataFrame
+            The results and dates of all competitors, with a `personId` column.
+        """
+        offset = pd.Timestamp.today() - pd.DateOffset(days=length)
+
+        partitions = self._partitions(event, offset)
+
+        results = pd.concat(
+            [self._read_rows(partition, names) for partition in partitions],
+            ignore_index=True,
+        )
+        return results[results["date"] >= offset]
+
+    def dataset_version(self) -> int:
+        """
+        Returns the version of the joined results, incremented on every update.
+
+        Returns
+        -------
+        int
+            The dataset version, or 0 if the joined results have not been built.
+        """
+        manifest = _load_manifest(JOINED_RESULTS_PATH)
+        return 0 if manifest is None else manifest["version"]
+
+    def _partitions(self, event: str, offset: pd.Timestamp) -> list[str]:
+        """
+        Lists the partitions of an event that may hold results on or after a date.
+
+        Parameters
+        ----------
+        event : str
+            The event identifier.
+        offset : pd.Timestamp
+            The earliest date of interest.
+
+        Returns
+        -------
+        list[str]
+            Paths to the partition feather files.
+
+        Raises
+        ------
+        ValueError
+            If the event is not a WCA event.
+        """
+        if event not in wca_events:
+            raise ValueError(f"Unknown event: {event}")
+
+        manifest = _load_manifest(JOINED_RESULTS_PATH)
+        partitions = manifest["partitions"].get(event, {})
+
+        return [
+            os.path.join(JOINED_RESULTS_PATH, file_name)
+            for year, file_name in sorted(partitions.items())
+            if int(year) >= offset.year
+        ] or [None]
+
+    def _read_rows(self, partition: str | None, names: list[str]) -> DataFrame:
+        """
+        Reads the rows of the given competitors from an event partition.
+
+        Parameters
+        ----------
+        partition : str or None
+            Path to the partition feather file, or None for an empty result.
+        names : list[str]
+            List of person IDs.
+
+        Returns
+        -------
+        DataFrame
+            The competitors' results and dates with a `personId` column, ordered by
+            competitor and then by date.
+        """
+        if partition is None:
+            return DataFrame(
+                {column: pd.Series(dtype="int32") for column in VALUE_COLUMNS}
+                | {
+                    "date": pd.Series(dtype="datetime64[ns]"),
+                    "personId": pd.Series(dtype=object),
+                }
+            )
+
+        keys, starts, stops = self._load_index(partition)
+        lookup = np.asarray(names, dtype=object)
+        pos = np.minimum(np.searchsorted(keys, lookup), len(keys) - 1)
+        found = keys[pos] == lookup
+
+        lengths = (stops[pos] - starts[pos])[found]
+        offsets = np.repeat(starts[pos][found] - np.cumsum(lengths) + lengths, lengths)
+        rows = offsets + np.arange(lengths.sum())
+
+        with pa.memory_map(partition) as source:
+            table = pa_ipc.open_file(source).read_all()
+            results = table.select(VALUE_COLUMNS).take(rows).to_pandas()
+
+        results["personId"] = np.repeat(lookup[found], lengths)
+        return results
+
+    def _load_index(self, partition: str) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Loads and caches the row range index of a partition.
+
+        Parameters
+        ----------
+        partition : str
+            Path to the partition feather file.
+
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray, np.ndarray]
+            The sorted person IDs and the start and stop row of each person.
+        """
+        index_path = partition.removesuffix(".feather") + INDEX_SUFFIX
+        mod_time = os.path.getmtime(index_path)
+
+        cached = self._indexes.get(partition)
+        if cached is None or cached[0] != mod_time:
+            index_df = pd.read_feather(index_path)
+            cached = (
+                mod_time,
+                index_df["personId"].to_numpy(dtype=object),
+                index_df["start"].to_numpy(),
+                index_df["stop"].to_numpy(),
+            )
+            self._indexes[partition] = cached
+
+        return cached[1:]
+
     def _check_file_update(
-        self, results_path: str, comp_path: str, feather_path: str
+        self, results_path: str, comp_path: str, store_path: str
     ) -> None:
         """
-        Checks and updates the feather file if the Results and Competitions CSV files are modified.
+        Checks and incrementally updates the joined results if the Results and Competitions source files are modified.
+
+        Every competition is summarised by a digest of its date and result rows. Competitions
+        whose digest differs from the one in the manifest are new, changed or removed, and
+        only the year partitions containing them are rebuilt.
 
         Parameters
         ----------
         results_path : str
-            Path to the Results CSV file.
+            Path to the Results CSV or feather file.
         comp_path : str
-            Path to the Competitions CSV file.
-        feather_path : str
-            Path to the joined feather file.
+            Path to the Competitions CSV or feather file.
+        store_path : str
+            Path to the directory holding the joined, partitioned results.
 
         Returns
         -------
         None
         """
         try:
-            if os.path.exists(feather_path):
-                feather_mod_time = os.path.getmtime(feather_path)
+            manifest = _load_manifest(store_path)
+            manifest_path = os.path.join(store_path, MANIFEST_NAME)
+
+            if manifest is not None:
+                manifest_mod_time = os.path.getmtime(manifest_path)
             else:
-                feather_mod_time = None
+                manifest_mod_time = None
+
+            if manifest is not None and manifest.get("layout") != STORE_LAYOUT:
+                shutil.rmtree(store_path)
+                manifest = _empty_manifest(manifest["version"])
+                manifest_mod_time = None
 
             competitions_mod_time = os.path.getmtime(comp_path)
             results_mod_time = os.path.getmtime(results_path)
 
-            if (
-                feather_mod_time is None
-                or competitions_mod_time > feather_mod_time
-                or results_mod_time > feather_mod_time
+            if not (
+                manifest_mod_time is None
+                or competitions_mod_time > manifest_mod_time
+                or results_mod_time > manifest_mod_time
             ):
-                print("Results file out of date, updating (this could take a while)")
-                competitions_df = pd.read_csv(comp_path)
-                results_df = pd.read_csv(results_path)
-                merged_df = pd.merge(
-                    competitions_df, results_df, left_on="id", right_on="competitionId"
+                return
+
+            print("Results file out of date, updating (this could take a while)")
+            competitions_df = self._read_source(comp_path)
+            results_df = self._read_source(results_path)
+
+            competitions_df["date"] = pd.to_datetime(
+                competitions_df[["year", "month", "day"]]
+            )
+            competitions_df.drop(columns=["month", "day"], inplace=True)
+
+            digests = _competition_digests(competitions_df, results_df)
+
+            if manifest is None:
+                manifest = _empty_manifest(0)
+
+            # Readers may still be using the files of the current manifest, so they
+            # are only removed by the next update.
+            previous_files = _partition_files(manifest)
+            version = manifest["version"] + 1
+
+            old_competitions = manifest["competitions"]
+            new_competitions = {
+                comp_id: [int(year), digest]
+                for comp_id, year, digest in zip(
+                    competitions_df["id"], competitions_df["year"], digests
                 )
+            }
+
+            changed = {
+                comp_id
+                for comp_id, (year, digest) in new_competitions.items()
+                if old_competitions.get(comp_id, [None, None])[1] != digest
+            }
+            changed |= old_competitions.keys() - new_competitions.keys()
 
-                merged_df["date"] = pd.to_datetime(merged_df[["year", "month", "day"]])
-                merged_df.drop(columns=["year", "month", "day"], inplace=True)
+            # A changed competition may have moved from another year, whose
+            # partition must drop its results, as must a removed one's.
+            changed_years = {
+                competitions[comp_id][0]
+                for competitions in (old_competitions, new_competitions)
+                for comp_id in changed
+                if comp_id in competitions
+            }
 
-                merged_df.to_feather(feather_path)
+            os.makedirs(store_path, exist_ok=True)
+            competitions_df = competitions_df[
+                competitions_df["year"].isin(changed_years)
+            ]
+            results_df = results_df[
+                results_df["competitionId"].isin(competitions_df["id"])
+            ]
+            merged_df = pd.merge(
+                competitions_df, results_df, left_on="id", right_on="competitionId"
+            )
+            merged_df = merged_df[["eventId", "year", "personId"] + VALUE_COLUMNS]
+
+            stale = {
+                (event, int(year))
+                for event, years in manifest["partitions"].items()
+                for year in years
+                if int(year) in changed_years
+            }
+
+            for (event, year), partition_df in merged_df.groupby(
+                ["eventId", "year"], observed=True
+            ):
+                year = int(year)
+                file_name = _write_partition(
+                    store_path, event, year, partition_df, version
+                )
+                manifest["partitions"].setdefault(event, {})[str(year)] = file_name
+                stale.discard((event, year))
+
+            for event, year in stale:
+                manifest["partitions"][event].pop(str(year))
+
+            manifest["version"] = version
+            manifest["competitions"] = new_competitions
+            _save_manifest(store_path, manifest)
+            _remove_unreferenced(
+                store_path, previous_files | _partition_files(manifest)
+            )
+
+            print(f"Updated {len(changed_years)} year(s) of partitions")
         except Exception as e:
             print(f"Error updating file: {e}")
+
+    @staticmethod
+    def _resolve_source(path: str) -> str:
+        """
+        Returns the columnar version of a source file if one was exported.
+
+        `db/get_results.py --format feather` writes Results.feather and
+        Competitions.feather instead of CSV files, these are preferred when present,
+        unless the CSV file was exported after them.
+
+        Parameters
+        ----------
+        path : str
+            Path to the CSV source file.
+
+        Returns
+        -------
+        str
+            Path to the feather source file if it exists and is at least as new as
+            the CSV file, otherwise `path`.
+        """
+        feather_path = os.path.splitext(path)[0] + ".feather"
+        if not os.path.exists(feather_path):
+            return path
+        if os.path.exists(path) and os.path.getmtime(path) > os.path.getmtime(
+            feather_path
+        ):
+            return path
+        return feather_path
+
+    @staticmethod
+    def _read_source(path: str) -> DataFrame:
+        """
+        Reads a CSV or feather source file.
+
+        Parameters
+        ----------
+        path : str
+            Path to the source file.
+
+        Returns
+        -------
+        DataFrame
+            The contents of the source file.
+        """
+        if path.endswith(".feather"):
+            return pd.read_feather(path)
+        return pd.read_csv(path)
+
+
+def open_backend(summaries: bool = False) -> tuple[CSVParser, FileSummaryStore | None]:
+    """
+    Opens the feather store built from the export files, updating it if needed.
+
+    Parameters
+    ----------
+    summaries : bool, optional
+        Whether to also open the local summary file (default is False).
+
+    Returns
+    -------
+    tuple[CSVParser, FileSummaryStore | None]
+        The parser and the summary store, or None if summaries are off.
+    """
+    db_connection = CSVParser()
+    summary_store = FileSummaryStore() if summaries else None
+
+    return db_connection, summary_store
+
+
+def _competition_digests(competitions: DataFrame, results: DataFrame) -> list[int]:
+    """
+    Computes an order-independent digest of every competition's date and result rows.
+
+    Parameters
+    ----------
+    competitions : DataFrame
+        Competitions with `id` and `date` columns.
+    results : DataFrame
+        Results with a `competitionId` column.
+
+    Returns
+    -------
+    list[int]
+        The digest of each competition, in the order of `competitions`.
+    """
+    row_hashes = pd.util.hash_pandas_object(results, index=False)
+    result_digests = row_hashes.groupby(results["competitionId"].to_numpy()).sum()
+
+    date_hashes = pd.util.hash_pandas_object(competitions["date"], index=False)
+    digests = date_hashes.to_numpy() ^ result_digests.reindex(
+        competitions["id"], fill_value=0
+    ).to_numpy(dtype="uint64")
+
+    return [int(digest) for digest in digests]
+
+
+def _write_partition(
+    store_path: str, event: str, year: int, partition: DataFrame, version: int
+) -> str:
+    """
+    Writes one event and year partition and its row range index.
+
+    Both files are named after the store version, so they never replace files a
+    reader may have open, and each is written to a temporary file first, so a
+    reader never sees a partial file. They are used once the manifest points to
+    them.
+
+    Parameters
+    ----------
+    store_path : str
+        Path to the directory holding the joined results.
+    event : str
+        The event identifier.
+    year : int
+        The competition year.
+    partition : DataFrame
+        The partition's rows, with `personId` and the value columns.
+    version : int
+        The store version the partition is written for.
+
+    Returns
+    -------
+    str
+        Path to the partition file, relative to `store_path`.
+    """
+    file_name = f"eventId={event}{sep}year={year}.v{version}.feather"
+    partition_path = os.path.join(store_path, file_name)
+    index_path = partition_path.removesuffix(".feather") + INDEX_SUFFIX
+    os.makedirs(os.path.dirname(partition_path), exist_ok=True)
+
+    partition = partition.sort_values(["personId", "date"], kind="stable")
+
+    sizes = partition.groupby("personId", sort=True).size()
+    stops = sizes.cumsum().to_numpy()
+    index = DataFrame(
+        {
+            "personId": sizes.index.to_numpy(dtype=object),
+            "start": stops - sizes.to_numpy(),
+            "stop": stops,
+        }
+    )
+
+    partition[VALUE_COLUMNS].reset_index(drop=True).to_feather(
+        f"{partition_path}.tmp", compression="uncompressed"
+    )
+    index.to_feather(f"{index_path}.tmp")
+    os.replace(f"{partition_path}.tmp", partition_path)
+    os.replace(f"{index_path}.tmp", index_path)
+
+    return file_name
+
+
+def _partition_files(manifest: dict) -> set[str]:
+    """
+    Lists the partition files a manifest points to.
+
+    Parameters
+    ----------
+    manifest : dict
+        The manifest of the joined results.
+
+    Returns
+    -------
+    set[str]
+        Paths to the partition files, relative to the store.
+    """
+    return {
+        file_name
+        for years in manifest["partitions"].values()
+        for file_name in years.values()
+    }
+
+
+def _remove_unreferenced(store_path: str, keep: set[str]) -> None:
+    """
+    Removes the partition files and indexes, and leftover temporary files, that
+    are not kept.
+
+    Parameters
+    ----------
+    store_path : str
+        Path to the directory holding the joined results.
+    keep : set[str]
+        Paths to the partition files to keep, relative to `store_path`.
+
+    Returns
+    -------
+    None
+    """
+    for directory, _, names in os.walk(store_path):
+        for name in names:
+            path = os.path.join(directory, name)
+            if name.endswith(INDEX_SUFFIX):
+                partition = path.removesuffix(INDEX_SUFFIX) + ".feather"
+            elif name.endswith((".feather", ".feather.tmp")):
+                partition = path
+            else:
+                continue
+
+            if os.path.relpath(partition, store_path) not in keep:
+                os.remove(path)
+
+
+def _empty_manifest(version: int) -> dict:
+    """
+    Creates the manifest of an empty store in the current layout.
+
+    Parameters
+    ----------
+    version : int
+        The dataset version to continue counting from.
+
+    Returns
+    -------
+    dict
+        The manifest.
+    """
+    return {
+        "layout": STORE_LAYOUT,
+        "version": version,
+        "competitions": {},
+        "partitions": {},
+    }
+
+
+def _load_manifest(store_path: str) -> dict | None:
+    """
+    Loads the manifest of the joined results.
+
+    Parameters
+    ----------
+    store_path : str
+        Path to the directory holding the joined results.
+
+    Returns
+    -------
+    dict or None
+        The manifest, or None if the joined results have not been built.
+    """
+    manifest_path = os.path.join(store_path, MANIFEST_NAME)
+    if not os.path.exists(manifest_path):
+        return None
+
+    with open(manifest_path) as f:
+        return json.load(f)
+
+
+def _save_manifest(store_path: str, manifest: dict) -> None:
+    """
+    Atomically replaces the manifest of the joined results.
+
+    Parameters
+    ----------
+    store_path : str
+        Path to the directory holding the joined results.
+    manifest : dict
+        The manifest to save.
+
+    Returns
+    -------
+    None
+    """
+    manifest_path = os.path.join(store_path, MANIFEST_NAME)
+    tmp_path = f"{manifest_path}.tmp"
+
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f)
+
+    os.replace(tmp_path, manifest_path)
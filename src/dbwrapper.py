@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+import pandas as pd
 from pandas.core.api import DataFrame as DataFrame
 
 
@@ -14,25 +15,162 @@ class DBWrapper(ABC):
 
     Methods
     -------
-    query(query: str, args: tuple[str]) -> DataFrame
-        Abstract method to execute a query and return results as a pandas DataFrame.
+    query(event: str, names: list[str], length: int = 365) -> dict[str, DataFrame]
+        Abstract method to retrieve the results of each competitor in an event.
+
+    query_bulk(event: str, names: list[str], length: int = 365) -> dict[str, DataFrame]
+        Retrieves the results of all competitors in an event in a single pass.
+
+    query_frame(event: str, names: list[str], length: int = 365) -> DataFrame
+        Retrieves the results of all competitors in an event as one frame.
+
+    dataset_version() -> int | None
+        Returns a version identifying the current contents of the database.
+
+    _fetch_bulk(event: str, names: list[str], length: int = 365) -> DataFrame
+        Fetches the results of all competitors in an event as one frame.
     """
 
     @abstractmethod
-    def query(self, query: str, args: tuple[str]) -> DataFrame:
+    def query(
+        self, event: str, names: list[str], length: int = 365
+    ) -> dict[str, DataFrame]:
         """
-        Execute a query and return results as a pandas DataFrame.
+        Retrieve the results of each competitor in an event.
 
         Parameters
         ----------
-        query : str
-            SQL query to execute.
-        args : tuple[str]
-            Arguments to pass to the query.
+        event : str
+            The event identifier for filtering results.
+        names : list[str]
+            List of person IDs to retrieve results for.
+        length : int, optional
+            Number of days to limit results by age (default is 365).
 
         Returns
         -------
-        pandas.DataFrame
-            DataFrame containing the query results.
+        dict[str, DataFrame]
+            A dictionary mapping person IDs to pandas DataFrames of query results.
         """
         pass
+
+    def query_bulk(
+        self, event: str, names: list[str], length: int = 365
+    ) -> dict[str, DataFrame]:
+        """
+        Retrieve the results of all competitors in an event in a single pass.
+
+        The rows are fetched together by `_fetch_bulk` and split into one frame per
+        competitor with a single groupby. Backends that do not implement `_fetch_bulk`
+        fall back to `query`.
+
+        Parameters
+        ----------
+        event : str
+            The event identifier for filtering results.
+        names : list[str]
+            List of person IDs to retrieve results for.
+        length : int, optional
+            Number of days to limit results by age (default is 365).
+
+        Returns
+        -------
+        dict[str, DataFrame]
+            A dictionary mapping person IDs to pandas DataFrames of query results.
+        """
+        names = list(names)
+
+        try:
+            results = self._fetch_bulk(event, names, length)
+        except NotImplementedError:
+            return self.query(event, names, length)
+
+        columns = results.columns.drop("personId")
+        groups = {
+            id: group[columns]
+            for id, group in results.groupby("personId", sort=False, observed=True)
+        }
+        empty = results.iloc[:0][columns]
+
+        return {id: groups.get(id, empty) for id in names}
+
+    def query_frame(self, event: str, names: list[str], length: int = 365) -> DataFrame:
+        """
+        Retrieve the results of all competitors in an event as one frame.
+
+        Unlike `query_bulk`, the rows are not split per competitor, for callers that
+        process every competitor at once. Backends that do not implement
+        `_fetch_bulk` fall back to `query`.
+
+        Parameters
+        ----------
+        event : str
+            The event identifier for filtering results.
+        names : list[str]
+            List of person IDs to retrieve results for.
+        length : int, optional
+            Number of days to limit results by age (default is 365).
+
+        Returns
+        -------
+        DataFrame
+            The results of all competitors, with a `personId` column. Each
+            competitor's rows keep the order `query` would return them in.
+        """
+        names = list(names)
+
+        try:
+            return self._fetch_bulk(event, names, length)
+        except NotImplementedError:
+            results = self.query(event, names, length)
+
+        if not results:
+            # There is nothing to concatenate, so build the schema the backends use.
+            return DataFrame(
+                {
+                    **{f"value{i}": pd.Series(dtype="int32") for i in range(1, 6)},
+                    "date": pd.Series(dtype="datetime64[ns]"),
+                    "personId": pd.Series(dtype=object),
+                }
+            )
+
+        return pd.concat(
+            [df.assign(personId=id) for id, df in results.items()], ignore_index=True
+        )
+
+    def dataset_version(self) -> int | None:
+        """
+        Return a version identifying the current contents of the database.
+
+        Returns
+        -------
+        int or None
+            A version that changes whenever the results change, or None if the
+            backend cannot tell, in which case nothing derived from it is cached.
+        """
+        return None
+
+    def _fetch_bulk(self, event: str, names: list[str], length: int = 365) -> DataFrame:
+        """
+        Fetch the results of all competitors in an event as one frame.
+
+        Parameters
+        ----------
+        event : str
+            The event identifier for filtering results.
+        names : list[str]
+            List of person IDs to retrieve results for.
+        length : int, optional
+            Number of days to limit results by age (default is 365).
+
+        Returns
+        -------
+        pandas.DataFrame
+            DataFrame with a `personId` column alongside the result columns.
+
+        Raises
+        ------
+        NotImplementedError
+            If the backend has no native bulk lookup.
+        """
+        raise NotImplementedError
@@ -1,12 +1,44 @@
+from collections import deque
+from contextlib import nullcontext
+from dataclasses import replace
 from multiprocessing import Pool
+from time import perf_counter
+import os
 import numpy as np
 import pandas as pd
 from pandas.core.api import DataFrame as DataFrame
 
+from competitionround import CompetitionRound
 from competitionsimulator import CompetitionSimulator
 from competitor import Competitor
 from formats import event_formats
-from multi_sim import multi_simulation_thread
+from multi_round import iter_rounds, tally_rounds
+from multi_sim import (
+    chunk_size,
+    iter_field,
+    simulate_field,
+    tally_field,
+    tally_results,
+)
+from stageprofiler import StageProfiler, profile_stage, run_timed
+from summarystore import SummaryStore
+
+SUMMARY_KEYS = ["mean", "stdev", "dnf_rate"]
+
+# Below this many attempt draws, pool startup and result transfer cost more than
+# the parallel speedup gains.
+POOL_MIN_DRAWS = 10_000_000
+
+# A pool that is already running only has the result transfer to amortize.
+WARM_POOL_MIN_DRAWS = 2_000_000
+
+# Most simulations per pool task.
+POOL_BLOCK_SIZE = 1 << 18
+
+# Larger (competitors, simulations) result matrices are always streamed.
+MAX_FIELD_ELEMENTS = 1 << 26
+
+Z_95 = 1.96
 
 
 class DistributionSamplingSimulator(CompetitionSimulator):
@@ -19,20 +51,57 @@ class DistributionSamplingSimulator(CompetitionSimulator):
         List of Competitor objects representing competitors in the simulation.
     event : str
         The event identifier for which the simulation is being performed.
+    summary_store : SummaryStore or None
+        Store of precomputed competitor summaries.
+    pool : multiprocessing.pool.Pool or None
+        A long-lived worker pool shared across runs.
+    profiler : StageProfiler or None
+        Records the time and memory of each stage of preparing and simulating.
 
     Methods
     -------
-    __init__(self, db_wrapper)
+    __init__(self, db_wrapper, summary_store=None, pool=None, profiler=None)
         Initializes the DistributionSamplingSimulator with a database wrapper.
 
-    prepare_data(self, event, competitors, halflife='180 days')
+    prepare_data(self, event, competitors, halflife='180 days', window=365)
         Prepares data for simulation based on competitors and event details.
 
-    run_simulation(self, count) -> pd.DataFrame
+    run_simulation(self, count, engine='auto', stream=False, tolerance=None, time_budget=None, dtype=np.float64, seed=None, rounds=None, placements=False) -> pd.DataFrame
         Runs the simulation for the given number of times and returns simulation results.
+
+    detach(self) -> DistributionSamplingSimulator
+        Returns a copy holding only what is needed to simulate.
+
+    _field_parameters(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]
+        Collects the simulation parameters of every competitor.
+
+    _iter_pool(self, count, block_size, dtype, seed, rounds, placements)
+        Simulates blocks of the whole field in worker processes.
+
+    _iter_tasks(self, pool, count, block_size, dtype, seed, rounds, placements)
+        Submits blocks of simulations to a worker pool and yields their tallies.
+
+    _choose_engine(self, count) -> str
+        Picks the simulation engine for a run.
     """
 
-    def __init__(self, db_wrapper):
+    uses_summaries = True
+
+    # The model's simulation functions, each taking `_field_parameters()` first, so
+    # subclasses can swap the model and keep every engine.
+    _simulate_field = staticmethod(simulate_field)
+    _iter_field = staticmethod(iter_field)
+    _tally_field = staticmethod(tally_field)
+    _iter_rounds = staticmethod(iter_rounds)
+    _tally_rounds = staticmethod(tally_rounds)
+
+    def __init__(
+        self,
+        db_wrapper,
+        summary_store: SummaryStore | None = None,
+        pool=None,
+        profiler: StageProfiler | None = None,
+    ):
         """
         Initializes the DistributionSamplingSimulator with a database wrapper.
 
@@ -40,16 +109,36 @@ class DistributionSamplingSimulator(CompetitionSimulator):
         ----------
         db_wrapper : DBWrapper
             Database wrapper providing access to competition data.
+        summary_store : SummaryStore, optional
+            Store of precomputed competitor summaries, consulted before querying
+            and fitting raw results (default is None).
+        pool : multiprocessing.pool.Pool, optional
+            Worker pool for the 'pool' engine. If None, a pool is started and torn
+            down on every run (default is None).
+        profiler : StageProfiler, optional
+            Records the 'lookup', 'query' and 'fit' stages of `prepare_data` and
+            the 'draw' and 'aggregate' stages of `run_simulation`, and the time of
+            pool workers (default is None).
         """
         super().__init__(db_wrapper)
+        self.summary_store = summary_store
+        self.pool = pool
+        self.profiler = profiler
         self.competitors = []
 
     def prepare_data(
-        self, event: str, competitors: list[dict[str, str]], halflife: str = "180 days"
+        self,
+        event: str,
+        competitors: list[dict[str, str]],
+        halflife: str = "180 days",
+        window: int = 365,
     ):
         """
         Prepares data for simulation.
 
+        Competitors with a valid summary in the summary store are not queried, the
+        rest are fitted from their raw results and their summaries are saved.
+
         Parameters
         ----------
         event : str
@@ -58,83 +147,555 @@ class DistributionSamplingSimulator(CompetitionSimulator):
             List of competitors with their IDs and names.
         halflife : str, optional
             Halflife for exponential weighted moving average (default is '180 days').
+        window : int, optional
+            Number of days of results to use (default is 365).
         """
         self.competitors = []
         self.event = event
 
         name_mappings = {i["id"]: i["name"] for i in competitors}
-
-        data = self.db_wrapper.query(event, name_mappings.keys())
         num_attempts = event_formats[self.event]["num_attempts"]
 
-        for id, df in data.items():
-            date_label = pd.to_datetime(df.iloc[:, num_attempts])
-            results = df.iloc[:, :5]
+        version = None
+        summaries = pd.DataFrame(columns=["mean", "stdev", "dnf_rate"])
+        if self.summary_store is not None:
+            with profile_stage(self.profiler, "lookup"):
+                version = self.db_wrapper.dataset_version()
+                summaries = self.summary_store.lookup(
+                    event, list(name_mappings.keys()), window, halflife, version
+                )
 
-            total_attempts = results.shape[0] * results.shape[1]
+        missing = [id for id in name_mappings if id not in summaries.index]
 
-            if total_attempts == 0:
-                continue
+        fitted = pd.DataFrame(columns=SUMMARY_KEYS + ["first_date"])
+        if missing:
+            with profile_stage(self.profiler, "query"):
+                results = self.db_wrapper.query_frame(event, missing, window)
+            with profile_stage(self.profiler, "fit"):
+                fitted = fit_field(results, num_attempts, halflife)
 
-            averages = results[results > 0].mean(axis=1)
-            dnf_count = (results < 0).to_numpy().sum()
-            dnf_rate = 0 if total_attempts == 0 else dnf_count / total_attempts
-            df = pd.Series(averages)
+        if self.summary_store is not None:
+            self.summary_store.save(event, window, halflife, version, fitted)
 
-            weighted_series = pd.Series.ewm(
-                df, span=averages.shape[0], times=date_label, halflife=halflife
-            )
+        fits = summaries[SUMMARY_KEYS].to_dict("index")
+        fits.update(fitted[SUMMARY_KEYS].to_dict("index"))
+
+        for id in name_mappings:
+            if id not in fits:
+                continue
+            fit = fits[id]
 
             competitor = Competitor(
                 id=id,
                 name=name_mappings[id],
-                results=results,
-                weighted_results=weighted_series,
-                dnf_rate=dnf_rate,
+                dnf_rate=fit["dnf_rate"],
+                mean=fit["mean"],
+                stdev=fit["stdev"],
             )
 
             self.competitors.append(competitor)
 
-    def run_simulation(self, count: int) -> pd.DataFrame:
+    def run_simulation(
+        self,
+        count: int,
+        engine: str = "auto",
+        stream: bool = False,
+        tolerance: float | None = None,
+        time_budget: float | None = None,
+        dtype: np.dtype = np.float64,
+        seed: int | None = None,
+        rounds: list[CompetitionRound] | None = None,
+        placements: bool = False,
+    ) -> pd.DataFrame:
         """
         Runs the simulation for the given number of times.
 
+        If a `tolerance` or `time_budget` is given, the simulation runs in rounds and
+        stops early once the standard error of every win and podium probability is
+        below `tolerance`, or once `time_budget` seconds have passed, with `count`
+        as the maximum number of simulations.
+
         Parameters
         ----------
         count : int
             Number of simulations to run.
+        engine : str, optional
+            'vectorized' draws every competitor at once in this process, 'pool'
+            splits the simulations across worker processes that each return only
+            their tallies, and 'auto' picks 'vectorized' unless the simulation is
+            large enough to amortize starting a pool (default is 'auto').
+        stream : bool, optional
+            Simulate in blocks and tally wins and podiums as each block completes,
+            so peak memory does not grow with `count`. Large fields are always
+            streamed (default is False).
+        tolerance : float, optional
+            Target standard error of every reported probability (default is None).
+        time_budget : float, optional
+            Maximum number of seconds to simulate for (default is None).
+        dtype : np.dtype, optional
+            Floating point type used to simulate attempts, float32 halves memory
+            traffic at the cost of precision (default is float64).
+        seed : int, optional
+            Root seed of the random streams. A fixed seed and `count` give the same
+            results with either engine and any number of workers. Fresh entropy is
+            used if None (default is None).
+        rounds : list[CompetitionRound], optional
+            The rounds of the event. If given, every round is simulated with its
+            cutoff, time limit and advancement condition, and the chance of making
+            the final round is reported. If None, only a single final between all
+            competitors is simulated (default is None).
+        placements : bool, optional
+            Also estimate the probability of each competitor finishing in every
+            place, which needs a full sort of every simulated final (default is
+            False).
 
         Returns
         -------
         pd.DataFrame
-            DataFrame with simulation results, including win and podium probabilities.
+            DataFrame with simulation results, including win and podium probabilities
+            and the half-widths of their 95% confidence intervals, and the `final`
+            probability if `rounds` were given. The number of simulations run is
+            stored in `attrs["simulations"]`, and with `placements` a DataFrame of
+            the probability of each competitor (rows) finishing in each place
+            (columns, from 1) is stored in `attrs["placements"]`.
+
+        Raises
+        ------
+        ValueError
+            If `rounds` is given but empty.
         """
+        if rounds is not None and not rounds:
+            raise ValueError("rounds must include at least the final round")
+
         num_competitors = len(self.competitors)
+        if num_competitors == 0:
+            # Nothing to draw, and blocks are sized per competitor.
+            return empty_results(rounds is not None, placements)
+
+        adaptive = tolerance is not None or time_budget is not None
+        stream = stream or adaptive or num_competitors * count > MAX_FIELD_ELEMENTS
+
+        if engine == "auto":
+            engine = self._choose_engine(count)
 
-        args = [
-            (comp.weighted_results, comp.dnf_rate, self.event, count)
-            for comp in self.competitors
+        seed = np.random.SeedSequence(seed).entropy
+
+        if engine == "vectorized" and rounds is not None:
+            params = self._field_parameters()
+            tallies = self._iter_rounds(
+                *params, self.event, rounds, count, dtype, seed, 0, placements
+            )
+        elif engine == "vectorized":
+            params = self._field_parameters()
+            if stream:
+                blocks = self._iter_field(*params, self.event, count, dtype, seed)
+            else:
+                # Drawn lazily, so it is recorded as a 'draw' step like a streamed
+                # block.
+                blocks = (
+                    self._simulate_field(*params, self.event, count, dtype, seed)
+                    for _ in range(1)
+                )
+            tallies = (
+                (tally_results(block, placements), block.shape[1]) for block in blocks
+            )
+        elif engine == "pool":
+            # Enough tasks that every worker gets some, in whole random stream chunks.
+            chunk = chunk_size(num_competitors, self.event)
+            block_size = min(POOL_BLOCK_SIZE, -(-count // (os.cpu_count() or 1)))
+            block_size = -(-block_size // chunk) * chunk
+            tallies = self._iter_pool(
+                count, block_size, dtype, seed, rounds, placements
+            )
+        else:
+            raise ValueError(f"Unknown simulation engine: {engine}")
+
+        # Wins, podiums and, with rounds, final round appearances of each competitor,
+        # followed by a row per place with `placements`.
+        num_outcomes = 2 if rounds is None else 3
+        num_rows = num_outcomes + num_competitors if placements else num_outcomes
+        totals = np.zeros((num_rows, num_competitors), np.int64)
+        simulations = 0
+        start_t = perf_counter()
+
+        if self.profiler is not None:
+            tallies = self.profiler.iterate("draw", tallies)
+
+        for block_totals, block in tallies:
+            with profile_stage(self.profiler, "aggregate"):
+                totals += block_totals
+                simulations += block
+
+                done = adaptive and (
+                    (time_budget is not None and perf_counter() - start_t > time_budget)
+                    or (
+                        tolerance is not None
+                        and standard_error(totals[:num_outcomes], simulations).max()
+                        < tolerance
+                    )
+                )
+            if done:
+                break
+
+        tallies.close()
+
+        competitor_names = [competitor.name for competitor in self.competitors]
+
+        outcomes = totals[:num_outcomes]
+        data = {"name": competitor_names}
+        for column, counts in zip(["win", "podium", "final"], outcomes):
+            data[column] = counts / simulations
+        for column, counts in zip(["win_ci", "podium_ci", "final_ci"], outcomes):
+            data[column] = Z_95 * standard_error(counts, simulations)
+
+        results = pd.DataFrame(data).sort_values(by="win", ascending=False)
+        results.attrs["simulations"] = simulations
+
+        if placements:
+            places = pd.DataFrame(
+                totals[num_outcomes:].T / simulations,
+                index=competitor_names,
+                columns=range(1, num_competitors + 1),
+            )
+            results.attrs["placements"] = places.iloc[results.index]
+
+        return results
+
+    def detach(self) -> "DistributionSamplingSimulator":
+        """
+        Returns a copy holding only what is needed to simulate.
+
+        The copy has no database wrapper, summary store or pool, and its competitors
+        do not carry their raw results, so it is cheap to send to a worker process.
+
+        Returns
+        -------
+        DistributionSamplingSimulator
+            A simulator of the same type that can run `run_simulation` but not
+            `prepare_data`.
+        """
+        detached = type(self)(None)
+        detached.event = self.event
+        detached.competitors = [
+            replace(competitor, results=None, weighted_results=None)
+            for competitor in self.competitors
         ]
 
+        return detached
+
+    def _field_parameters(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Collects the simulation parameters of every competitor.
+
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray, np.ndarray]
+            The means, standard deviations and DNF rates of the competitors.
+        """
+        return (
+            np.array([comp.mean for comp in self.competitors]),
+            np.array([comp.stdev for comp in self.competitors]),
+            np.array([comp.dnf_rate for comp in self.competitors]),
+        )
+
+    def _iter_pool(
+        self,
+        count: int,
+        block_size: int,
+        dtype: np.dtype,
+        seed: int,
+        rounds: list[CompetitionRound] | None,
+        placements: bool,
+    ):
+        """
+        Simulates blocks of the whole field in worker processes.
+
+        Each task simulates every competitor for a block of simulations and returns
+        only its tallies. At most two tasks per worker are in flight,
+        so closing the generator early stops submitting work to a shared pool.
+
+        Parameters
+        ----------
+        count : int
+            Total number of simulations to run.
+        block_size : int
+            Number of simulations per task, a multiple of `chunk_size`.
+        dtype : np.dtype
+            Floating point type used to simulate attempts.
+        seed : int
+            Root seed of the random streams.
+        rounds : list[CompetitionRound] or None
+            The rounds of the event, or None to simulate a single final.
+        placements : bool
+            Whether to also count how often each competitor finishes in every place.
+
+        Yields
+        ------
+        tuple[np.ndarray, int]
+            The tallies of each competitor in a block, and its size.
+        """
+        args = (count, block_size, dtype, seed, rounds, placements)
+
+        if self.pool is not None:
+            yield from self._iter_tasks(self.pool, *args)
+            return
+
         with Pool() as pool:
-            results = pool.starmap(multi_simulation_thread, args)
+            yield from self._iter_tasks(pool, *args)
+
+    def _iter_tasks(
+        self,
+        pool,
+        count: int,
+        block_size: int,
+        dtype: np.dtype,
+        seed: int,
+        rounds: list[CompetitionRound] | None,
+        placements: bool,
+    ):
+        """
+        Submits blocks of simulations to a worker pool and yields their tallies.
+
+        Parameters
+        ----------
+        pool : multiprocessing.pool.Pool
+            The pool to run the worker tasks on.
+        count : int
+            Total number of simulations to run.
+        block_size : int
+            Number of simulations per task, a multiple of `chunk_size`.
+        dtype : np.dtype
+            Floating point type used to simulate attempts.
+        seed : int
+            Root seed of the random streams.
+        rounds : list[CompetitionRound] or None
+            The rounds of the event, or None to simulate a single final.
+        placements : bool
+            Whether to also count how often each competitor finishes in every place.
+
+        Yields
+        ------
+        tuple[np.ndarray, int]
+            The tallies of each competitor in a block, and its size.
+        """
+        params = self._field_parameters()
+        max_in_flight = 2 * (os.cpu_count() or 1)
+        pending = deque()
+
+        workers = nullcontext()
+        if self.profiler is not None:
+            # Pools do not expose their size, which defaults to the CPU count.
+            processes = getattr(pool, "_processes", os.cpu_count() or 1)
+            workers = self.profiler.workers_of(processes)
+
+        def collect(result):
+            if self.profiler is None:
+                return result.get()
+            tallies, wall, cpu = result.get()
+            self.profiler.record_task(wall, cpu)
+            return tallies
+
+        with workers:
+            for start in range(0, count, block_size):
+                block = min(block_size, count - start)
+                if rounds is None:
+                    task = self._tally_field
+                    args = (*params, self.event, block, dtype, seed, start, placements)
+                else:
+                    task = self._tally_rounds
+                    args = (
+                        *params,
+                        self.event,
+                        rounds,
+                        block,
+                        dtype,
+                        seed,
+                        start,
+                        placements,
+                    )
+                if self.profiler is not None:
+                    task, args = run_timed, (task, *args)
+                pending.append(pool.apply_async(task, args))
+
+                if len(pending) >= max_in_flight:
+                    yield collect(pending.popleft())
+
+            while pending:
+                yield collect(pending.popleft())
+
+    def _choose_engine(self, count: int) -> str:
+        """
+        Picks the simulation engine for a run.
+
+        Parameters
+        ----------
+        count : int
+            Number of simulations to run.
 
-        all_results = np.stack([result for result in results])
+        Returns
+        -------
+        str
+            'pool' if there are several CPUs and enough attempts to draw that the
+            pool's startup and transfer costs are amortized, otherwise 'vectorized'.
+            The threshold is lower when a warm pool was passed in.
+        """
+        num_attempts = event_formats[self.event]["num_attempts"]
+        num_draws = len(self.competitors) * count * num_attempts
 
-        sorted_indices = np.argsort(all_results, axis=0)
+        min_draws = POOL_MIN_DRAWS if self.pool is None else WARM_POOL_MIN_DRAWS
 
-        win_indices = sorted_indices[0, :]
-        podium_indices = sorted_indices[: min(num_competitors, 3), :].flat
+        if (os.cpu_count() or 1) > 1 and num_draws > min_draws:
+            return "pool"
+        return "vectorized"
 
-        win_by_person = np.bincount(win_indices, minlength=num_competitors)
-        podium_by_person = np.bincount(podium_indices, minlength=num_competitors)
 
-        competitor_names = [competitor.name for competitor in self.competitors]
+def empty_results(rounds: bool, placements: bool) -> pd.DataFrame:
+    """
+    Builds the results of a simulation without competitors.
+
+    Parameters
+    ----------
+    rounds : bool
+        Whether the simulation had rounds, adding the `final` columns.
+    placements : bool
+        Whether placements were requested, adding an empty `attrs["placements"]`.
+
+    Returns
+    -------
+    pd.DataFrame
+        The columns of `run_simulation`'s results, with no rows and no simulations.
+    """
+    outcomes = ["win", "podium", "final"] if rounds else ["win", "podium"]
+    columns = outcomes + [f"{outcome}_ci" for outcome in outcomes]
+
+    results = pd.DataFrame(
+        {"name": pd.Series(dtype=object)}
+        | {column: pd.Series(dtype=np.float64) for column in columns}
+    )
+    results.attrs["simulations"] = 0
+
+    if placements:
+        results.attrs["placements"] = pd.DataFrame(dtype=np.float64)
+
+    return results
+
+
+def standard_error(successes: np.ndarray, trials: int) -> np.ndarray:
+    """
+    Estimates the standard error of probabilities estimated from simulation counts.
+
+    Uses the Agresti-Coull adjustment, so probabilities observed as exactly 0 or 1
+    still have a non-zero error until enough trials have been run.
+
+    Parameters
+    ----------
+    successes : np.ndarray
+        Number of times each outcome happened.
+    trials : int
+        Number of simulations run.
+
+    Returns
+    -------
+    np.ndarray
+        The standard error of each probability.
+    """
+    adjusted_trials = trials + Z_95**2
+    p = (successes + Z_95**2 / 2) / adjusted_trials
+
+    return np.sqrt(p * (1 - p) / adjusted_trials)
 
-        data = {
-            "name": competitor_names,
-            "win": win_by_person / count,
-            "podium": podium_by_person / count,
-        }
 
-        return pd.DataFrame(data).sort_values(by="win", ascending=False)
+def fit_field(results: DataFrame, num_attempts: int, halflife: str) -> DataFrame:
+    """
+    Fits the simulation parameters of every competitor from their raw results.
+
+    All competitors are fitted in one grouped pass over their rows, giving the last
+    value of `Series.ewm(span=n, times=dates, halflife=halflife)` over each
+    competitor's n averages. As in pandas, the mean decays with the time between
+    results, while the standard deviation ignores the times and decays by the span
+    once per result.
+
+    Parameters
+    ----------
+    results : DataFrame
+        The results of all competitors, with value1 to value5, date and personId
+        columns, each competitor's rows in date order.
+    num_attempts : int
+        Number of attempts in the event's default format.
+    halflife : str
+        Halflife for exponential weighted moving average.
+
+    Returns
+    -------
+    DataFrame
+        The latest weighted `mean` and `stdev` of each competitor's averages, their
+        `dnf_rate` and the `first_date` of their results, indexed by personId.
+        Competitors without results are left out.
+    """
+    if results.empty:
+        return pd.DataFrame(columns=SUMMARY_KEYS + ["first_date"])
+
+    codes, person_ids = pd.factorize(results["personId"])
+    # Make each competitor's rows contiguous, keeping their order.
+    order = np.argsort(codes, kind="stable")
+    codes = codes[order]
+
+    columns = [f"value{i}" for i in range(1, num_attempts + 1)]
+    values = results[columns].to_numpy(dtype=np.float64)[order]
+    dates = pd.to_datetime(results["date"]).to_numpy()[order]
+
+    sizes = np.bincount(codes)
+    ends = np.cumsum(sizes)
+    starts = ends - sizes
+
+    solved = values > 0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        averages = np.where(solved, values, 0).sum(axis=1) / solved.sum(axis=1)
+    observed = ~np.isnan(averages)
+    averages = np.where(observed, averages, 0)
+
+    dnf_counts = np.bincount(codes, weights=(values < 0).sum(axis=1))
+    dnf_rates = dnf_counts / (sizes * num_attempts)
+
+    # The decay per halflife (or per result for the variance) of ewm with span=n.
+    decay = ((sizes - 1) / (sizes + 1))[codes]
+
+    halflives = (dates[ends - 1][codes] - dates) / pd.Timedelta(halflife)
+    weights = np.where(observed, decay**halflives, 0)
+    with np.errstate(invalid="ignore"):
+        means = np.bincount(codes, weights=weights * averages) / np.bincount(
+            codes, weights=weights
+        )
+
+    rows_after = ends[codes] - 1 - np.arange(len(codes))
+    weights = np.where(observed, decay**rows_after, 0)
+    sum_weights = np.bincount(codes, weights=weights)
+    sum_squared_weights = np.bincount(codes, weights=weights**2)
+
+    with np.errstate(invalid="ignore"):
+        centre = np.bincount(codes, weights=weights * averages) / sum_weights
+    deviations = np.where(observed, averages - centre[codes], 0)
+    squared_deviations = np.bincount(codes, weights=weights * deviations**2)
+
+    # Bias corrected as in pandas, NaN with fewer than two averages.
+    denominator = sum_weights**2 - sum_squared_weights
+    with np.errstate(invalid="ignore", divide="ignore"):
+        variances = np.where(
+            denominator > 0, sum_weights * squared_deviations / denominator, np.nan
+        )
+
+    # pandas keeps the variance of a constant series at exactly zero.
+    masked = np.where(observed, averages, np.nan)
+    with np.errstate(invalid="ignore"):
+        constant = np.fmax.reduceat(masked, starts) == np.fmin.reduceat(masked, starts)
+    variances[constant & (denominator > 0)] = 0
+
+    return pd.DataFrame(
+        {
+            "mean": means,
+            "stdev": np.sqrt(variances),
+            "dnf_rate": dnf_rates,
+            "first_date": np.minimum.reduceat(dates, starts),
+        },
+        index=pd.Index(person_ids, name="personId"),
+    )
@@ -0,0 +1,280 @@
+import numpy as np
+import pandas as pd
+from pandas.core.api import DataFrame as DataFrame
+
+from competitor import Competitor
+from dist_sample import DistributionSamplingSimulator
+from formats import event_formats
+from multi_table import (
+    TABLE_SIZE,
+    iter_table_field,
+    iter_table_rounds,
+    simulate_table_field,
+    tally_table_field,
+    tally_table_rounds,
+)
+from stageprofiler import StageProfiler, profile_stage
+from summarystore import SummaryStore
+
+
+class EmpiricalSamplingSimulator(DistributionSamplingSimulator):
+    """
+    A simulator that samples each competitor's attempts from their own solves.
+
+    Every attempt in the window, weighted by its age, is a point of the
+    competitor's empirical distribution, whose inverse CDF is tabulated once in
+    `prepare_data` with the DNF mass as infinity at the top. Simulating an attempt
+    is then one uniform draw and an array lookup, with no gamma fit. Every engine
+    and option of `DistributionSamplingSimulator.run_simulation` is supported.
+
+    Attributes
+    ----------
+    competitors : list
+        List of Competitor objects representing competitors in the simulation.
+    event : str
+        The event identifier for which the simulation is being performed.
+    tables : np.ndarray
+        The (competitors, TABLE_SIZE) inverse-CDF table of each competitor.
+    summary_store : None
+        Always None, the tables are rebuilt from the raw results on every run.
+    pool : multiprocessing.pool.Pool or None
+        A long-lived worker pool shared across runs.
+    profiler : StageProfiler or None
+        Records the time and memory of each stage of preparing and simulating.
+
+    Methods
+    -------
+    __init__(self, db_wrapper, summary_store=None, pool=None, profiler=None)
+        Initializes the EmpiricalSamplingSimulator with a database wrapper.
+
+    prepare_data(self, event, competitors, halflife='180 days', window=365)
+        Builds the inverse-CDF table of every competitor from their results.
+
+    detach(self) -> EmpiricalSamplingSimulator
+        Returns a copy holding only what is needed to simulate.
+
+    _field_parameters(self) -> tuple[np.ndarray]
+        Collects the tables of every competitor.
+    """
+
+    uses_summaries = False
+
+    _simulate_field = staticmethod(simulate_table_field)
+    _iter_field = staticmethod(iter_table_field)
+    _tally_field = staticmethod(tally_table_field)
+    _iter_rounds = staticmethod(iter_table_rounds)
+    _tally_rounds = staticmethod(tally_table_rounds)
+
+    def __init__(
+        self,
+        db_wrapper,
+        summary_store: SummaryStore | None = None,
+        pool=None,
+        profiler: StageProfiler | None = None,
+    ):
+        """
+        Initializes the EmpiricalSamplingSimulator with a database wrapper.
+
+        Parameters
+        ----------
+        db_wrapper : DBWrapper
+            Database wrapper providing access to competition data.
+        summary_store : None, optional
+            Must be None, summaries hold gamma fits, not tables (default is None).
+        pool : multiprocessing.pool.Pool, optional
+            Worker pool for the 'pool' engine (default is None).
+        profiler : StageProfiler, optional
+            Records the 'query' and 'fit' stages of `prepare_data` and the stages of
+            `run_simulation` (default is None).
+
+        Raises
+        ------
+        ValueError
+            If a summary store is given.
+        """
+        if summary_store is not None:
+            raise ValueError(
+                "The empirical simulator does not use summaries, its tables are "
+                "built from the raw results on every run"
+            )
+        super().__init__(db_wrapper, None, pool, profiler)
+
+    def prepare_data(
+        self,
+        event: str,
+        competitors: list[dict[str, str]],
+        halflife: str = "180 days",
+        window: int = 365,
+    ):
+        """
+        Builds the inverse-CDF table of every competitor from their results.
+
+        Competitors without results in the window are left out.
+
+        Parameters
+        ----------
+        event : str
+            The event for which to prepare data.
+        competitors : list[dict[str, str]]
+            List of competitors with their IDs and names.
+        halflife : str, optional
+            Age at which an attempt has half the weight of a new one (default is
+            '180 days').
+        window : int, optional
+            Number of days of results to use (default is 365).
+        """
+        self.competitors = []
+        self.event = event
+        self.tables = np.empty((0, TABLE_SIZE))
+
+        name_mappings = {i["id"]: i["name"] for i in competitors}
+        num_attempts = event_formats[self.event]["num_attempts"]
+
+        if not name_mappings:
+            return
+
+        with profile_stage(self.profiler, "query"):
+            results = self.db_wrapper.query_frame(event, list(name_mappings), window)
+        with profile_stage(self.profiler, "fit"):
+            person_ids, tables = build_tables(results, num_attempts, halflife)
+
+        rows = {id: i for i, id in enumerate(person_ids)}
+        order = [rows[id] for id in name_mappings if id in rows]
+        self.tables = tables[order]
+
+        solved = np.isfinite(self.tables)
+        num_solved = solved.sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = np.where(solved, self.tables, 0).sum(axis=1) / num_solved
+            stdevs = np.sqrt(
+                np.where(solved, (self.tables - means[:, None]) ** 2, 0).sum(axis=1)
+                / num_solved
+            )
+
+        for i, row in enumerate(order):
+            id = person_ids[row]
+            self.competitors.append(
+                Competitor(
+                    id=id,
+                    name=name_mappings[id],
+                    dnf_rate=1 - num_solved[i] / TABLE_SIZE,
+                    mean=means[i],
+                    stdev=stdevs[i],
+                )
+            )
+
+    def detach(self) -> "EmpiricalSamplingSimulator":
+        """
+        Returns a copy holding only what is needed to simulate.
+
+        Returns
+        -------
+        EmpiricalSamplingSimulator
+            A simulator that can run `run_simulation` but not `prepare_data`.
+        """
+        detached = super().detach()
+        detached.tables = self.tables
+
+        return detached
+
+    def _field_parameters(self) -> tuple[np.ndarray]:
+        """
+        Collects the tables of every competitor.
+
+        Returns
+        -------
+        tuple[np.ndarray]
+            The (competitors, TABLE_SIZE) inverse-CDF tables.
+        """
+        return (self.tables,)
+
+
+def build_tables(
+    results: DataFrame, num_attempts: int, halflife: str, table_size: int = TABLE_SIZE
+) -> tuple[pd.Index, np.ndarray]:
+    """
+    Tabulates the inverse CDF of every competitor's time-weighted attempts.
+
+    All competitors are tabulated together. Attempts are sorted within each
+    competitor and placed at the midpoints of their cumulative weights, and the
+    table holds the linearly interpolated result at each of `table_size` evenly
+    spaced quantiles. Quantiles above the competitor's share of solves are DNFs.
+
+    Parameters
+    ----------
+    results : DataFrame
+        The results of all competitors, with value1 to value5, date and personId
+        columns.
+    num_attempts : int
+        Number of attempts in the event's default format.
+    halflife : str
+        Age at which an attempt has half the weight of a new one.
+    table_size : int, optional
+        Number of quantiles per competitor (default is TABLE_SIZE).
+
+    Returns
+    -------
+    tuple[pd.Index, np.ndarray]
+        The person IDs, and their (competitors, table_size) tables with DNFs as
+        infinity.
+    """
+    codes, person_ids = pd.factorize(results["personId"])
+    num_groups = len(person_ids)
+
+    if num_groups == 0:
+        return person_ids, np.empty((0, table_size))
+
+    columns = [f"value{i}" for i in range(1, num_attempts + 1)]
+    values = results[columns].to_numpy(dtype=np.float64)
+    dates = pd.to_datetime(results["date"]).to_numpy()
+
+    ages = (dates.max() - dates) / pd.Timedelta(halflife)
+    weights = np.repeat(0.5**ages, num_attempts)
+    codes = np.repeat(codes, num_attempts)
+    values = values.ravel()
+
+    # Skipped attempts, such as those after a missed cutoff, are not results.
+    attempted = values != 0
+    values = np.where(values[attempted] > 0, values[attempted], np.inf)
+    codes = codes[attempted]
+    weights = weights[attempted]
+
+    order = np.lexsort((values, codes))
+    values, codes, weights = values[order], codes[order], weights[order]
+
+    weights /= np.bincount(codes, weights=weights, minlength=num_groups)[codes]
+    cumulative = np.cumsum(weights)
+    sizes = np.bincount(codes, minlength=num_groups)
+    starts = np.cumsum(sizes) - sizes
+    cumulative -= np.concatenate([[0], cumulative])[starts][codes]
+    midpoints = cumulative - weights / 2
+
+    # Solves sort before the DNFs of each competitor.
+    solved = np.isfinite(values)
+    solved_mass = np.bincount(codes, weights=weights * solved, minlength=num_groups)
+    values, codes, midpoints = values[solved], codes[solved], midpoints[solved]
+
+    sizes = np.bincount(codes, minlength=num_groups)
+    ends = np.cumsum(sizes)
+    starts = ends - sizes
+
+    quantiles = (np.arange(table_size) + 0.5) / table_size
+    if len(values) == 0:
+        return person_ids, np.full((num_groups, table_size), np.inf)
+
+    # Offsetting each competitor's midpoints by their index makes one sorted array.
+    keys = codes + midpoints
+    targets = np.arange(num_groups)[:, None] + quantiles[None, :]
+    positions = np.searchsorted(keys, targets, side="right")
+
+    last = len(values) - 1
+    high = np.clip(np.minimum(positions, ends[:, None] - 1), 0, last)
+    low = np.clip(np.maximum(positions - 1, starts[:, None]), 0, last)
+
+    span = midpoints[high] - midpoints[low]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        fraction = np.where(span > 0, (quantiles - midpoints[low]) / span, 0)
+    fraction = np.clip(fraction, 0, 1)
+    tables = values[low] + fraction * (values[high] - values[low])
+
+    return person_ids, np.where(quantiles < solved_mass[:, None], tables, np.inf)
@@ -0,0 +1,123 @@
+from pandas.core.api import DataFrame as DataFrame
+import pandas as pd
+import os
+
+from summarystore import SUMMARY_COLUMNS, SummaryStore
+
+sep = os.path.sep
+
+SUMMARY_PATH = f"db{sep}results_dump{sep}competitor_summary.feather"
+KEY_COLUMNS = ["personId", "eventId", "window", "halflife"]
+
+
+class FileSummaryStore(SummaryStore):
+    """
+    A class implementing the SummaryStore interface with a local feather file.
+
+    Attributes
+    ----------
+    path : str
+        Path to the feather file holding the summaries.
+
+    Methods
+    -------
+    __init__(self, path: str=SUMMARY_PATH) -> None
+        Initializes the store.
+
+    _load(self, event, names, window, halflife) -> DataFrame
+        Reads the stored summaries of the given competitors.
+
+    _save(self, summaries) -> None
+        Adds or replaces stored summaries and rewrites the file.
+    """
+
+    def __init__(self, path: str = SUMMARY_PATH) -> None:
+        """
+        Initializes the store.
+
+        Parameters
+        ----------
+        path : str, optional
+            Path to the feather file holding the summaries
+            (default is 'db/results_dump/competitor_summary.feather').
+
+        Returns
+        -------
+        None
+        """
+        self.path = path
+        self._summaries = None
+
+    def _load(
+        self, event: str, names: list[str], window: int, halflife: str
+    ) -> DataFrame:
+        """
+        Reads the stored summaries of the given competitors.
+
+        Parameters
+        ----------
+        event : str
+            The event identifier.
+        names : list[str]
+            List of person IDs.
+        window : int
+            Number of days of results the summaries cover.
+        halflife : str
+            Halflife of the exponential weighting.
+
+        Returns
+        -------
+        DataFrame
+            The matching summaries.
+        """
+        summaries = self._read()
+
+        return summaries[
+            (summaries["eventId"] == event)
+            & (summaries["window"] == window)
+            & (summaries["halflife"] == halflife)
+            & summaries["personId"].isin(names)
+        ]
+
+    def _save(self, summaries: DataFrame) -> None:
+        """
+        Adds or replaces stored summaries and rewrites the file.
+
+        Parameters
+        ----------
+        summaries : DataFrame
+            The summaries to add or replace.
+
+        Returns
+        -------
+        None
+        """
+        stored = self._read()
+        if stored.empty:
+            merged = summaries
+        else:
+            merged = pd.concat([stored, summaries], ignore_index=True)
+        merged = merged.drop_duplicates(KEY_COLUMNS, keep="last").reset_index(drop=True)
+
+        tmp_path = f"{self.path}.tmp"
+        merged.to_feather(tmp_path)
+        os.replace(tmp_path, self.path)
+
+        self._summaries = merged
+
+    def _read(self) -> DataFrame:
+        """
+        Reads and caches the summary file.
+
+        Returns
+        -------
+        DataFrame
+            All stored summaries.
+        """
+        if self._summaries is None:
+            if os.path.exists(self.path):
+                self._summaries = pd.read_feather(self.path)
+            else:
+                self._summaries = pd.DataFrame(columns=SUMMARY_COLUMNS)
+
+        return self._summaries
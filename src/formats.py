@@ -1,5 +1,30 @@
 from typing import Dict, TypedDict
 
+# Mirrors the `event` enum in db/wca_results.ddl.
+wca_events = (
+    "333",
+    "222",
+    "444",
+    "555",
+    "666",
+    "777",
+    "333oh",
+    "333bf",
+    "333fm",
+    "pyram",
+    "minx",
+    "skewb",
+    "sq1",
+    "clock",
+    "333mbf",
+    "444bf",
+    "555bf",
+    "333mbo",
+    "333ft",
+    "magic",
+    "mmagic",
+)
+
 
 class EventFormat(TypedDict):
     num_attempts: int
@@ -23,3 +48,24 @@ event_formats: Dict[str, EventFormat] = {
     "444bf": {"num_attempts": 3, "default_format": "b"},
     "555bf": {"num_attempts": 3, "default_format": "b"},
 }
+
+
+# Results of these events are not times, so time limits do not apply to them.
+untimed_events = ("333fm", "333mbf", "333mbo")
+
+
+class RoundFormat(TypedDict):
+    num_attempts: int
+    kernel: str
+
+
+# WCIF round format ids, with the result kernel of `multi_sim.format_kernels` used
+# to rank each one.
+round_formats: Dict[str, RoundFormat] = {
+    "a": {"num_attempts": 5, "kernel": "a"},
+    "m": {"num_attempts": 3, "kernel": "m"},
+    "1": {"num_attempts": 1, "kernel": "b"},
+    "2": {"num_attempts": 2, "kernel": "b"},
+    "3": {"num_attempts": 3, "kernel": "b"},
+    "5": {"num_attempts": 5, "kernel": "b"},
+}
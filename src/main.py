@@ -1,16 +1,18 @@
 from argparse import ArgumentParser
 from contextlib import contextmanager
-from dotenv import load_dotenv
 from time import perf_counter
-from pandas.core.api import DataFrame as DataFrame
-import os
+from typing import TYPE_CHECKING
 
-from request_info import get_competitors
-from psqlconnection import PSQLConnection
-from csvparser import CSVParser
-from dbwrapper import DBWrapper
-from competitionsimulator import CompetitionSimulator
-from dist_sample import DistributionSamplingSimulator
+from registry import BACKENDS, SIMULATORS
+
+# Only imported for annotations, pandas alone takes longer to import than
+# printing --help should.
+if TYPE_CHECKING:
+    from pandas.core.api import DataFrame
+
+    from competitionsimulator import CompetitionSimulator
+    from dbwrapper import DBWrapper
+    from summarystore import SummaryStore
 
 
 @contextmanager
@@ -34,7 +36,7 @@ def verbose_logging(verbose, message):
         print(f"Completed in {end_t - start_t:.2f} seconds")
 
 
-def print_results(results: DataFrame, event: str) -> None:
+def print_results(results: "DataFrame", event: str, show_ci: bool = False) -> None:
     """
     Formats and prints the results table in a human-readable way.
 
@@ -44,19 +46,61 @@ def print_results(results: DataFrame, event: str) -> None:
         A pandas DataFrame containing the names and results of each competitor.
     event : str
         The event the simulation was run for.
+    show_ci : bool, optional
+        Whether to print the 95% confidence interval of each probability.
     """
+    print(f"Results for {event}:")
+    if results.empty:
+        print("No competitors with recent results to simulate")
+        return
+
     max_name_length = results["name"].str.len().max() + 2
     header_name = "Name".ljust(max_name_length)
+    width = 16 if show_ci else 7
+    columns = ["win", "podium"] + (["final"] if "final" in results else [])
 
-    print(f"Results for {event}:")
-    print(f"{header_name} | Win     | Podium")
-    print(f"{'-' * max_name_length} + ------- + -------")
+    if show_ci:
+        print(f"Ran {results.attrs['simulations']} simulations")
+    print(" | ".join([header_name] + [i.capitalize().ljust(width) for i in columns]))
+    print(" + ".join(["-" * max_name_length] + ["-" * width for _ in columns]))
 
     for _, row in results.iterrows():
-        win = f"{row['win'] * 100:.2f}%" if row["win"] > 0.01 else "<0.01%"
-        podium = f"{row['podium'] * 100:.2f}%" if row["podium"] > 0.01 else "<0.01%"
-        name = row["name"].ljust(max_name_length)
-        print(f"{name} | {win.ljust(7)} | {podium.ljust(7)}")
+        cells = [row["name"].ljust(max_name_length)]
+        for column in columns:
+            cell = f"{row[column] * 100:.2f}%" if row[column] > 0.01 else "<0.01%"
+            if show_ci:
+                cell += f" +/-{row[column + '_ci'] * 100:.2f}%"
+            cells.append(cell.ljust(width))
+        print(" | ".join(cells))
+
+
+def open_backend(
+    database: str, summaries: bool = False
+) -> tuple["DBWrapper", "SummaryStore | None"]:
+    """
+    Opens the results backend and, optionally, its competitor summary store.
+
+    Only the selected backend's module and dependencies are imported.
+
+    Parameters
+    ----------
+    database : str
+        Database type, one of `BACKENDS.names()`.
+    summaries : bool, optional
+        Whether to cache fitted competitor summaries alongside the results
+        (default is False).
+
+    Returns
+    -------
+    tuple[DBWrapper, SummaryStore | None]
+        The database wrapper and the summary store, or None if summaries are off.
+
+    Raises
+    ------
+    ValueError
+        If the database type is unknown.
+    """
+    return BACKENDS.load(database)(summaries)
 
 
 def main():
@@ -72,51 +116,179 @@ def main():
     parser.add_argument("competitionId")
     parser.add_argument("event")
     parser.add_argument(
-        "-d", "--database", default="psql", help="Database type: 'psql' or 'csv'"
+        "-d",
+        "--database",
+        default="psql",
+        choices=BACKENDS.names(),
+        help="Database type",
     )
     parser.add_argument(
         "-n",
         "--num_simulations",
         default=1000000,
         type=int,
-        help="Number of simulations to run",
+        help="Number of simulations to run, or the maximum number with "
+        "--tolerance or --time_budget",
     )
     parser.add_argument(
         "-v", "--verbose", action="store_true", help="Enable verbose logging"
     )
+    parser.add_argument(
+        "-e",
+        "--engine",
+        default="auto",
+        choices=["auto", "vectorized", "pool"],
+        help="Simulation engine: 'vectorized' runs in a single process, 'pool' "
+        "across worker processes, 'auto' picks based on the simulation size",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Tally results block by block so memory use does not grow with the "
+        "number of simulations",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        help="Stop once the standard error of every probability is below this",
+    )
+    parser.add_argument(
+        "--time_budget",
+        type=float,
+        help="Stop simulating after this many seconds",
+    )
+    parser.add_argument(
+        "--float32",
+        action="store_true",
+        help="Simulate attempts in single precision",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        help="Seed the simulation so runs with the same seed and number of "
+        "simulations give the same results",
+    )
+    parser.add_argument(
+        "-c",
+        "--num_competitors",
+        default=16,
+        type=int,
+        help="Number of top ranked competitors to simulate, 0 for the whole field",
+    )
+    parser.add_argument(
+        "--placements",
+        metavar="PATH",
+        help="Write the probability of each competitor finishing in every place "
+        "to this CSV file",
+    )
+    parser.add_argument(
+        "-r",
+        "--rounds",
+        action="store_true",
+        help="Simulate every round of the event with its cutoffs, time limits and "
+        "advancement conditions, starting from all registered competitors",
+    )
+    parser.add_argument(
+        "-s",
+        "--summaries",
+        action="store_true",
+        help="Cache fitted competitor summaries in the database or a local file",
+    )
+    parser.add_argument(
+        "--simulator",
+        default="distribution",
+        choices=SIMULATORS.names(),
+        help="Attempt model: 'distribution' fits a gamma distribution to each "
+        "competitor's averages, 'empirical' samples from their weighted solves",
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Only use cached competition data, without contacting the WCA API",
+    )
+    parser.add_argument(
+        "--metrics",
+        metavar="PATH",
+        help="Write the wall time, CPU time and peak memory of each stage, and pool "
+        "worker utilization, as JSON, or in the Prometheus text format to a .prom "
+        "file",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="DIR",
+        help="Write cProfile statistics of each stage to this directory",
+    )
     args = parser.parse_args()
 
+    simulator_type = SIMULATORS.load(args.simulator)
+    if args.summaries and not simulator_type.uses_summaries:
+        parser.error(f"the {args.simulator} simulator does not use --summaries")
+
+    # Imported once the arguments are valid, so --help stays fast.
+    import numpy as np
+    from request_info import get_competitors, get_rounds, get_wcif
+    from stageprofiler import StageProfiler, profile_stage
+
+    profiler = None
+    if args.metrics is not None or args.profile is not None:
+        profiler = StageProfiler(args.profile)
+
     with verbose_logging(
         args.verbose, f"Getting competitor list for {args.competitionId}"
-    ):
-        competitors = get_competitors(args.competitionId, args.event)
-
-    db_connection: DBWrapper
-    if args.database == "psql":
-        load_dotenv()
-        username = os.getenv("PSQL_USERNAME")
-        password = os.getenv("PSQL_PASSWORD")
-
-        db_connection = PSQLConnection(
-            dbname="wca_results",
-            username=username,
-            password=password,
-            connect_args={"options": "-csearch_path=wca_results"},
-        )
-    elif args.database == "csv":
-        db_connection = CSVParser()
+    ), profile_stage(profiler, "wcif"):
+        wcif = get_wcif(args.competitionId, args.offline)
 
-    results_calculator: CompetitionSimulator = DistributionSamplingSimulator(
-        db_connection
+        rounds = None
+        if args.rounds:
+            competitors = get_competitors(
+                args.competitionId, args.event, num=None, wcif=wcif
+            )
+            rounds = get_rounds(args.competitionId, args.event, wcif=wcif)
+        else:
+            competitors = get_competitors(
+                args.competitionId,
+                args.event,
+                num=args.num_competitors or None,
+                wcif=wcif,
+            )
+
+    with profile_stage(profiler, "backend"):
+        db_connection, summary_store = open_backend(args.database, args.summaries)
+
+    results_calculator: "CompetitionSimulator" = simulator_type(
+        db_connection, summary_store, profiler=profiler
     )
 
-    with verbose_logging(args.verbose, "Fetching competitor results"):
+    with verbose_logging(args.verbose, "Fetching competitor results"), profile_stage(
+        profiler, "prepare"
+    ):
         results_calculator.prepare_data(args.event, competitors)
 
-    with verbose_logging(args.verbose, f"Running {args.num_simulations} simulations"):
-        results = results_calculator.run_simulation(args.num_simulations)
+    with verbose_logging(
+        args.verbose, f"Running {args.num_simulations} simulations"
+    ), profile_stage(profiler, "simulate"):
+        results = results_calculator.run_simulation(
+            args.num_simulations,
+            engine=args.engine,
+            stream=args.stream,
+            tolerance=args.tolerance,
+            time_budget=args.time_budget,
+            dtype=np.float32 if args.float32 else np.float64,
+            seed=args.seed,
+            rounds=rounds,
+            placements=args.placements is not None,
+        )
+
+    adaptive = args.tolerance is not None or args.time_budget is not None
+    print_results(results, args.event, show_ci=adaptive)
+
+    if args.placements is not None:
+        results.attrs["placements"].to_csv(args.placements, index_label="name")
 
-    print_results(results, args.event)
+    if profiler is not None:
+        profiler.close()
+        if args.metrics is not None:
+            profiler.write(args.metrics)
 
 
 if __name__ == "__main__":
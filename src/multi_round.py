@@ -0,0 +1,340 @@
+import numpy as np
+
+from competitionround import CompetitionRound
+from formats import round_formats, untimed_events
+from multi_sim import chunk_size, format_kernels, gamma_parameters, make_rng
+
+# Regulation 9p1: at least 25% of competitors are eliminated after each round.
+MAX_ADVANCING = 0.75
+
+
+def iter_rounds(
+    means,
+    stdevs,
+    dnf_rates,
+    event,
+    rounds,
+    count,
+    dtype=np.float64,
+    seed=None,
+    start=0,
+    placements=False,
+    podium_size=3,
+):
+    """
+    Simulate every round of an event and count wins, podiums and finals.
+
+    Each chunk of simulations runs through all rounds at once. A round's field is a
+    (places, simulations) array of competitor indices with a mask of the places
+    that are filled, so competitors are eliminated per simulation by reordering
+    and truncating the arrays rather than looping over simulations.
+
+    Parameters
+    ----------
+    means : numpy.ndarray
+        The weighted mean of each competitor's historical averages.
+    stdevs : numpy.ndarray
+        The weighted standard deviation of each competitor's historical averages.
+    dnf_rates : numpy.ndarray
+        The DNF rate of each competitor.
+    event : str
+        The identifier of the event being simulated.
+    rounds : list[CompetitionRound]
+        The rounds of the event, ending with the final.
+    count : int
+        The number of simulations to perform.
+    dtype : numpy.dtype, optional
+        Floating point type of the simulated results (default is float64).
+    seed : int or None, optional
+        Root seed of the random streams, fresh entropy if None (default is None).
+    start : int, optional
+        Index of the first simulation within the run, a multiple of `chunk_size`
+        (default is 0).
+    placements : bool, optional
+        Whether to also count how often each competitor finishes in every place of
+        the final (default is False).
+    podium_size : int, optional
+        Number of places on the podium (default is 3).
+
+    Yields
+    ------
+    tuple[numpy.ndarray, int]
+        A (3, competitors) array of the wins, podiums and final round appearances
+        of each competitor in a chunk, followed by a row per place of the final if
+        `placements`, and the number of simulations in the chunk.
+    """
+    shape, scale = gamma_parameters(means, stdevs)
+
+    def draw(rng, field, size, dtype):
+        values = rng.standard_gamma(shape[field][None], size, dtype=dtype)
+        values *= scale[field][None]
+        dnf = rng.random(size, dtype=dtype) < dnf_rates[field][None]
+        return values, dnf
+
+    yield from iter_sampled_rounds(
+        draw,
+        len(means),
+        event,
+        rounds,
+        count,
+        dtype,
+        seed,
+        start,
+        placements,
+        podium_size,
+    )
+
+
+def iter_sampled_rounds(
+    draw,
+    num_competitors,
+    event,
+    rounds,
+    count,
+    dtype=np.float64,
+    seed=None,
+    start=0,
+    placements=False,
+    podium_size=3,
+):
+    """
+    Simulate every round of an event with attempts from any model.
+
+    Parameters
+    ----------
+    draw : callable
+        Called as `draw(rng, field, size, dtype)` with a (places, simulations) array
+        of competitor indices and the (attempts, places, simulations) size of the
+        draw, returning the attempt results and a boolean mask of the DNFs.
+    num_competitors : int
+        The number of competitors in the first round.
+    event : str
+        The identifier of the event being simulated.
+    rounds : list[CompetitionRound]
+        The rounds of the event, ending with the final.
+    count : int
+        The number of simulations to perform.
+    dtype : numpy.dtype, optional
+        Floating point type of the simulated results (default is float64).
+    seed : int or None, optional
+        Root seed of the random streams, fresh entropy if None (default is None).
+    start : int, optional
+        Index of the first simulation within the run, a multiple of `chunk_size`
+        (default is 0).
+    placements : bool, optional
+        Whether to also count how often each competitor finishes in every place of
+        the final (default is False).
+    podium_size : int, optional
+        Number of places on the podium (default is 3).
+
+    Yields
+    ------
+    tuple[numpy.ndarray, int]
+        The tallies of each competitor in a chunk, as in `iter_rounds`, and the
+        number of simulations in the chunk.
+    """
+    chunk = chunk_size(num_competitors, event)
+    timed = event not in untimed_events
+
+    if start % chunk != 0:
+        raise ValueError(f"start must be a multiple of the chunk size {chunk}")
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+
+    for offset in range(start, start + count, chunk):
+        num_simulations = min(offset + chunk, start + count) - offset
+        rng = make_rng(seed, offset // chunk)
+
+        field = np.broadcast_to(
+            np.arange(num_competitors)[:, None], (num_competitors, num_simulations)
+        )
+        filled = np.ones(field.shape, dtype=bool)
+
+        for i, competition_round in enumerate(rounds):
+            size = (competition_round.num_attempts,) + field.shape
+            values, dnf = draw(rng, field, size, dtype)
+
+            result, best = simulate_round(values, dnf, competition_round, timed)
+            result[~filled] = np.inf
+            best[~filled] = np.inf
+
+            if i < len(rounds) - 1:
+                field, filled = advance(result, best, field, filled, competition_round)
+
+        order = np.lexsort((best, result), axis=0)
+        if not placements:
+            order = order[:podium_size]
+        placed = np.take_along_axis(field, order, axis=0)
+        # Only competitors with a successful attempt are placed.
+        finished = np.isfinite(np.take_along_axis(best, order, axis=0))
+
+        podium = placed[:podium_size][finished[:podium_size]]
+        tallies = [
+            np.bincount(placed[0][finished[0]], minlength=num_competitors),
+            np.bincount(podium, minlength=num_competitors),
+            np.bincount(field[filled], minlength=num_competitors),
+        ]
+
+        if placements:
+            places = np.arange(len(order))[:, None] * num_competitors + placed
+            counts = np.bincount(
+                places[finished], minlength=num_competitors * num_competitors
+            )
+            tallies.extend(counts.reshape(num_competitors, num_competitors))
+
+        yield np.stack(tallies), num_simulations
+
+
+def tally_rounds(
+    means,
+    stdevs,
+    dnf_rates,
+    event,
+    rounds,
+    count,
+    dtype=np.float64,
+    seed=None,
+    start=0,
+    placements=False,
+):
+    """
+    Simulate every round of an event and count wins, podiums and finals.
+
+    Used as a worker task: only the tallies are returned to the parent.
+
+    Parameters
+    ----------
+    means : numpy.ndarray
+        The weighted mean of each competitor's historical averages.
+    stdevs : numpy.ndarray
+        The weighted standard deviation of each competitor's historical averages.
+    dnf_rates : numpy.ndarray
+        The DNF rate of each competitor.
+    event : str
+        The identifier of the event being simulated.
+    rounds : list[CompetitionRound]
+        The rounds of the event, ending with the final.
+    count : int
+        The number of simulations to perform.
+    dtype : numpy.dtype, optional
+        Floating point type of the simulated results (default is float64).
+    seed : int or None, optional
+        Root seed of the random streams, fresh entropy if None (default is None).
+    start : int, optional
+        Index of the first simulation within the run, a multiple of `chunk_size`
+        (default is 0).
+    placements : bool, optional
+        Whether to also count how often each competitor finishes in every place of
+        the final (default is False).
+
+    Returns
+    -------
+    tuple[numpy.ndarray, int]
+        The tallies of each competitor from `iter_rounds`, and `count`.
+    """
+    num_rows = 3 + len(means) if placements else 3
+    tallies = np.zeros((num_rows, len(means)), dtype=np.int64)
+
+    for chunk_tallies, _ in iter_rounds(
+        means, stdevs, dnf_rates, event, rounds, count, dtype, seed, start, placements
+    ):
+        tallies += chunk_tallies
+
+    return tallies, count
+
+
+def simulate_round(values, dnf, competition_round: CompetitionRound, timed=True):
+    """
+    Compute the results of one round from its attempts.
+
+    Attempts over the time limit are DNFs, and competitors who do not beat the
+    cutoff within the cutoff attempts get no further attempts, which leaves them
+    without an average.
+
+    Parameters
+    ----------
+    values : numpy.ndarray
+        The (attempts, places, simulations) attempt results.
+    dnf : numpy.ndarray
+        Boolean mask of the attempts that are DNFs, updated in place.
+    competition_round : CompetitionRound
+        The round to simulate.
+    timed : bool, optional
+        Whether results are times, so the time limit applies (default is True).
+
+    Returns
+    -------
+    tuple[numpy.ndarray, numpy.ndarray]
+        The ranking result and the best attempt of each (place, simulation), with
+        DNF results as infinity.
+    """
+    if timed and competition_round.time_limit is not None:
+        if competition_round.cumulative:
+            dnf |= np.cumsum(values, axis=0) >= competition_round.time_limit
+        else:
+            dnf |= values >= competition_round.time_limit
+
+    num_cutoff = competition_round.cutoff_attempts
+    if num_cutoff:
+        before_cutoff = np.where(dnf[:num_cutoff], np.inf, values[:num_cutoff])
+        made_cutoff = (before_cutoff < competition_round.cutoff_result).any(axis=0)
+        dnf[num_cutoff:] |= ~made_cutoff
+
+    kernel = format_kernels[round_formats[competition_round.format]["kernel"]]
+
+    result = kernel(values, dnf)
+    best = np.where(dnf, np.inf, values).min(axis=0)
+
+    return result, best
+
+
+def advance(result, best, field, filled, competition_round: CompetitionRound):
+    """
+    Select the competitors who advance to the next round in every simulation.
+
+    Competitors are ranked by result and then best attempt. The number advancing
+    follows the round's advancement condition, capped so at least 25% are
+    eliminated, and only competitors with a successful attempt can advance.
+
+    Parameters
+    ----------
+    result : numpy.ndarray
+        The ranking result of each (place, simulation).
+    best : numpy.ndarray
+        The best attempt of each (place, simulation).
+    field : numpy.ndarray
+        The competitor index in each (place, simulation).
+    filled : numpy.ndarray
+        Boolean mask of the places that hold a competitor.
+    competition_round : CompetitionRound
+        The round just simulated.
+
+    Returns
+    -------
+    tuple[numpy.ndarray, numpy.ndarray]
+        The field of the next round and the mask of its filled places.
+    """
+    order = np.lexsort((best, result), axis=0)
+    ranked_result = np.take_along_axis(result, order, axis=0)
+    ranked_best = np.take_along_axis(best, order, axis=0)
+
+    num_competitors = filled.sum(axis=0)
+    num_advancing = np.floor(num_competitors * MAX_ADVANCING).astype(np.int64)
+
+    level = competition_round.advancement_level
+    if competition_round.advancement_type == "ranking":
+        num_advancing = np.minimum(num_advancing, level)
+    elif competition_round.advancement_type == "percent":
+        num_advancing = np.minimum(
+            num_advancing, np.floor(num_competitors * level / 100).astype(np.int64)
+        )
+    elif competition_round.advancement_type == "attemptResult":
+        num_advancing = np.minimum(num_advancing, (ranked_result < level).sum(axis=0))
+
+    num_advancing = np.minimum(num_advancing, np.isfinite(ranked_best).sum(axis=0))
+
+    width = max(int(num_advancing.max()), 1)
+    next_field = np.take_along_axis(field, order[:width], axis=0)
+    next_filled = np.arange(width)[:, None] < num_advancing[None, :]
+
+    return next_field, next_filled
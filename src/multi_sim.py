@@ -1,8 +1,38 @@
 import numpy as np
 from formats import event_formats
 
+# Number of attempt values drawn at once by iter_field, sized to stay in cache.
+CHUNK_ELEMENTS = 1 << 18
 
-def multi_simulation_thread(results, dnf_rate, event, count):
+
+def make_rng(seed=None, index=0):
+    """
+    Create the random generator of one chunk of simulations.
+
+    Chunk `index` draws from child `index` of `SeedSequence(seed).spawn`, built
+    directly from its spawn key, so any chunk's stream can be recreated on its own
+    and does not depend on which process draws it.
+
+    Parameters
+    ----------
+    seed : int or None, optional
+        The root seed, fresh entropy if None (default is None).
+    index : int, optional
+        The index of the chunk (default is 0).
+
+    Returns
+    -------
+    numpy.random.Generator
+        A generator on the PCG64DXSM bit generator.
+    """
+    return np.random.Generator(
+        np.random.PCG64DXSM(np.random.SeedSequence(seed, spawn_key=(index,)))
+    )
+
+
+def multi_simulation_thread(
+    mean, stdev, dnf_rate, event, count, dtype=np.float64, seed=None
+):
     """
     Perform a multi-threaded simulation of competition results.
 
@@ -11,14 +41,20 @@ def multi_simulation_thread(results, dnf_rate, event, count):
 
     Parameters
     ----------
-    results : numpy.ndarray
-        An array of historical results to derive simulation parameters.
+    mean : float
+        The weighted mean of the competitor's historical averages.
+    stdev : float
+        The weighted standard deviation of the competitor's historical averages.
     dnf_rate : float
         The rate of Did Not Finish (DNF) occurrences in the simulation.
     event : str
         The identifier of the event being simulated.
     count : int
         The number of simulations to perform.
+    dtype : numpy.dtype, optional
+        Floating point type of the simulated results (default is float64).
+    seed : int or None, optional
+        Seed of the random generator, fresh entropy if None (default is None).
 
     Returns
     -------
@@ -31,41 +67,448 @@ def multi_simulation_thread(results, dnf_rate, event, count):
     If `format` is 'a', the WCA Ao5 calculation is used.
     If `format` is 'm', the mean is taken across all attempts.
     Otherwise, the best result of the attempts is returned.
+    DNF results are returned as infinity.
 
     See Also
     --------
     event_formats : A dictionary defining event-specific formats and rules.
     """
-    use_dnf = True
+    shape, scale = gamma_parameters(np.array([mean]), np.array([stdev]))
+
+    num_attempts = event_formats[event]["num_attempts"]
+
+    random_values, dnf = draw_attempts(
+        make_rng(seed),
+        shape,
+        scale,
+        np.array([dnf_rate]),
+        (num_attempts, 1, count),
+        dtype,
+    )
+
+    return reduce_attempts(random_values, dnf, event)[0]
+
+
+def simulate_field(means, stdevs, dnf_rates, event, count, dtype=np.float64, seed=None):
+    """
+    Simulate the results of every competitor at once in a single process.
+
+    Parameters
+    ----------
+    means : numpy.ndarray
+        The weighted mean of each competitor's historical averages.
+    stdevs : numpy.ndarray
+        The weighted standard deviation of each competitor's historical averages.
+    dnf_rates : numpy.ndarray
+        The DNF rate of each competitor.
+    event : str
+        The identifier of the event being simulated.
+    count : int
+        The number of simulations to perform.
+    dtype : numpy.dtype, optional
+        Floating point type of the simulated results (default is float64).
+    seed : int or None, optional
+        Root seed of the random streams, fresh entropy if None (default is None).
+
+    Returns
+    -------
+    numpy.ndarray
+        A (competitors, count) array of simulated competition results.
+    """
+    results = np.empty((len(means), count), dtype=dtype)
 
-    mean = results.mean().iloc[-1]
-    stdev = results.std().iloc[-1]
+    start = 0
+    for block in iter_field(means, stdevs, dnf_rates, event, count, dtype, seed):
+        results[:, start : start + block.shape[1]] = block
+        start += block.shape[1]
+
+    return results
 
-    if np.isnan(stdev):
-        stdev = 0.01
 
-    shape = (mean**2) / (stdev**2)
-    scale = (stdev**2) / mean
+def chunk_size(num_competitors, event):
+    """
+    Number of simulations in each chunk drawn by `iter_field`.
 
+    Parameters
+    ----------
+    num_competitors : int
+        The number of competitors in the field.
+    event : str
+        The identifier of the event being simulated.
+
+    Returns
+    -------
+    int
+        The chunk length, chosen so each chunk holds about `CHUNK_ELEMENTS` values.
+    """
     num_attempts = event_formats[event]["num_attempts"]
-    format = event_formats[event]["default_format"]
 
-    random_values = np.random.gamma(shape, scale, (count, num_attempts)).astype(int)
+    return max(1, CHUNK_ELEMENTS // (num_competitors * num_attempts))
 
-    if use_dnf:
-        mask = np.random.rand(*random_values.shape)
-        replace_indices = np.where(mask < dnf_rate)
 
-        random_values[replace_indices] = np.iinfo(np.int32).max
+def iter_field(
+    means, stdevs, dnf_rates, event, count, dtype=np.float64, seed=None, start=0
+):
+    """
+    Simulate the results of every competitor in cache-sized blocks of simulations.
 
-    sorted_by_instance = np.sort(random_values, axis=1)
+    Attempts are drawn as (attempts, competitors, chunk) blocks of `chunk_size`
+    simulations. Chunk k of a run, counting from simulation 0, always draws from the
+    stream `make_rng(seed, k)`, so with a fixed seed the results are the same however
+    the simulations are split across calls or processes.
 
-    if format == "a":
-        trimmed = sorted_by_instance[:, 1:4]
-        results = np.mean(trimmed, axis=1)
-    elif format == "m":
-        results = np.mean(sorted_by_instance, axis=1)
-    else:
-        results = sorted_by_instance[:, 0]
+    Parameters
+    ----------
+    means : numpy.ndarray
+        The weighted mean of each competitor's historical averages.
+    stdevs : numpy.ndarray
+        The weighted standard deviation of each competitor's historical averages.
+    dnf_rates : numpy.ndarray
+        The DNF rate of each competitor.
+    event : str
+        The identifier of the event being simulated.
+    count : int
+        The number of simulations to perform.
+    dtype : numpy.dtype, optional
+        Floating point type of the simulated results (default is float64).
+    seed : int or None, optional
+        Root seed of the random streams, fresh entropy if None (default is None).
+    start : int, optional
+        Index of the first simulation within the run, a multiple of `chunk_size`
+        (default is 0).
 
-    return results
+    Yields
+    ------
+    numpy.ndarray
+        A (competitors, chunk) array of simulated competition results.
+    """
+    shape, scale = gamma_parameters(means, stdevs)
+
+    num_competitors = len(means)
+    num_attempts = event_formats[event]["num_attempts"]
+    chunk = chunk_size(num_competitors, event)
+
+    if start % chunk != 0:
+        raise ValueError(f"start must be a multiple of the chunk size {chunk}")
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+
+    for offset in range(start, start + count, chunk):
+        stop = min(offset + chunk, start + count)
+        random_values, dnf = draw_attempts(
+            make_rng(seed, offset // chunk),
+            shape,
+            scale,
+            dnf_rates,
+            (num_attempts, num_competitors, stop - offset),
+            dtype,
+        )
+        yield reduce_attempts(random_values, dnf, event)
+
+
+def tally_field(
+    means,
+    stdevs,
+    dnf_rates,
+    event,
+    count,
+    dtype=np.float64,
+    seed=None,
+    start=0,
+    placements=False,
+):
+    """
+    Simulate the results of every competitor and count wins and podiums.
+
+    Used as a worker task: only the tallies are returned to the parent, so no
+    simulated results are pickled or copied between processes.
+
+    Parameters
+    ----------
+    means : numpy.ndarray
+        The weighted mean of each competitor's historical averages.
+    stdevs : numpy.ndarray
+        The weighted standard deviation of each competitor's historical averages.
+    dnf_rates : numpy.ndarray
+        The DNF rate of each competitor.
+    event : str
+        The identifier of the event being simulated.
+    count : int
+        The number of simulations to perform.
+    dtype : numpy.dtype, optional
+        Floating point type of the simulated results (default is float64).
+    seed : int or None, optional
+        Root seed of the random streams, fresh entropy if None (default is None).
+    start : int, optional
+        Index of the first simulation within the run, a multiple of `chunk_size`
+        (default is 0).
+    placements : bool, optional
+        Whether to also count how often each competitor finishes in every place
+        (default is False).
+
+    Returns
+    -------
+    tuple[numpy.ndarray, int]
+        The tallies of each competitor from `tally_results`, and `count`.
+    """
+    num_rows = 2 + len(means) if placements else 2
+    tallies = np.zeros((num_rows, len(means)), dtype=np.int64)
+
+    blocks = iter_field(means, stdevs, dnf_rates, event, count, dtype, seed, start)
+    for block in blocks:
+        tallies += tally_results(block, placements)
+
+    return tallies, count
+
+
+def tally_results(results, placements=False):
+    """
+    Count the outcomes of each competitor in a block of simulations.
+
+    Parameters
+    ----------
+    results : numpy.ndarray
+        A (competitors, simulations) array of simulated competition results.
+    placements : bool, optional
+        Whether to also count how often each competitor finishes in every place
+        (default is False).
+
+    Returns
+    -------
+    numpy.ndarray
+        A (2, competitors) array of the wins and podiums of each competitor,
+        followed by a row per place from `tally_places` if `placements`.
+    """
+    tallies = [np.stack(tally_placings(results))]
+    if placements:
+        tallies.append(tally_places(results))
+
+    return np.concatenate(tallies)
+
+
+def tally_placings(results, podium_size=3):
+    """
+    Count how often each competitor wins and makes the podium.
+
+    Only the podium places are selected with a partition, so the cost grows
+    linearly with the size of the field rather than with a full sort.
+
+    Parameters
+    ----------
+    results : numpy.ndarray
+        A (competitors, simulations) array of simulated competition results.
+    podium_size : int, optional
+        Number of places on the podium (default is 3).
+
+    Returns
+    -------
+    tuple[numpy.ndarray, numpy.ndarray]
+        The number of wins and podiums of each competitor.
+    """
+    num_competitors = results.shape[0]
+    podium_size = min(num_competitors, podium_size)
+
+    podium_indices = np.argpartition(results, podium_size - 1, axis=0)[:podium_size]
+    podium_results = np.take_along_axis(results, podium_indices, axis=0)
+    win_indices = np.take_along_axis(
+        podium_indices, podium_results.argmin(axis=0)[None], axis=0
+    )[0]
+
+    win_by_person = np.bincount(win_indices, minlength=num_competitors)
+    podium_by_person = np.bincount(podium_indices.flat, minlength=num_competitors)
+
+    return win_by_person, podium_by_person
+
+
+def tally_places(results):
+    """
+    Count how often each competitor finishes in each place.
+
+    Parameters
+    ----------
+    results : numpy.ndarray
+        A (competitors, simulations) array of simulated competition results.
+
+    Returns
+    -------
+    numpy.ndarray
+        A (places, competitors) array, where entry [k, i] counts the simulations
+        in which competitor i finished in place k + 1.
+    """
+    num_competitors = results.shape[0]
+
+    ranked = np.argsort(results, axis=0)
+    places = np.arange(num_competitors)[:, None]
+
+    counts = np.bincount(
+        (places * num_competitors + ranked).ravel(),
+        minlength=num_competitors * num_competitors,
+    )
+
+    return counts.reshape(num_competitors, num_competitors)
+
+
+def gamma_parameters(means, stdevs):
+    """
+    Convert means and standard deviations into gamma distribution parameters.
+
+    Parameters
+    ----------
+    means : numpy.ndarray
+        The mean of each distribution.
+    stdevs : numpy.ndarray
+        The standard deviation of each distribution, NaN if it is unknown.
+
+    Returns
+    -------
+    tuple[numpy.ndarray, numpy.ndarray]
+        The shape and scale of each distribution.
+    """
+    stdevs = np.where(np.isnan(stdevs), 0.01, stdevs)
+
+    shape = (means**2) / (stdevs**2)
+    scale = (stdevs**2) / means
+
+    return shape, scale
+
+
+def draw_attempts(rng, shape, scale, dnf_rates, size, dtype=np.float64):
+    """
+    Draw attempt results for a number of competitors.
+
+    Attempts are the leading axis, so every attempt is a contiguous
+    (competitors, simulations) slice and the result kernels reduce across slices
+    instead of along short rows.
+
+    Parameters
+    ----------
+    rng : numpy.random.Generator
+        The generator to draw from.
+    shape : numpy.ndarray
+        The gamma shape of each competitor.
+    scale : numpy.ndarray
+        The gamma scale of each competitor.
+    dnf_rates : numpy.ndarray
+        The DNF rate of each competitor.
+    size : tuple[int, int, int]
+        The (attempts, competitors, simulations) size of the draw.
+    dtype : numpy.dtype, optional
+        Floating point type of the attempt results (default is float64).
+
+    Returns
+    -------
+    tuple[numpy.ndarray, numpy.ndarray]
+        The attempt results and a boolean mask of the attempts that are DNFs.
+    """
+    random_values = rng.standard_gamma(shape[None, :, None], size, dtype=dtype)
+    random_values *= scale[None, :, None]
+
+    dnf = rng.random(size, dtype=dtype) < dnf_rates[None, :, None]
+
+    return random_values, dnf
+
+
+def average_of_5(values, dnf):
+    """
+    Compute WCA averages of 5, dropping the best and worst attempt.
+
+    A single DNF counts as the worst attempt, two or more make the average a DNF.
+
+    Parameters
+    ----------
+    values : numpy.ndarray
+        Attempt results, with attempts along the first axis.
+    dnf : numpy.ndarray
+        Boolean mask of the attempts that are DNFs.
+
+    Returns
+    -------
+    numpy.ndarray
+        The averages, with DNF averages as infinity.
+    """
+    finished = np.where(dnf, 0, values)
+    num_dnf = dnf.sum(axis=0)
+
+    total = finished.sum(axis=0)
+    best = np.where(dnf, np.inf, values).min(axis=0)
+    worst = finished.max(axis=0)
+
+    total -= best
+    total -= np.where(num_dnf == 0, worst, 0)
+    total /= values.shape[0] - 2
+    total[num_dnf > 1] = np.inf
+
+    return total
+
+
+def mean_of_n(values, dnf):
+    """
+    Compute the mean of all attempts, which is a DNF if any attempt is.
+
+    Parameters
+    ----------
+    values : numpy.ndarray
+        Attempt results, with attempts along the first axis.
+    dnf : numpy.ndarray
+        Boolean mask of the attempts that are DNFs.
+
+    Returns
+    -------
+    numpy.ndarray
+        The means, with DNF means as infinity.
+    """
+    means = values.mean(axis=0)
+    means[dnf.any(axis=0)] = np.inf
+
+    return means
+
+
+def best_of_n(values, dnf):
+    """
+    Compute the best successful attempt.
+
+    Parameters
+    ----------
+    values : numpy.ndarray
+        Attempt results, with attempts along the first axis.
+    dnf : numpy.ndarray
+        Boolean mask of the attempts that are DNFs.
+
+    Returns
+    -------
+    numpy.ndarray
+        The best attempts, infinity if every attempt is a DNF.
+    """
+    return np.where(dnf, np.inf, values).min(axis=0)
+
+
+# Result kernels for each format in `event_formats`.
+format_kernels = {
+    "a": average_of_5,
+    "m": mean_of_n,
+    "b": best_of_n,
+}
+
+
+def reduce_attempts(random_values, dnf, event):
+    """
+    Compute the result of each simulated round from its attempts.
+
+    Parameters
+    ----------
+    random_values : numpy.ndarray
+        Attempt results, with attempts along the first axis.
+    dnf : numpy.ndarray
+        Boolean mask of the attempts that are DNFs.
+    event : str
+        The identifier of the event being simulated.
+
+    Returns
+    -------
+    numpy.ndarray
+        The result of each round according to the event's default format, with DNF
+        results as infinity.
+    """
+    format = event_formats[event]["default_format"]
+
+    return format_kernels[format](random_values, dnf)
@@ -0,0 +1,287 @@
+import numpy as np
+
+from formats import event_formats
+from multi_round import iter_sampled_rounds
+from multi_sim import chunk_size, make_rng, reduce_attempts, tally_results
+
+# Number of quantiles in each competitor's inverse-CDF table. Indices are drawn
+# as uint16, so it must not exceed 65536.
+TABLE_SIZE = 1 << 10
+
+
+def draw_table_attempts(rng, tables, field, size):
+    """
+    Draw attempt results by looking up random quantiles of inverse-CDF tables.
+
+    Each attempt costs one uniformly drawn table index and an array lookup, and
+    DNFs come from the infinite entries at the top of the tables.
+
+    Parameters
+    ----------
+    rng : numpy.random.Generator
+        The generator to draw from.
+    tables : numpy.ndarray
+        A C-contiguous (competitors, table size) array of attempt results at evenly
+        spaced quantiles, with DNFs as infinity.
+    field : numpy.ndarray
+        The competitor index of each (competitor or place, simulation), which
+        broadcasts against the last two axes of `size`.
+    size : tuple[int, int, int]
+        The (attempts, competitors or places, simulations) size of the draw.
+
+    Returns
+    -------
+    tuple[numpy.ndarray, numpy.ndarray]
+        The attempt results and a boolean mask of the attempts that are DNFs.
+    """
+    table_size = tables.shape[1]
+
+    index = rng.integers(0, table_size, size, dtype=np.uint16)
+    values = tables.ravel()[(field * table_size)[None] + index]
+
+    return values, np.isinf(values)
+
+
+def simulate_table_field(tables, event, count, dtype=np.float64, seed=None):
+    """
+    Simulate the results of every competitor at once from their tables.
+
+    Parameters
+    ----------
+    tables : numpy.ndarray
+        The (competitors, table size) inverse-CDF table of each competitor.
+    event : str
+        The identifier of the event being simulated.
+    count : int
+        The number of simulations to perform.
+    dtype : numpy.dtype, optional
+        Floating point type of the simulated results (default is float64).
+    seed : int or None, optional
+        Root seed of the random streams, fresh entropy if None (default is None).
+
+    Returns
+    -------
+    numpy.ndarray
+        A (competitors, count) array of simulated competition results.
+    """
+    results = np.empty((len(tables), count), dtype=dtype)
+
+    start = 0
+    for block in iter_table_field(tables, event, count, dtype, seed):
+        results[:, start : start + block.shape[1]] = block
+        start += block.shape[1]
+
+    return results
+
+
+def iter_table_field(tables, event, count, dtype=np.float64, seed=None, start=0):
+    """
+    Simulate every competitor from their tables in cache-sized blocks.
+
+    Chunks and random streams are laid out as in `iter_field`, so a fixed seed gives
+    the same results however the simulations are split.
+
+    Parameters
+    ----------
+    tables : numpy.ndarray
+        The (competitors, table size) inverse-CDF table of each competitor.
+    event : str
+        The identifier of the event being simulated.
+    count : int
+        The number of simulations to perform.
+    dtype : numpy.dtype, optional
+        Floating point type of the simulated results (default is float64).
+    seed : int or None, optional
+        Root seed of the random streams, fresh entropy if None (default is None).
+    start : int, optional
+        Index of the first simulation within the run, a multiple of `chunk_size`
+        (default is 0).
+
+    Yields
+    ------
+    numpy.ndarray
+        A (competitors, chunk) array of simulated competition results.
+    """
+    tables = np.ascontiguousarray(tables, dtype=dtype)
+
+    num_competitors = len(tables)
+    num_attempts = event_formats[event]["num_attempts"]
+    chunk = chunk_size(num_competitors, event)
+    field = np.arange(num_competitors)[:, None]
+
+    if start % chunk != 0:
+        raise ValueError(f"start must be a multiple of the chunk size {chunk}")
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+
+    for offset in range(start, start + count, chunk):
+        stop = min(offset + chunk, start + count)
+        values, dnf = draw_table_attempts(
+            make_rng(seed, offset // chunk),
+            tables,
+            field,
+            (num_attempts, num_competitors, stop - offset),
+        )
+        yield reduce_attempts(values, dnf, event)
+
+
+def tally_table_field(
+    tables, event, count, dtype=np.float64, seed=None, start=0, placements=False
+):
+    """
+    Simulate every competitor from their tables and count wins and podiums.
+
+    Used as a worker task: only the tallies are returned to the parent.
+
+    Parameters
+    ----------
+    tables : numpy.ndarray
+        The (competitors, table size) inverse-CDF table of each competitor.
+    event : str
+        The identifier of the event being simulated.
+    count : int
+        The number of simulations to perform.
+    dtype : numpy.dtype, optional
+        Floating point type of the simulated results (default is float64).
+    seed : int or None, optional
+        Root seed of the random streams, fresh entropy if None (default is None).
+    start : int, optional
+        Index of the first simulation within the run, a multiple of `chunk_size`
+        (default is 0).
+    placements : bool, optional
+        Whether to also count how often each competitor finishes in every place
+        (default is False).
+
+    Returns
+    -------
+    tuple[numpy.ndarray, int]
+        The tallies of each competitor from `tally_results`, and `count`.
+    """
+    num_rows = 2 + len(tables) if placements else 2
+    tallies = np.zeros((num_rows, len(tables)), dtype=np.int64)
+
+    for block in iter_table_field(tables, event, count, dtype, seed, start):
+        tallies += tally_results(block, placements)
+
+    return tallies, count
+
+
+def iter_table_rounds(
+    tables,
+    event,
+    rounds,
+    count,
+    dtype=np.float64,
+    seed=None,
+    start=0,
+    placements=False,
+    podium_size=3,
+):
+    """
+    Simulate every round of an event from the competitors' tables.
+
+    A DNF is taken to use as much time as the competitor's slowest tabulated
+    solve, which only matters for cumulative time limits.
+
+    Parameters
+    ----------
+    tables : numpy.ndarray
+        The (competitors, table size) inverse-CDF table of each competitor.
+    event : str
+        The identifier of the event being simulated.
+    rounds : list[CompetitionRound]
+        The rounds of the event, ending with the final.
+    count : int
+        The number of simulations to perform.
+    dtype : numpy.dtype, optional
+        Floating point type of the simulated results (default is float64).
+    seed : int or None, optional
+        Root seed of the random streams, fresh entropy if None (default is None).
+    start : int, optional
+        Index of the first simulation within the run, a multiple of `chunk_size`
+        (default is 0).
+    placements : bool, optional
+        Whether to also count how often each competitor finishes in every place of
+        the final (default is False).
+    podium_size : int, optional
+        Number of places on the podium (default is 3).
+
+    Yields
+    ------
+    tuple[numpy.ndarray, int]
+        The tallies of each competitor in a chunk, as in `iter_rounds`, and the
+        number of simulations in the chunk.
+    """
+    tables = np.ascontiguousarray(tables, dtype=dtype)
+
+    solved = np.isfinite(tables)
+    dnf_times = np.where(solved, tables, 0).max(axis=1)
+
+    def draw(rng, field, size, dtype):
+        values, dnf = draw_table_attempts(rng, tables, field, size)
+        return np.where(dnf, dnf_times[field][None], values), dnf
+
+    yield from iter_sampled_rounds(
+        draw,
+        len(tables),
+        event,
+        rounds,
+        count,
+        dtype,
+        seed,
+        start,
+        placements,
+        podium_size,
+    )
+
+
+def tally_table_rounds(
+    tables,
+    event,
+    rounds,
+    count,
+    dtype=np.float64,
+    seed=None,
+    start=0,
+    placements=False,
+):
+    """
+    Simulate every round from the competitors' tables and count the outcomes.
+
+    Used as a worker task: only the tallies are returned to the parent.
+
+    Parameters
+    ----------
+    tables : numpy.ndarray
+        The (competitors, table size) inverse-CDF table of each competitor.
+    event : str
+        The identifier of the event being simulated.
+    rounds : list[CompetitionRound]
+        The rounds of the event, ending with the final.
+    count : int
+        The number of simulations to perform.
+    dtype : numpy.dtype, optional
+        Floating point type of the simulated results (default is float64).
+    seed : int or None, optional
+        Root seed of the random streams, fresh entropy if None (default is None).
+    start : int, optional
+        Index of the first simulation within the run, a multiple of `chunk_size`
+        (default is 0).
+    placements : bool, optional
+        Whether to also count how often each competitor finishes in every place of
+        the final (default is False).
+
+    Returns
+    -------
+    tuple[numpy.ndarray, int]
+        The tallies of each competitor from `iter_table_rounds`, and `count`.
+    """
+    num_rows = 3 + len(tables) if placements else 3
+    tallies = np.zeros((num_rows, len(tables)), dtype=np.int64)
+
+    for chunk_tallies, _ in iter_table_rounds(
+        tables, event, rounds, count, dtype, seed, start, placements
+    ):
+        tallies += chunk_tallies
+
+    return tallies, count
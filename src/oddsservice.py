@@ -0,0 +1,334 @@
+from multiprocessing import Pool
+from threading import Lock
+import pandas as pd
+
+from competitionsimulator import CompetitionSimulator
+from dbwrapper import DBWrapper
+from formats import event_formats
+from registry import SIMULATORS
+from request_info import get_competitors, get_rounds, get_wcif, get_wcifs
+from summarystore import SummaryStore
+
+
+class OddsService:
+    """
+    Computes competition odds against a dataset and worker pool that stay loaded.
+
+    The database wrapper, with its partition indexes and cached connections, and the
+    worker pool are created once and shared by every request, so a request only pays
+    for fetching the competitor list, fitting and simulating.
+
+    Attributes
+    ----------
+    db_wrapper : DBWrapper
+        Database wrapper providing access to competition data.
+    summary_store : SummaryStore or None
+        Store of precomputed competitor summaries, for simulators that use them.
+    pool : multiprocessing.pool.Pool
+        The worker pool shared by every simulation.
+    offline : bool
+        Whether competitions are only read from the WCIF cache.
+
+    Methods
+    -------
+    __init__(self, db_wrapper, summary_store=None, processes=None, offline=False)
+        Starts the worker pool.
+
+    odds(self, competition_id, event, count=100000, rounds=False, num_competitors=16, simulator='distribution', **options) -> pd.DataFrame
+        Computes the win and podium odds of the competitors in an event.
+
+    odds_many(self, requests, count=100000, rounds=False, num_competitors=16, simulator='distribution', **options) -> dict[tuple[str, str], pd.DataFrame]
+        Computes the odds of many events at once, one worker per event.
+
+    close(self)
+        Shuts down the worker pool.
+
+    _summary_store_for(self, simulator_type) -> SummaryStore | None
+        Returns the summary store if the simulator uses one.
+    """
+
+    def __init__(
+        self,
+        db_wrapper: DBWrapper,
+        summary_store: SummaryStore | None = None,
+        processes: int | None = None,
+        offline: bool = False,
+    ):
+        """
+        Starts the worker pool.
+
+        Parameters
+        ----------
+        db_wrapper : DBWrapper
+            Database wrapper providing access to competition data.
+        summary_store : SummaryStore, optional
+            Store of precomputed competitor summaries (default is None).
+        processes : int, optional
+            Number of worker processes, one per CPU if None (default is None).
+        offline : bool, optional
+            Only read competitions from the WCIF cache (default is False).
+        """
+        self.db_wrapper = db_wrapper
+        self.summary_store = summary_store
+        self.pool = Pool(processes)
+        self.offline = offline
+        # Held while preparing data only: fitting writes to the summary store and
+        # the backends are not thread-safe. Each request simulates on its own
+        # simulator, and the pool accepts tasks from any thread.
+        self._lock = Lock()
+
+    def odds(
+        self,
+        competition_id: str,
+        event: str,
+        count: int = 100000,
+        rounds: bool = False,
+        num_competitors: int | None = 16,
+        simulator: str = "distribution",
+        **options,
+    ) -> pd.DataFrame:
+        """
+        Computes the win and podium odds of the competitors in an event.
+
+        Parameters
+        ----------
+        competition_id : str
+            The competition ID.
+        event : str
+            The event to simulate.
+        count : int, optional
+            Number of simulations to run (default is 100000).
+        rounds : bool, optional
+            Simulate every round of the event from all registered competitors
+            instead of a single final (default is False).
+        num_competitors : int or None, optional
+            Number of top ranked competitors in a single final, or None for the
+            whole field (default is 16).
+        simulator : str, optional
+            The name of the simulator in `SIMULATORS` (default is 'distribution').
+        **options
+            Passed on to `DistributionSamplingSimulator.run_simulation`.
+
+        Returns
+        -------
+        pd.DataFrame
+            DataFrame with the win and podium probability of each competitor.
+        """
+        simulator_type = SIMULATORS.load(simulator)
+        competitors, event_rounds = fetch_field(
+            competition_id, event, rounds, num_competitors, offline=self.offline
+        )
+
+        results_calculator = simulator_type(
+            self.db_wrapper, self._summary_store_for(simulator_type), self.pool
+        )
+
+        with self._lock:
+            results_calculator.prepare_data(event, competitors)
+
+        return results_calculator.run_simulation(count, rounds=event_rounds, **options)
+
+    def odds_many(
+        self,
+        requests: list[tuple[str, str]],
+        count: int = 100000,
+        rounds: bool = False,
+        num_competitors: int | None = 16,
+        simulator: str = "distribution",
+        **options,
+    ) -> dict[tuple[str, str], pd.DataFrame]:
+        """
+        Computes the odds of many events at once, one worker per event.
+
+        Each competition's WCIF is fetched once, all of them concurrently, and every
+        event is fitted against the shared backend in this process. Each event is
+        then simulated as a whole in a worker, largest first, so events run side by
+        side across cores.
+
+        Parameters
+        ----------
+        requests : list[tuple[str, str]]
+            The (competition ID, event) pairs to compute odds for.
+        count : int, optional
+            Number of simulations to run per event (default is 100000).
+        rounds : bool, optional
+            Simulate every round of each event from all registered competitors
+            instead of a single final (default is False).
+        num_competitors : int or None, optional
+            Number of top ranked competitors in a single final, or None for the
+            whole field (default is 16).
+        simulator : str, optional
+            The name of the simulator in `SIMULATORS` (default is 'distribution').
+        **options
+            Passed on to `DistributionSamplingSimulator.run_simulation`, except
+            `engine`, since each event already runs in a worker.
+
+        Returns
+        -------
+        dict[tuple[str, str], pd.DataFrame]
+            The odds of every request, in request order. Requests whose competition
+            could not be fetched, or that failed to prepare or simulate, are left
+            out.
+
+        Raises
+        ------
+        ValueError
+            If there is no simulator named `simulator`.
+        """
+        simulator_type = SIMULATORS.load(simulator)
+        options.pop("engine", None)
+        requests = list(dict.fromkeys(requests))
+
+        wcifs = get_wcifs([request[0] for request in requests], self.offline)
+
+        fields = {}
+        event_rounds = {}
+        for request in requests:
+            if request[0] not in wcifs:
+                continue
+            try:
+                fields[request], event_rounds[request] = fetch_field(
+                    *request, rounds, num_competitors, wcifs[request[0]]
+                )
+            except ValueError as e:
+                print(f"Error fetching {request[0]}: {e}")
+
+        simulators = {}
+        for request, competitors in fields.items():
+            results_calculator = simulator_type(
+                self.db_wrapper, self._summary_store_for(simulator_type)
+            )
+            try:
+                with self._lock:
+                    results_calculator.prepare_data(request[1], competitors)
+            except Exception as e:
+                print(f"Error preparing {request[0]} {request[1]}: {e}")
+                continue
+            simulators[request] = results_calculator.detach()
+
+        # Largest simulations first, so the last ones to finish are short.
+        def cost(request):
+            prepared = simulators[request]
+            num_attempts = event_formats[prepared.event]["num_attempts"]
+            return len(prepared.competitors) * num_attempts
+
+        pending = {
+            request: self.pool.apply_async(
+                simulate,
+                (
+                    simulators[request],
+                    count,
+                    dict(options, rounds=event_rounds[request]),
+                ),
+            )
+            for request in sorted(simulators, key=cost, reverse=True)
+        }
+
+        results = {}
+        for request in requests:
+            if request not in pending:
+                continue
+            try:
+                results[request] = pending[request].get()
+            except Exception as e:
+                print(f"Error simulating {request[0]} {request[1]}: {e}")
+
+        return results
+
+    def _summary_store_for(self, simulator_type: type) -> SummaryStore | None:
+        """
+        Returns the summary store if the simulator uses one.
+
+        Parameters
+        ----------
+        simulator_type : type
+            The class of the simulator.
+
+        Returns
+        -------
+        SummaryStore or None
+            The summary store, or None if there is none or the simulator does not
+            use summaries.
+        """
+        if simulator_type.uses_summaries:
+            return self.summary_store
+        return None
+
+    def close(self):
+        """
+        Shuts down the worker pool.
+        """
+        self.pool.close()
+        self.pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def fetch_field(
+    competition_id: str,
+    event: str,
+    rounds: bool = False,
+    num: int | None = 16,
+    wcif: dict | None = None,
+    offline: bool = False,
+):
+    """
+    Fetches the competitors and, optionally, the rounds of an event.
+
+    Parameters
+    ----------
+    competition_id : str
+        The competition ID.
+    event : str
+        The event to fetch.
+    rounds : bool, optional
+        Fetch every registered competitor and the event's rounds, rather than the
+        top ranked competitors only (default is False).
+    num : int or None, optional
+        Number of top ranked competitors to fetch without `rounds`, or None for all
+        of them (default is 16).
+    wcif : dict, optional
+        The competition's WCIF, fetched if not given.
+    offline : bool, optional
+        Only use the WCIF cache when fetching (default is False).
+
+    Returns
+    -------
+    tuple[list[dict[str, str]], list[CompetitionRound] | None]
+        The competitors, and the rounds or None.
+    """
+    if wcif is None:
+        wcif = get_wcif(competition_id, offline)
+
+    if not rounds:
+        return get_competitors(competition_id, event, num=num, wcif=wcif), None
+
+    return (
+        get_competitors(competition_id, event, num=None, wcif=wcif),
+        get_rounds(competition_id, event, wcif=wcif),
+    )
+
+
+def simulate(simulator: CompetitionSimulator, count: int, options: dict):
+    """
+    Runs a detached simulator in a worker process.
+
+    Parameters
+    ----------
+    simulator : CompetitionSimulator
+        A simulator with its competitors prepared.
+    count : int
+        Number of simulations to run.
+    options : dict
+        Passed on to `DistributionSamplingSimulator.run_simulation`.
+
+    Returns
+    -------
+    pd.DataFrame
+        The simulation results.
+    """
+    return simulator.run_simulation(count, engine="vectorized", **options)
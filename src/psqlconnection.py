@@ -1,7 +1,10 @@
+from dotenv import load_dotenv
+import os
 import sqlalchemy
 import pandas as pd
 from pandas.core.api import DataFrame as DataFrame
 from dbwrapper import DBWrapper
+from psqlsummarystore import PSQLSummaryStore
 
 
 class PSQLConnection(DBWrapper):
@@ -20,6 +23,12 @@ class PSQLConnection(DBWrapper):
 
     query(self, event, names, length=365)
         Executes a query to retrieve results from the database.
+
+    dataset_version(self)
+        Returns the version stamped on the database when the results were loaded.
+
+    _fetch_bulk(self, event, names, length=365)
+        Executes a single query to retrieve the results of all competitors.
     """
 
     def __init__(
@@ -59,6 +68,12 @@ class PSQLConnection(DBWrapper):
         """
         Executes a query to retrieve results from the database.
 
+        Uses the denormalized `Results.date` column so each lookup is a range scan of
+        the (eventId, personId, date) index. Databases created before these were in
+        db/wca_results.ddl need the migrations in db/migrations, in order:
+        001_results_date.sql for the column and index, and 002_dataset_info.sql for
+        `dataset_version`.
+
         Parameters
         ----------
         event : str
@@ -74,18 +89,100 @@ class PSQLConnection(DBWrapper):
             A dictionary mapping person IDs to pandas DataFrames of query results.
         """
         query = r"""
-        SELECT value1, value2, value3, value4, value5, TO_DATE(CONCAT(year, '-', month, '-', day), 'YYYY-MM-DD') AS date 
-        FROM Results 
-        JOIN Competitions ON id = competitionId
-        WHERE personId = %s AND eventId = %s AND (CURRENT_DATE - TO_DATE(CONCAT(year, '-', month, '-', day), 'YYYY-MM-DD')) < %s
-        ORDER BY (CURRENT_DATE - TO_DATE(CONCAT(year, '-', month, '-', day), 'YYYY-MM-DD')) DESC;
+        SELECT value1, value2, value3, value4, value5, date
+        FROM Results
+        WHERE eventId = %s AND personId = %s AND date > CURRENT_DATE - %s
+        ORDER BY date;
         """
 
         results = {}
 
         for id in names:
             results[id] = pd.read_sql_query(
-                sql=query, con=self.engine, params=(id, event, length)
+                sql=query, con=self.engine, params=(event, id, length)
             )
 
         return results
+
+    def dataset_version(self) -> int | None:
+        """
+        Returns the version stamped on the database when the results were loaded.
+
+        Databases created before the table was added to db/wca_results.ddl need
+        db/migrations/002_dataset_info.sql, after 001_results_date.sql.
+
+        Returns
+        -------
+        int or None
+            The version from the DatasetInfo table, or None if it is missing.
+        """
+        try:
+            with self.engine.connect() as connection:
+                return connection.exec_driver_sql(
+                    "SELECT MAX(version) FROM DatasetInfo"
+                ).scalar()
+        except sqlalchemy.exc.SQLAlchemyError:
+            return None
+
+    def _fetch_bulk(self, event: str, names: list[str], length=365) -> DataFrame:
+        """
+        Executes a single query to retrieve the results of all competitors.
+
+        Parameters
+        ----------
+        event : str
+            The event identifier for filtering results.
+        names : list[str]
+            List of person IDs to retrieve results for.
+        length : int, optional
+            Number of days to limit results by age (default is 365).
+
+        Returns
+        -------
+        DataFrame
+            The results of all competitors, with a `personId` column.
+        """
+        query = r"""
+        SELECT personId AS "personId", value1, value2, value3, value4, value5, date
+        FROM Results
+        WHERE eventId = %s AND personId = ANY(%s) AND date > CURRENT_DATE - %s
+        ORDER BY personId, date;
+        """
+
+        return pd.read_sql_query(
+            sql=query, con=self.engine, params=(event, list(names), length)
+        )
+
+
+def open_backend(
+    summaries: bool = False,
+) -> tuple[PSQLConnection, PSQLSummaryStore | None]:
+    """
+    Connects to the wca_results database with the credentials from the environment.
+
+    The PSQL_USERNAME and PSQL_PASSWORD variables are read from the environment or
+    a .env file.
+
+    Parameters
+    ----------
+    summaries : bool, optional
+        Whether to also open the summary store in the database (default is False).
+
+    Returns
+    -------
+    tuple[PSQLConnection, PSQLSummaryStore | None]
+        The connection and the summary store, or None if summaries are off.
+    """
+    load_dotenv()
+    username = os.getenv("PSQL_USERNAME")
+    password = os.getenv("PSQL_PASSWORD")
+
+    db_connection = PSQLConnection(
+        dbname="wca_results",
+        username=username,
+        password=password,
+        connect_args={"options": "-csearch_path=wca_results"},
+    )
+    summary_store = PSQLSummaryStore(db_connection.engine) if summaries else None
+
+    return db_connection, summary_store
@@ -0,0 +1,116 @@
+import sqlalchemy
+import pandas as pd
+from pandas.core.api import DataFrame as DataFrame
+
+from summarystore import SummaryStore
+
+
+class PSQLSummaryStore(SummaryStore):
+    """
+    A class implementing the SummaryStore interface with a PostgreSQL table.
+
+    The table lives in the results schema, so reloading the results also clears it.
+
+    Attributes
+    ----------
+    engine : sqlalchemy.engine.base.Engine
+        The SQLAlchemy engine for database connection.
+
+    Methods
+    -------
+    __init__(self, engine)
+        Initializes the store and creates its table if necessary.
+
+    _load(self, event, names, window, halflife) -> DataFrame
+        Reads the stored summaries of the given competitors.
+
+    _save(self, summaries) -> None
+        Upserts summaries into the table.
+    """
+
+    def __init__(self, engine: sqlalchemy.engine.Engine) -> None:
+        """
+        Initializes the store and creates its table if necessary.
+
+        Parameters
+        ----------
+        engine : sqlalchemy.engine.base.Engine
+            The SQLAlchemy engine for database connection.
+
+        Returns
+        -------
+        None
+        """
+        self.engine = engine
+
+        with self.engine.begin() as connection:
+            connection.exec_driver_sql(r"""
+                CREATE TABLE IF NOT EXISTS CompetitorSummary (
+                    personId VARCHAR(10) NOT NULL,
+                    eventId event NOT NULL,
+                    window_days INT NOT NULL,
+                    halflife TEXT NOT NULL,
+                    mean DOUBLE PRECISION NOT NULL,
+                    stdev DOUBLE PRECISION NOT NULL,
+                    dnf_rate DOUBLE PRECISION NOT NULL,
+                    first_date DATE NOT NULL,
+                    version BIGINT NOT NULL,
+                    PRIMARY KEY(eventId, window_days, halflife, personId)
+                );
+                """)
+
+    def _load(
+        self, event: str, names: list[str], window: int, halflife: str
+    ) -> DataFrame:
+        """
+        Reads the stored summaries of the given competitors.
+
+        Parameters
+        ----------
+        event : str
+            The event identifier.
+        names : list[str]
+            List of person IDs.
+        window : int
+            Number of days of results the summaries cover.
+        halflife : str
+            Halflife of the exponential weighting.
+
+        Returns
+        -------
+        DataFrame
+            The matching summaries.
+        """
+        query = r"""
+        SELECT personId AS "personId", eventId AS "eventId", window_days AS window, halflife, mean, stdev, dnf_rate, first_date, version
+        FROM CompetitorSummary
+        WHERE eventId = %s AND window_days = %s AND halflife = %s AND personId = ANY(%s);
+        """
+
+        return pd.read_sql_query(
+            sql=query, con=self.engine, params=(event, window, halflife, names)
+        )
+
+    def _save(self, summaries: DataFrame) -> None:
+        """
+        Upserts summaries into the table.
+
+        Parameters
+        ----------
+        summaries : DataFrame
+            The summaries to add or replace.
+
+        Returns
+        -------
+        None
+        """
+        query = sqlalchemy.text(r"""
+            INSERT INTO CompetitorSummary (personId, eventId, window_days, halflife, mean, stdev, dnf_rate, first_date, version)
+            VALUES (:personId, :eventId, :window, :halflife, :mean, :stdev, :dnf_rate, :first_date, :version)
+            ON CONFLICT (eventId, window_days, halflife, personId) DO UPDATE
+            SET mean = EXCLUDED.mean, stdev = EXCLUDED.stdev, dnf_rate = EXCLUDED.dnf_rate,
+                first_date = EXCLUDED.first_date, version = EXCLUDED.version;
+            """)
+
+        with self.engine.begin() as connection:
+            connection.execute(query, summaries.astype(object).to_dict("records"))
@@ -0,0 +1,119 @@
+from importlib import import_module
+
+
+class Registry:
+    """
+    A set of named implementations, each imported only when it is first used.
+
+    Implementations are registered as 'module:attribute' strings, so listing the
+    names, e.g. for command line choices, imports nothing, and selecting one only
+    imports its own module and dependencies.
+
+    Attributes
+    ----------
+    kind : str
+        What the implementations are, used in error messages.
+
+    Methods
+    -------
+    __init__(self, kind, entries=None)
+        Initializes the registry with its first entries.
+
+    register(self, name, target)
+        Adds or replaces an implementation.
+
+    load(self, name)
+        Imports and returns an implementation.
+
+    names(self) -> list[str]
+        Returns the names of every implementation.
+    """
+
+    def __init__(self, kind: str, entries: dict[str, str] | None = None):
+        """
+        Initializes the registry with its first entries.
+
+        Parameters
+        ----------
+        kind : str
+            What the implementations are, used in error messages.
+        entries : dict[str, str], optional
+            The 'module:attribute' location of each implementation, by name
+            (default is None).
+        """
+        self.kind = kind
+        self._entries = dict(entries or {})
+        self._loaded = {}
+
+    def register(self, name: str, target: str):
+        """
+        Adds or replaces an implementation.
+
+        Parameters
+        ----------
+        name : str
+            The name to select it by.
+        target : str
+            Its location, as 'module:attribute'.
+        """
+        self._entries[name] = target
+        self._loaded.pop(name, None)
+
+    def load(self, name: str):
+        """
+        Imports and returns an implementation.
+
+        Parameters
+        ----------
+        name : str
+            The name of the implementation.
+
+        Returns
+        -------
+        object
+            The implementation's attribute of its module.
+
+        Raises
+        ------
+        ValueError
+            If no implementation has the name.
+        """
+        if name not in self._loaded:
+            if name not in self._entries:
+                raise ValueError(f"Unknown {self.kind}: {name}")
+
+            module, attribute = self._entries[name].split(":")
+            self._loaded[name] = getattr(import_module(module), attribute)
+
+        return self._loaded[name]
+
+    def names(self) -> list[str]:
+        """
+        Returns the names of every implementation.
+
+        Returns
+        -------
+        list[str]
+            The names, in the order they were registered.
+        """
+        return list(self._entries)
+
+
+# Functions opening each results backend, taking whether to also open a summary
+# store and returning `(DBWrapper, SummaryStore | None)`.
+BACKENDS = Registry(
+    "database type",
+    {
+        "psql": "psqlconnection:open_backend",
+        "csv": "csvparser:open_backend",
+        "sqlite": "sqliteconnection:open_backend",
+    },
+)
+
+SIMULATORS = Registry(
+    "simulator",
+    {
+        "distribution": "dist_sample:DistributionSamplingSimulator",
+        "empirical": "empirical_sample:EmpiricalSamplingSimulator",
+    },
+)
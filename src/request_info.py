@@ -1,5 +1,23 @@
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate
 from requests import get
-from requests.exceptions import HTTPError
+from requests.exceptions import ConnectionError, HTTPError, RequestException
+import json
+import os
+import tempfile
+import time
+
+from competitionround import CompetitionRound
+
+sep = os.path.sep
+
+# Overridable with the WCA_API_URL, WCIF_CACHE_PATH, WCIF_CACHE_TTL and
+# WCA_API_TIMEOUT environment variables, e.g. to point at a local stand-in server.
+WCA_API_URL = "https://api.worldcubeassociation.org"
+WCIF_CACHE_PATH = f"db{sep}wcif_cache"
+# Seconds a cached WCIF is used without asking the API whether it changed.
+WCIF_CACHE_TTL = 3600
+REQUEST_TIMEOUT = 10
 
 
 def get_pb_rank(person, event):
@@ -23,7 +41,132 @@ def get_pb_rank(person, event):
             return result["worldRanking"]
 
 
-def get_competitors(compId: str, event, num: int = 16):
+def get_wcif(compId: str, offline: bool = False) -> dict:
+    """
+    Fetches the public WCIF of a competition, through an on-disk cache.
+
+    A cached WCIF younger than the TTL is returned without touching the network.
+    An older one is revalidated with its ETag and Last-Modified date, so an
+    unchanged WCIF is not downloaded again, and is still used if the API cannot be
+    reached.
+
+    Parameters
+    ----------
+    compId : str
+        The competition ID.
+    offline : bool, optional
+        Only use the cache, whatever its age (default is False).
+
+    Returns
+    -------
+    dict
+        The competition's WCIF.
+
+    Raises
+    ------
+    HTTPError
+        If the competition with the specified ID is not found.
+    ConnectionError
+        If the WCIF is not cached and the API cannot be reached, or in offline mode.
+    """
+    cache_path = os.path.join(
+        os.getenv("WCIF_CACHE_PATH", WCIF_CACHE_PATH), f"{compId}.json"
+    )
+    ttl = float(os.getenv("WCIF_CACHE_TTL", WCIF_CACHE_TTL))
+
+    cached = _load_cached_wcif(cache_path)
+
+    if cached is not None and (offline or time.time() - cached["fetched"] < ttl):
+        return cached["wcif"]
+    if offline:
+        raise ConnectionError(f"No cached WCIF for {compId} in offline mode.")
+
+    headers = {}
+    if cached is not None:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        headers["If-Modified-Since"] = cached.get("last_modified") or formatdate(
+            cached["fetched"], usegmt=True
+        )
+
+    api_url = os.getenv("WCA_API_URL", WCA_API_URL).rstrip("/")
+    url = f"{api_url}/competitions/{compId}/wcif/public"
+
+    try:
+        response = get(
+            url,
+            headers=headers,
+            timeout=float(os.getenv("WCA_API_TIMEOUT", REQUEST_TIMEOUT)),
+        )
+    except RequestException as e:
+        if cached is None:
+            raise
+        print(f"Using cached WCIF for {compId}, the API could not be reached: {e}")
+        return cached["wcif"]
+
+    if response.status_code == 304 and cached is not None:
+        cached["fetched"] = time.time()
+        _save_cached_wcif(cache_path, cached)
+        return cached["wcif"]
+
+    if response.status_code != 200:
+        raise HTTPError(
+            f"Error {response.status_code}: Competition with id {compId} not found."
+        )
+
+    data = response.json()
+    _save_cached_wcif(
+        cache_path,
+        {
+            "fetched": time.time(),
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "wcif": data,
+        },
+    )
+
+    return data
+
+
+def get_wcifs(
+    compIds: list[str], offline: bool = False, max_workers: int = 8
+) -> dict[str, dict]:
+    """
+    Fetches the WCIFs of many competitions concurrently.
+
+    Parameters
+    ----------
+    compIds : list[str]
+        The competition IDs, duplicates are fetched once.
+    offline : bool, optional
+        Only use the cache, whatever its age (default is False).
+    max_workers : int, optional
+        Number of requests in flight at once (default is 8).
+
+    Returns
+    -------
+    dict[str, dict]
+        The WCIF of every competition that could be fetched. Failures are reported
+        and left out.
+    """
+    compIds = list(dict.fromkeys(compIds))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        fetches = {id: executor.submit(get_wcif, id, offline) for id in compIds}
+
+    wcifs = {}
+    for id, fetch in fetches.items():
+        try:
+            wcifs[id] = fetch.result()
+        except RequestException as e:
+            print(f"Error fetching {id}: {e}")
+
+    return wcifs
+
+
+def get_competitors(
+    compId: str, event, num: int | None = 16, wcif=None, offline: bool = False
+):
     """
     Retrieves competitors from a competition based on specified criteria.
 
@@ -33,8 +176,12 @@ def get_competitors(compId: str, event, num: int = 16):
         The competition ID.
     event : str
         The event to filter competitors by.
-    num : int, optional
-        Number of top competitors to return. Defaults to 16.
+    num : int or None, optional
+        Number of top competitors to return, or None for all of them. Defaults to 16.
+    wcif : dict, optional
+        The competition's WCIF, fetched if not given.
+    offline : bool, optional
+        Only use the WCIF cache when fetching (default is False).
 
     Returns
     -------
@@ -47,14 +194,7 @@ def get_competitors(compId: str, event, num: int = 16):
     HTTPError
         If the competition with the specified ID is not found.
     """
-    url = f"https://api.worldcubeassociation.org/competitions/{compId}/wcif/public"
-    response = get(url)
-    data = response.json()
-
-    if response.status_code != 200:
-        raise HTTPError(
-            f"Error {response.status_code}: Competition with id {compId} not found."
-        )
+    data = wcif if wcif is not None else get_wcif(compId, offline)
 
     competitors = data["persons"]
     competitors_in_event = []
@@ -77,3 +217,88 @@ def get_competitors(compId: str, event, num: int = 16):
     competitors_in_event.sort(key=lambda x: x["rank"])
 
     return [{"id": i["id"], "name": i["name"]} for i in competitors_in_event[:num]]
+
+
+def get_rounds(compId: str, event, wcif=None, offline: bool = False):
+    """
+    Retrieves the rounds scheduled for an event at a competition.
+
+    Parameters
+    ----------
+    compId : str
+        The competition ID.
+    event : str
+        The event to get the rounds of.
+    wcif : dict, optional
+        The competition's WCIF, fetched if not given.
+    offline : bool, optional
+        Only use the WCIF cache when fetching (default is False).
+
+    Returns
+    -------
+    list[CompetitionRound]
+        The rounds of the event in order, ending with the final.
+
+    Raises
+    ------
+    HTTPError
+        If the competition with the specified ID is not found.
+    ValueError
+        If the event is not held at the competition, or has no rounds scheduled.
+    """
+    data = wcif if wcif is not None else get_wcif(compId, offline)
+
+    for wcif_event in data["events"]:
+        if wcif_event["id"] == event:
+            if not wcif_event["rounds"]:
+                raise ValueError(f"Event {event} has no rounds at {compId}.")
+            return [CompetitionRound.from_wcif(i) for i in wcif_event["rounds"]]
+
+    raise ValueError(f"Event {event} is not held at {compId}.")
+
+
+def _load_cached_wcif(cache_path: str) -> dict | None:
+    """
+    Reads a cached WCIF and its validators.
+
+    Parameters
+    ----------
+    cache_path : str
+        Path to the cache entry.
+
+    Returns
+    -------
+    dict or None
+        The entry, with `fetched`, `etag`, `last_modified` and `wcif` keys, or None
+        if there is no readable entry.
+    """
+    try:
+        with open(cache_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_cached_wcif(cache_path: str, entry: dict) -> None:
+    """
+    Atomically writes a cache entry.
+
+    Parameters
+    ----------
+    cache_path : str
+        Path to the cache entry.
+    entry : dict
+        The entry to write.
+
+    Returns
+    -------
+    None
+    """
+    cache_dir = os.path.dirname(cache_path)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(entry, f)
+
+    os.replace(tmp_path, cache_path)
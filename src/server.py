@@ -0,0 +1,272 @@
+from argparse import ArgumentParser
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import ThreadingUnixStreamServer
+from urllib.parse import parse_qs, urlparse
+from requests.exceptions import HTTPError, RequestException
+import json
+import os
+
+from formats import event_formats
+from main import open_backend
+from oddsservice import OddsService
+from registry import BACKENDS, SIMULATORS
+
+
+class OddsRequestHandler(BaseHTTPRequestHandler):
+    """
+    Answers odds requests against the `OddsService` attached to the server.
+
+    Endpoints
+    ---------
+    GET /odds?competitionId=<id>&event=<event>[&n=<count>][&tolerance=<se>][&time_budget=<s>][&engine=<engine>][&seed=<seed>][&rounds=1][&competitors=<k>][&simulator=<name>]
+        The win and podium odds of the competitors in an event, as JSON.
+    GET /health
+        Returns 200 once the service is up.
+
+    Attributes
+    ----------
+    server : socketserver.BaseServer
+        The server, with the `OddsService` in its `service` attribute.
+
+    Methods
+    -------
+    do_GET(self)
+        Dispatches a GET request.
+
+    _odds_request(self, query: dict[str, list[str]]) -> tuple[str, str, int, dict]
+        Parses and validates an odds request.
+
+    _odds(self, competition_id: str, event: str, count: int, options: dict) -> dict
+        Computes the response to an odds request.
+
+    _send_json(self, status: HTTPStatus, body: dict)
+        Writes a JSON response.
+    """
+
+    def do_GET(self):
+        """
+        Dispatches a GET request.
+        """
+        url = urlparse(self.path)
+
+        if url.path == "/health":
+            self._send_json(HTTPStatus.OK, {"status": "ok"})
+            return
+        if url.path != "/odds":
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"No route {url.path}"})
+            return
+
+        try:
+            request = self._odds_request(parse_qs(url.query))
+        except (KeyError, ValueError) as e:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": f"Bad request: {e}"})
+            return
+
+        try:
+            body = self._odds(*request)
+        except HTTPError as e:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": str(e)})
+        except RequestException as e:
+            self._send_json(HTTPStatus.BAD_GATEWAY, {"error": str(e)})
+        except ValueError as e:
+            # Such as an event not held at the competition, or an unknown engine.
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": f"Bad request: {e}"})
+        except Exception as e:
+            self.log_error("Simulation failed: %r", e)
+            self._send_json(
+                HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"Simulation failed: {e}"}
+            )
+        else:
+            self._send_json(HTTPStatus.OK, body)
+
+    def _odds_request(
+        self, query: dict[str, list[str]]
+    ) -> tuple[str, str, int, dict[str, object]]:
+        """
+        Parses and validates an odds request.
+
+        Parameters
+        ----------
+        query : dict[str, list[str]]
+            The parsed query string.
+
+        Returns
+        -------
+        tuple[str, str, int, dict[str, object]]
+            The competition ID, event, number of simulations and the options passed
+            on to `OddsService.odds`.
+
+        Raises
+        ------
+        KeyError
+            If the competition or event is missing.
+        ValueError
+            If a parameter is malformed or out of range.
+        """
+        competition_id = query["competitionId"][0]
+        event = query["event"][0]
+        count = int(query.get("n", [self.server.default_simulations])[0])
+
+        if event not in event_formats:
+            raise ValueError(f"Unknown event: {event}")
+        if count <= 0:
+            raise ValueError(f"n must be positive, got {count}")
+
+        options = {}
+        for key in ["tolerance", "time_budget"]:
+            if key in query:
+                options[key] = float(query[key][0])
+                if not options[key] > 0:
+                    raise ValueError(f"{key} must be positive, got {options[key]}")
+        if "engine" in query:
+            options["engine"] = query["engine"][0]
+        if "simulator" in query:
+            options["simulator"] = query["simulator"][0]
+            if options["simulator"] not in SIMULATORS.names():
+                raise ValueError(f"Unknown simulator: {options['simulator']}")
+        if "seed" in query:
+            options["seed"] = int(query["seed"][0])
+        if "competitors" in query:
+            options["num_competitors"] = int(query["competitors"][0]) or None
+        if "rounds" in query:
+            options["rounds"] = query["rounds"][0].lower() in ["1", "true", "yes"]
+
+        return competition_id, event, count, options
+
+    def _odds(
+        self, competition_id: str, event: str, count: int, options: dict[str, object]
+    ) -> dict:
+        """
+        Computes the response to an odds request.
+
+        Parameters
+        ----------
+        competition_id : str
+            The competition ID.
+        event : str
+            The event to simulate.
+        count : int
+            Number of simulations to run.
+        options : dict[str, object]
+            Passed on to `OddsService.odds`.
+
+        Returns
+        -------
+        dict
+            The request parameters, the number of simulations run and the odds of
+            every competitor.
+
+        Raises
+        ------
+        ArithmeticError
+            If the simulation produced undefined odds, which JSON cannot carry.
+        """
+        results = self.server.service.odds(competition_id, event, count, **options)
+
+        if results.drop(columns="name").isna().any(axis=None):
+            raise ArithmeticError("the simulation produced undefined odds")
+
+        return {
+            "competitionId": competition_id,
+            "event": event,
+            "simulations": int(results.attrs["simulations"]),
+            "results": results.to_dict("records"),
+        }
+
+    def _send_json(self, status: HTTPStatus, body: dict):
+        """
+        Writes a JSON response.
+
+        Parameters
+        ----------
+        status : HTTPStatus
+            The response status.
+        body : dict
+            The response body.
+        """
+        data = json.dumps(body).encode()
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def address_string(self):
+        # Unix socket clients have no address.
+        if isinstance(self.client_address, tuple):
+            return super().address_string()
+        return "unix"
+
+
+def main():
+    """
+    Serves competition odds over HTTP from a long-running process.
+    """
+    parser = ArgumentParser(
+        prog="WCA Odds Server",
+        description="Serve competition odds with the dataset and workers kept warm",
+    )
+
+    parser.add_argument(
+        "-d",
+        "--database",
+        default="psql",
+        choices=BACKENDS.names(),
+        help="Database type",
+    )
+    parser.add_argument(
+        "-s",
+        "--summaries",
+        action="store_true",
+        help="Cache fitted competitor summaries in the database or a local file",
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Only use cached competition data, without contacting the WCA API",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    parser.add_argument("--port", default=8765, type=int, help="Port to listen on")
+    parser.add_argument(
+        "--socket", help="Listen on this Unix socket path instead of a TCP port"
+    )
+    parser.add_argument(
+        "--processes", type=int, help="Number of worker processes (default: CPUs)"
+    )
+    parser.add_argument(
+        "-n",
+        "--num_simulations",
+        default=100000,
+        type=int,
+        help="Number of simulations when a request does not set n",
+    )
+    args = parser.parse_args()
+
+    db_connection, summary_store = open_backend(args.database, args.summaries)
+
+    with OddsService(
+        db_connection, summary_store, args.processes, args.offline
+    ) as service:
+        if args.socket is not None:
+            if os.path.exists(args.socket):
+                os.remove(args.socket)
+            server = ThreadingUnixStreamServer(args.socket, OddsRequestHandler)
+            print(f"Serving on {args.socket}")
+        else:
+            server = ThreadingHTTPServer((args.host, args.port), OddsRequestHandler)
+            print(f"Serving on http://{args.host}:{args.port}")
+
+        server.service = service
+        server.default_simulations = args.num_simulations
+
+        with server:
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+
+
+if __name__ == "__main__":
+    main()
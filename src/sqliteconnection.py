@@ -0,0 +1,218 @@
+from threading import local
+from urllib.parse import quote
+import os
+import sqlite3
+import pandas as pd
+from pandas.core.api import DataFrame as DataFrame
+from dbwrapper import DBWrapper
+from filesummarystore import FileSummaryStore
+
+sep = os.path.sep
+
+# Overridable with the WCA_SQLITE_PATH environment variable.
+SQLITE_PATH = f"db{sep}results_dump{sep}wca_results.sqlite3"
+
+# Person IDs bound per statement, well below SQLite's limit on variables.
+MAX_VARIABLES = 500
+
+# The types of the export, so frames have the same schema as the other backends'
+# even when empty, which SQLite cannot infer from no rows.
+VALUE_DTYPES = {f"value{i}": "int32" for i in range(1, 6)}
+
+
+class SQLiteConnection(DBWrapper):
+    """
+    A class implementing the DBWrapper interface over an embedded SQLite database.
+
+    The database is a single file built from the export by `db/load_sqlite.py`,
+    with results denormalized with their competition date and an (eventId,
+    personId, date) index, so a lookup is a range scan of the index as with
+    PostgreSQL, without a server. It is opened read-only, with one connection per
+    thread, and any number of processes and threads can read it at once.
+
+    Attributes
+    ----------
+    path : str
+        The path to the database file.
+
+    Methods
+    -------
+    __init__(self, path=None)
+        Checks the database file exists.
+
+    query(self, event, names, length=365)
+        Executes a query to retrieve results from the database.
+
+    dataset_version(self)
+        Returns the version stamped on the database when it was built.
+
+    _fetch_bulk(self, event, names, length=365)
+        Executes one query per batch of competitors to retrieve their results.
+
+    _connection(self) -> sqlite3.Connection
+        Returns this thread's read-only connection, opening it if needed.
+    """
+
+    def __init__(self, path: str | None = None) -> None:
+        """
+        Checks the database file exists.
+
+        Parameters
+        ----------
+        path : str, optional
+            The path to the database file, WCA_SQLITE_PATH or SQLITE_PATH if None
+            (default is None).
+
+        Returns
+        -------
+        None
+
+        Raises
+        ------
+        FileNotFoundError
+            If the database has not been built.
+        """
+        self.path = path or os.getenv("WCA_SQLITE_PATH", SQLITE_PATH)
+        self._local = local()
+
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(
+                f"No SQLite database at {self.path}, build it with db/load_sqlite.py"
+            )
+
+    def query(self, event: str, names: list[str], length=365) -> dict[str, DataFrame]:
+        """
+        Executes a query to retrieve results from the database.
+
+        Parameters
+        ----------
+        event : str
+            The event identifier for filtering results.
+        names : list[str]
+            List of person IDs to retrieve results for.
+        length : int, optional
+            Number of days to limit results by age (default is 365).
+
+        Returns
+        -------
+        dict[str, DataFrame]
+            A dictionary mapping person IDs to pandas DataFrames of query results.
+        """
+        query = r"""
+        SELECT value1, value2, value3, value4, value5, date
+        FROM Results
+        WHERE eventId = ? AND personId = ? AND date > date('now', 'localtime', ?)
+        ORDER BY date;
+        """
+
+        results = {}
+
+        for id in names:
+            results[id] = pd.read_sql_query(
+                sql=query,
+                con=self._connection(),
+                params=(event, id, f"-{length} days"),
+                parse_dates=["date"],
+                dtype=VALUE_DTYPES,
+            )
+
+        return results
+
+    def dataset_version(self) -> int | None:
+        """
+        Returns the version stamped on the database when it was built.
+
+        Returns
+        -------
+        int or None
+            The version from the DatasetInfo table, or None if it is missing.
+        """
+        try:
+            return (
+                self._connection()
+                .execute("SELECT MAX(version) FROM DatasetInfo")
+                .fetchone()[0]
+            )
+        except sqlite3.Error:
+            return None
+
+    def _fetch_bulk(self, event: str, names: list[str], length=365) -> DataFrame:
+        """
+        Executes one query per batch of competitors to retrieve their results.
+
+        Parameters
+        ----------
+        event : str
+            The event identifier for filtering results.
+        names : list[str]
+            List of person IDs to retrieve results for.
+        length : int, optional
+            Number of days to limit results by age (default is 365).
+
+        Returns
+        -------
+        DataFrame
+            The results of all competitors, with a `personId` column.
+        """
+        frames = []
+
+        for start in range(0, max(len(names), 1), MAX_VARIABLES):
+            batch = list(names[start : start + MAX_VARIABLES])
+            query = f"""
+            SELECT value1, value2, value3, value4, value5, date, personId
+            FROM Results
+            WHERE eventId = ? AND personId IN ({", ".join("?" * len(batch))})
+                AND date > date('now', 'localtime', ?)
+            ORDER BY personId, date;
+            """
+            frames.append(
+                pd.read_sql_query(
+                    sql=query,
+                    con=self._connection(),
+                    params=(event, *batch, f"-{length} days"),
+                    parse_dates=["date"],
+                    dtype=VALUE_DTYPES,
+                )
+            )
+
+        return pd.concat(frames, ignore_index=True)
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        Returns this thread's read-only connection, opening it if needed.
+
+        Returns
+        -------
+        sqlite3.Connection
+            A connection that cannot write to the database.
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(
+                f"file:{quote(os.path.abspath(self.path))}?mode=ro", uri=True
+            )
+            self._local.connection = connection
+
+        return connection
+
+
+def open_backend(
+    summaries: bool = False,
+) -> tuple[SQLiteConnection, FileSummaryStore | None]:
+    """
+    Opens the SQLite database built from the export.
+
+    Parameters
+    ----------
+    summaries : bool, optional
+        Whether to also open the local summary file (default is False).
+
+    Returns
+    -------
+    tuple[SQLiteConnection, FileSummaryStore | None]
+        The connection and the summary store, or None if summaries are off.
+    """
+    db_connection = SQLiteConnection()
+    summary_store = FileSummaryStore() if summaries else None
+
+    return db_connection, summary_store
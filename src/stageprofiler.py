@@ -0,0 +1,387 @@
+from contextlib import contextmanager, nullcontext
+from time import perf_counter, process_time
+import cProfile
+import json
+import os
+import resource
+import sys
+import tempfile
+import tracemalloc
+
+# Prefix of every metric in the Prometheus text output.
+METRIC_PREFIX = "wca_odds"
+
+
+class StageProfiler:
+    """
+    Records the wall time, CPU time and peak memory of each stage of a run.
+
+    Stages nest, and each is recorded under its path from the outermost stage, such
+    as 'simulate/draw'. A stage entered several times is totalled. Peak memory is
+    the most memory traced by `tracemalloc`, which includes numpy arrays, at any
+    point during the stage. Time spent by pool workers is recorded separately, so
+    their utilization can be reported next to the stages of the parent process.
+
+    Attributes
+    ----------
+    stages : dict[str, dict]
+        The number of `calls`, `wall` and `cpu` seconds and `peak_memory` bytes of
+        each stage, keyed by its path, in the order they were first entered.
+    workers : dict
+        The number of pool `tasks`, the seconds workers were `busy` and used `cpu`
+        for, and the `capacity` in worker seconds of the pools that ran them.
+    profile_dir : str or None
+        Directory to dump the cProfile statistics of each outermost stage to.
+
+    Methods
+    -------
+    __init__(self, profile_dir=None, trace_memory=True)
+        Initializes the profiler and starts tracing memory allocations.
+
+    stage(self, name)
+        Context manager recording a stage.
+
+    iterate(self, name, iterable)
+        Records each step of an iteration as a stage.
+
+    workers_of(self, processes)
+        Context manager recording the capacity of a worker pool while it is used.
+
+    record_task(self, wall, cpu)
+        Adds the time a worker spent on a task.
+
+    summary(self) -> dict
+        Collects the recorded metrics.
+
+    write(self, path)
+        Writes the metrics as JSON, or in the Prometheus text format to a '.prom'
+        file.
+
+    close(self)
+        Stops tracing memory allocations.
+
+    _prometheus(self) -> str
+        Formats the metrics in the Prometheus text format.
+    """
+
+    def __init__(self, profile_dir: str | None = None, trace_memory: bool = True):
+        """
+        Initializes the profiler and starts tracing memory allocations.
+
+        Parameters
+        ----------
+        profile_dir : str, optional
+            Directory to dump the cProfile statistics of each outermost stage to,
+            as '<stage>.prof'. Nothing is profiled if None (default is None).
+        trace_memory : bool, optional
+            Whether to trace allocations for the peak memory of each stage, which
+            slows down allocation heavy code (default is True).
+        """
+        self.stages = {}
+        self.workers = {"tasks": 0, "busy": 0.0, "cpu": 0.0, "capacity": 0.0}
+        self.profile_dir = profile_dir
+        self._stack = []
+        self._profiles = {}
+
+        if profile_dir is not None:
+            os.makedirs(profile_dir, exist_ok=True)
+
+        self._owns_tracing = trace_memory and not tracemalloc.is_tracing()
+        if self._owns_tracing:
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Context manager recording a stage.
+
+        Parameters
+        ----------
+        name : str
+            The name of the stage, within the stage it is entered from.
+
+        Yields
+        ------
+        dict
+            The stage's frame, whose `call` can be set to False to record its time
+            without counting it as a call.
+        """
+        path = "/".join([frame["name"] for frame in self._stack] + [name])
+        frame = {"name": name, "peak": 0, "call": True}
+
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            # Resetting the peak for this stage would lose the enclosing stages'.
+            peak = tracemalloc.get_traced_memory()[1]
+            for parent in self._stack:
+                parent["peak"] = max(parent["peak"], peak)
+            tracemalloc.reset_peak()
+
+        profile = None
+        if self.profile_dir is not None and not self._stack:
+            profile = self._profiles.setdefault(path, cProfile.Profile())
+
+        self._stack.append(frame)
+        start_wall, start_cpu = perf_counter(), process_time()
+        if profile is not None:
+            profile.enable()
+
+        try:
+            yield frame
+        finally:
+            if profile is not None:
+                profile.disable()
+            wall = perf_counter() - start_wall
+            cpu = process_time() - start_cpu
+            self._stack.pop()
+
+            if tracing:
+                frame["peak"] = max(frame["peak"], tracemalloc.get_traced_memory()[1])
+                for parent in self._stack:
+                    parent["peak"] = max(parent["peak"], frame["peak"])
+
+            totals = self.stages.setdefault(
+                path, {"calls": 0, "wall": 0.0, "cpu": 0.0, "peak_memory": None}
+            )
+            totals["calls"] += frame["call"]
+            totals["wall"] += wall
+            totals["cpu"] += cpu
+            if tracing:
+                totals["peak_memory"] = max(totals["peak_memory"] or 0, frame["peak"])
+
+            if profile is not None:
+                profile.dump_stats(
+                    os.path.join(self.profile_dir, f"{path.replace('/', '_')}.prof")
+                )
+
+    def iterate(self, name: str, iterable):
+        """
+        Records each step of an iteration as a stage.
+
+        The iteration is closed along with the returned generator, so a generator
+        that stops early still cleans up. The last step, which only finds the
+        iteration exhausted, is timed but not counted as a call.
+
+        Parameters
+        ----------
+        name : str
+            The name of the stage.
+        iterable : iterable
+            The iteration to record.
+
+        Yields
+        ------
+        object
+            The items of `iterable`.
+        """
+        iterator = iter(iterable)
+
+        try:
+            while True:
+                with self.stage(name) as frame:
+                    try:
+                        item = next(iterator)
+                    except StopIteration:
+                        frame["call"] = False
+                        return
+                yield item
+        finally:
+            if hasattr(iterator, "close"):
+                iterator.close()
+
+    @contextmanager
+    def workers_of(self, processes: int):
+        """
+        Context manager recording the capacity of a worker pool while it is used.
+
+        Unlike a stage, it may stay open across the yields of a generator.
+
+        Parameters
+        ----------
+        processes : int
+            The number of worker processes in the pool.
+        """
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.workers["capacity"] += processes * (perf_counter() - start)
+
+    def record_task(self, wall: float, cpu: float):
+        """
+        Adds the time a worker spent on a task.
+
+        Parameters
+        ----------
+        wall : float
+            Seconds the task took.
+        cpu : float
+            CPU seconds the worker used for the task.
+        """
+        self.workers["tasks"] += 1
+        self.workers["busy"] += wall
+        self.workers["cpu"] += cpu
+
+    def summary(self) -> dict:
+        """
+        Collects the recorded metrics.
+
+        Returns
+        -------
+        dict
+            The `stages`, the `workers` with their `utilization`, the share of the
+            pools' capacity spent on tasks, or None if no pool was used, and the
+            process's `max_rss` in bytes.
+        """
+        capacity = self.workers["capacity"]
+        workers = dict(
+            self.workers,
+            utilization=self.workers["busy"] / capacity if capacity else None,
+        )
+
+        # Linux reports the peak resident set size in kilobytes, macOS in bytes.
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform != "darwin":
+            max_rss *= 1024
+
+        return {"stages": self.stages, "workers": workers, "max_rss": max_rss}
+
+    def write(self, path: str):
+        """
+        Writes the metrics as JSON, or in the Prometheus text format to a '.prom'
+        file.
+
+        The file is replaced atomically, so a collector never reads a partial
+        file.
+
+        Parameters
+        ----------
+        path : str
+            The file to write.
+        """
+        if path.endswith(".prom"):
+            text = self._prometheus()
+        else:
+            text = json.dumps(self.summary(), indent=2)
+
+        directory = os.path.dirname(path) or "."
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(text)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+    def close(self):
+        """
+        Stops tracing memory allocations, if this profiler started it.
+        """
+        if self._owns_tracing:
+            tracemalloc.stop()
+            self._owns_tracing = False
+
+    def _prometheus(self) -> str:
+        """
+        Formats the metrics in the Prometheus text format.
+
+        Returns
+        -------
+        str
+            One gauge per stage metric labelled by stage, and one per worker
+            metric.
+        """
+        summary = self.summary()
+        stage_metrics = [
+            ("stage_calls", "calls", "Times the stage was entered."),
+            ("stage_wall_seconds", "wall", "Wall time spent in the stage."),
+            ("stage_cpu_seconds", "cpu", "CPU time spent in the stage."),
+            (
+                "stage_peak_memory_bytes",
+                "peak_memory",
+                "Most traced memory in use during the stage.",
+            ),
+        ]
+        worker_metrics = [
+            ("worker_tasks", "tasks", "Tasks run by pool workers."),
+            ("worker_busy_seconds", "busy", "Wall time pool workers spent on tasks."),
+            ("worker_cpu_seconds", "cpu", "CPU time pool workers spent on tasks."),
+            (
+                "worker_utilization",
+                "utilization",
+                "Share of the pools' worker time spent on tasks.",
+            ),
+        ]
+
+        lines = []
+
+        def gauge(metric, help, samples):
+            lines.append(f"# HELP {METRIC_PREFIX}_{metric} {help}")
+            lines.append(f"# TYPE {METRIC_PREFIX}_{metric} gauge")
+            for labels, value in samples:
+                lines.append(f"{METRIC_PREFIX}_{metric}{labels} {value}")
+
+        for metric, key, help in stage_metrics:
+            gauge(
+                metric,
+                help,
+                [
+                    (f'{{stage="{path}"}}', totals[key])
+                    for path, totals in summary["stages"].items()
+                    if totals[key] is not None
+                ],
+            )
+        for metric, key, help in worker_metrics:
+            if summary["workers"][key] is not None:
+                gauge(metric, help, [("", summary["workers"][key])])
+        gauge(
+            "max_rss_bytes",
+            "Peak resident set size of the process.",
+            [("", summary["max_rss"])],
+        )
+
+        return "\n".join(lines) + "\n"
+
+
+def profile_stage(profiler: StageProfiler | None, name: str):
+    """
+    Records a stage with `profiler`, or does nothing if it is None.
+
+    Parameters
+    ----------
+    profiler : StageProfiler or None
+        The profiler to record with.
+    name : str
+        The name of the stage.
+
+    Returns
+    -------
+    contextlib.AbstractContextManager
+        The context manager of the stage.
+    """
+    if profiler is None:
+        return nullcontext()
+    return profiler.stage(name)
+
+
+def run_timed(task, *args) -> tuple[object, float, float]:
+    """
+    Runs a pool task and measures it in the worker.
+
+    Parameters
+    ----------
+    task : callable
+        The task to run.
+    *args
+        The arguments of the task.
+
+    Returns
+    -------
+    tuple[object, float, float]
+        The result of the task and the wall and CPU seconds it took.
+    """
+    start_wall, start_cpu = perf_counter(), process_time()
+    result = task(*args)
+
+    return result, perf_counter() - start_wall, process_time() - start_cpu
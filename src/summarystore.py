@@ -0,0 +1,158 @@
+from abc import ABC, abstractmethod
+from pandas.core.api import DataFrame as DataFrame
+import pandas as pd
+
+SUMMARY_COLUMNS = [
+    "personId",
+    "eventId",
+    "window",
+    "halflife",
+    "mean",
+    "stdev",
+    "dnf_rate",
+    "first_date",
+    "version",
+]
+
+
+class SummaryStore(ABC):
+    """
+    Abstract base class for stores of precomputed competitor summary statistics.
+
+    A summary holds the latest weighted mean and standard deviation and the DNF rate
+    of a competitor in an event, keyed by (personId, eventId, window, halflife). It is
+    valid while the dataset version it was computed from is current and its oldest
+    result has not aged out of the window, so stale summaries are recomputed one
+    competitor at a time.
+
+    Attributes
+    ----------
+    None
+
+    Methods
+    -------
+    lookup(event: str, names: list[str], window: int, halflife: str, version) -> DataFrame
+        Returns the valid summaries of the given competitors.
+
+    save(event: str, window: int, halflife: str, version, summaries: DataFrame) -> None
+        Adds or replaces summaries for an event.
+
+    _load(event: str, names: list[str], window: int, halflife: str) -> DataFrame
+        Abstract method to read the stored summaries of the given competitors.
+
+    _save(summaries: DataFrame) -> None
+        Abstract method to add or replace stored summaries.
+    """
+
+    def lookup(
+        self, event: str, names: list[str], window: int, halflife: str, version
+    ) -> DataFrame:
+        """
+        Returns the valid summaries of the given competitors.
+
+        Parameters
+        ----------
+        event : str
+            The event identifier.
+        names : list[str]
+            List of person IDs.
+        window : int
+            Number of days of results the summaries cover.
+        halflife : str
+            Halflife of the exponential weighting.
+        version : int or None
+            The current dataset version, no summaries are valid if it is None.
+
+        Returns
+        -------
+        DataFrame
+            Summaries indexed by personId with `mean`, `stdev` and `dnf_rate` columns.
+        """
+        if version is None:
+            return pd.DataFrame(columns=["mean", "stdev", "dnf_rate"])
+
+        summaries = self._load(event, list(names), window, halflife)
+        offset = pd.Timestamp.today().normalize() - pd.DateOffset(days=window)
+
+        valid = (summaries["version"] == version) & (
+            pd.to_datetime(summaries["first_date"]) >= offset
+        )
+
+        return summaries[valid].set_index("personId")[["mean", "stdev", "dnf_rate"]]
+
+    def save(
+        self, event: str, window: int, halflife: str, version, summaries: DataFrame
+    ) -> None:
+        """
+        Adds or replaces summaries for an event.
+
+        Parameters
+        ----------
+        event : str
+            The event identifier.
+        window : int
+            Number of days of results the summaries cover.
+        halflife : str
+            Halflife of the exponential weighting.
+        version : int or None
+            The dataset version the summaries were computed from, nothing is saved if
+            it is None.
+        summaries : DataFrame
+            Summaries indexed by personId with `mean`, `stdev`, `dnf_rate` and
+            `first_date` columns.
+
+        Returns
+        -------
+        None
+        """
+        if version is None or summaries.empty:
+            return
+
+        summaries = summaries.rename_axis("personId").reset_index()
+        summaries["eventId"] = event
+        summaries["window"] = window
+        summaries["halflife"] = halflife
+        summaries["version"] = version
+
+        self._save(summaries[SUMMARY_COLUMNS])
+
+    @abstractmethod
+    def _load(
+        self, event: str, names: list[str], window: int, halflife: str
+    ) -> DataFrame:
+        """
+        Read the stored summaries of the given competitors.
+
+        Parameters
+        ----------
+        event : str
+            The event identifier.
+        names : list[str]
+            List of person IDs.
+        window : int
+            Number of days of results the summaries cover.
+        halflife : str
+            Halflife of the exponential weighting.
+
+        Returns
+        -------
+        DataFrame
+            The matching summaries, with the columns in `SUMMARY_COLUMNS`.
+        """
+        pass
+
+    @abstractmethod
+    def _save(self, summaries: DataFrame) -> None:
+        """
+        Add or replace stored summaries.
+
+        Parameters
+        ----------
+        summaries : DataFrame
+            The summaries, with the columns in `SUMMARY_COLUMNS`.
+
+        Returns
+        -------
+        None
+        """
+        pass
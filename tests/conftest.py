@@ -0,0 +1,78 @@
+import os
+import sys
+import zipfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# The modules in src and db import each other by bare name, as when run from there.
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(0, os.path.join(ROOT, "db"))
+
+from dbwrapper import DBWrapper  # noqa: E402
+from get_results import COMPETITIONS_MEMBER, RESULTS_MEMBER  # noqa: E402
+
+COMPETITIONS = [
+    ["id", "name", "year", "month", "day"],
+    ["CompA", "Comp A", "2024", "3", "9"],
+    ["CompB", "Comp B", "2024", "5", "18"],
+]
+
+RESULTS = [
+    ["competitionId", "eventId", "roundTypeId", "pos", "personName", "personId"]
+    + ["formatId", "value1", "value2", "value3", "value4", "value5"],
+    ["CompA", "333", "f", "1", "Person A", "2010PERA01"]
+    + ["a", "900", "950", "-1", "1000", "1010"],
+    ["CompB", "333", "f", "1", "Person \\ B", "2010PERB01"]
+    + ["a", "800", "850", "900", "950", "1000"],
+    ["Removed", "333", "f", "1", "Person A", "2010PERA01"]
+    + ["a", "700", "750", "800", "850", "900"],
+]
+
+
+@pytest.fixture
+def export_zip(tmp_path):
+    """
+    Writes a small export zip, with one result of a competition missing from it.
+    """
+    path = tmp_path / "export.zip"
+    with zipfile.ZipFile(path, "w") as zip_ref:
+        for member, rows in [
+            (COMPETITIONS_MEMBER, COMPETITIONS),
+            (RESULTS_MEMBER, RESULTS),
+        ]:
+            zip_ref.writestr(member, "".join("\t".join(row) + "\r\n" for row in rows))
+
+    return str(path)
+
+
+class StubWrapper(DBWrapper):
+    """
+    Returns ten recent results for every competitor, faster for later IDs, and no
+    results for the `missing` ones.
+    """
+
+    def __init__(self, missing=()):
+        self.missing = set(missing)
+
+    def query(self, event, names, length=365):
+        columns = [f"value{j}" for j in range(1, 6)]
+        results = {}
+        for i, id in enumerate(names):
+            values = 1000 + 100 * (len(names) - i) + np.arange(50).reshape(10, 5)
+            if id in self.missing:
+                values = values[:0]
+            results[id] = pd.DataFrame(values, columns=columns).assign(
+                date=pd.Timestamp.now().normalize() - pd.Timedelta(days=30)
+            )
+        return results
+
+
+@pytest.fixture
+def stub_wrapper():
+    """
+    The class of a database wrapper serving made up results without a database.
+    """
+    return StubWrapper
@@ -0,0 +1,60 @@
+import json
+import sys
+
+import pytest
+
+import batch
+import oddsservice
+
+COMPETITORS = {
+    "333": [{"id": f"2010PERS{i:02d}", "name": f"Person {i}"} for i in range(3)],
+    # Registered, but without recent results.
+    "444": [{"id": "2010NONE01", "name": "Nobody"}],
+}
+
+
+@pytest.fixture
+def run_batch(monkeypatch, capsys, stub_wrapper):
+    """
+    Runs the batch command line against a stub backend and WCIFs, returning its
+    output.
+    """
+
+    def run(*args):
+        monkeypatch.setattr(
+            oddsservice,
+            "get_wcifs",
+            lambda competition_ids, offline: dict.fromkeys(competition_ids, {}),
+        )
+        monkeypatch.setattr(
+            oddsservice,
+            "fetch_field",
+            lambda competition_id, event, *args, **kwargs: (COMPETITORS[event], None),
+        )
+        wrapper = stub_wrapper(missing=["2010NONE01"])
+        monkeypatch.setattr(batch, "open_backend", lambda *args: (wrapper, None))
+        monkeypatch.setattr(
+            sys,
+            "argv",
+            ["batch.py", "Comp2024:333", "Comp2024:444", "-n", "1000", "--seed", "1"]
+            + ["--processes", "1", *args],
+        )
+        batch.main()
+        return capsys.readouterr().out
+
+    return run
+
+
+def test_table_with_empty_event(run_batch):
+    output = run_batch()
+
+    assert "Results for 333:" in output and "Person 2" in output
+    assert "Results for 444:" in output
+    assert "No competitors with recent results to simulate" in output
+
+
+def test_json_with_empty_event(run_batch):
+    records = json.loads(run_batch("-o", "json"))
+
+    assert {record["event"] for record in records} == {"333"}
+    assert len(records) == 3
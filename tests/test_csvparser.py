@@ -0,0 +1,169 @@
+import os
+from datetime import date
+
+import pandas as pd
+
+from csvparser import (
+    CSVParser,
+    JOINED_RESULTS_PATH,
+    _load_manifest,
+    _partition_files,
+)
+
+RESULT_COLUMNS = [
+    "competitionId",
+    "eventId",
+    "roundTypeId",
+    "personName",
+    "personId",
+    "formatId",
+    "value1",
+    "value2",
+    "value3",
+    "value4",
+    "value5",
+]
+
+
+def write_sources(directory, competitions):
+    """
+    Writes Competitions.csv and Results.csv with three results per competition.
+    """
+    pd.DataFrame(
+        [(id, d.year, d.month, d.day) for id, d in competitions.items()],
+        columns=["id", "year", "month", "day"],
+    ).to_csv(os.path.join(directory, "Competitions.csv"), index=False)
+
+    rows = [
+        (
+            id,
+            "pyram",
+            "f",
+            f"Person {i}",
+            f"2010PERS{i:02d}",
+            "a",
+            1000 + i,
+            1100,
+            1200,
+            1300,
+            1400,
+        )
+        for id in competitions
+        for i in range(3)
+    ]
+    pd.DataFrame(rows, columns=RESULT_COLUMNS).to_csv(
+        os.path.join(directory, "Results.csv"), index=False
+    )
+
+
+def stored_rows(store_path):
+    """
+    Counts the rows of every partition the manifest points to.
+    """
+    return sum(
+        len(pd.read_feather(os.path.join(store_path, file_name)))
+        for file_name in _partition_files(_load_manifest(store_path))
+    )
+
+
+def store_files(store_path):
+    """
+    Lists every file in the joined results but the manifest.
+    """
+    return {
+        os.path.relpath(os.path.join(directory, name), store_path)
+        for directory, _, names in os.walk(store_path)
+        for name in names
+        if name != "manifest.json"
+    }
+
+
+def touch_sources(source):
+    """
+    Makes the sources newer than the manifest, however fast the test runs.
+    """
+    later = os.path.getmtime(os.path.join(JOINED_RESULTS_PATH, "manifest.json")) + 10
+    for name in ("Competitions.csv", "Results.csv"):
+        os.utime(source / name, (later, later))
+
+
+def test_competition_moved_to_another_year(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    source = tmp_path / "db" / "results_dump"
+    source.mkdir(parents=True)
+
+    today = date.today()
+    last_year = date(today.year - 1, 6, 1)
+    competitions = {"CompA": last_year, "CompB": last_year, "CompC": today}
+    write_sources(source, competitions)
+    parser = CSVParser()
+    assert stored_rows(JOINED_RESULTS_PATH) == 9
+
+    competitions["CompB"] = date(today.year, 1, 1)
+    write_sources(source, competitions)
+    touch_sources(source)
+
+    parser = CSVParser()
+    assert stored_rows(JOINED_RESULTS_PATH) == 9
+
+    results = parser.query_frame("pyram", ["2010PERS00"], length=730)
+    assert len(results) == 3
+
+
+def test_newer_csv_preferred_over_feather(tmp_path):
+    csv_path = tmp_path / "Results.csv"
+    feather_path = tmp_path / "Results.feather"
+    csv_path.write_text("")
+    feather_path.write_bytes(b"")
+
+    os.utime(csv_path, (1000, 1000))
+    os.utime(feather_path, (2000, 2000))
+    assert CSVParser._resolve_source(str(csv_path)) == str(feather_path)
+
+    os.utime(csv_path, (3000, 3000))
+    assert CSVParser._resolve_source(str(csv_path)) == str(csv_path)
+
+    os.remove(csv_path)
+    assert CSVParser._resolve_source(str(csv_path)) == str(feather_path)
+
+
+def test_update_keeps_files_of_previous_manifest(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    source = tmp_path / "db" / "results_dump"
+    source.mkdir(parents=True)
+
+    today = date.today()
+    competitions = {"CompA": date(today.year, 1, 1), "CompB": today}
+    write_sources(source, competitions)
+    CSVParser()
+    first = store_files(JOINED_RESULTS_PATH)
+    first_mtimes = {
+        name: os.path.getmtime(os.path.join(JOINED_RESULTS_PATH, name))
+        for name in first
+    }
+
+    competitions["CompC"] = today
+    write_sources(source, competitions)
+    touch_sources(source)
+    parser = CSVParser()
+    second = store_files(JOINED_RESULTS_PATH)
+
+    # The rewritten partition went to new files, the old ones are untouched.
+    assert first < second
+    assert all(
+        os.path.getmtime(os.path.join(JOINED_RESULTS_PATH, name)) == mtime
+        for name, mtime in first_mtimes.items()
+    )
+    assert not any(name.endswith(".tmp") for name in second)
+    assert len(parser.query_frame("pyram", ["2010PERS00"])) == 3
+
+    del competitions["CompC"]
+    write_sources(source, competitions)
+    touch_sources(source)
+    CSVParser()
+    third = store_files(JOINED_RESULTS_PATH)
+
+    # Files of the first version are removed once two updates have replaced them.
+    assert not first & third
+    assert len(third) == 4
+    assert stored_rows(JOINED_RESULTS_PATH) == 6
@@ -0,0 +1,22 @@
+def test_query_frame_fallback(stub_wrapper):
+    frame = stub_wrapper(missing=["2010PERB01"]).query_frame(
+        "333", ["2010PERA01", "2010PERB01"]
+    )
+
+    assert list(frame.columns) == [f"value{i}" for i in range(1, 6)] + [
+        "date",
+        "personId",
+    ]
+    assert set(frame["personId"]) == {"2010PERA01"}
+    assert len(frame) == 10
+
+
+def test_query_frame_fallback_without_competitors(stub_wrapper):
+    frame = stub_wrapper().query_frame("333", [])
+
+    assert frame.empty
+    assert list(frame.columns) == [f"value{i}" for i in range(1, 6)] + [
+        "date",
+        "personId",
+    ]
+    assert str(frame["date"].dtype) == "datetime64[ns]"
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from competitionround import CompetitionRound
+from dist_sample import DistributionSamplingSimulator
+from multi_sim import average_of_5, best_of_n, mean_of_n
+
+
+@pytest.mark.parametrize("engine", ["vectorized", "pool"])
+def test_empty_field(engine):
+    simulator = DistributionSamplingSimulator(None)
+    simulator.event = "333"
+
+    results = simulator.run_simulation(1000, engine=engine, placements=True)
+
+    assert results.empty
+    assert list(results.columns) == [
+        "name",
+        "win",
+        "podium",
+        "win_ci",
+        "podium_ci",
+    ]
+    assert results.attrs["simulations"] == 0
+    assert results.attrs["placements"].empty
+
+
+def test_empty_field_with_rounds():
+    simulator = DistributionSamplingSimulator(None)
+    simulator.event = "333"
+
+    results = simulator.run_simulation(
+        1000, engine="pool", rounds=[CompetitionRound(id="333-r1", format="a")]
+    )
+
+    assert results.empty
+    assert "final" in results.columns and "final_ci" in results.columns
+
+
+def kernel_input(values, dnf_attempts):
+    """
+    Builds one round of attempts, with attempts along the first axis.
+    """
+    values = np.array(values, dtype=np.float64)[:, None]
+    dnf = np.zeros(values.shape, dtype=bool)
+    dnf[list(dnf_attempts)] = True
+    return values, dnf
+
+
+@pytest.mark.parametrize(
+    "dnf_attempts, expected",
+    [
+        ((), 400),
+        # The DNF is dropped as the worst attempt, along with the best.
+        ((1,), 400),
+        ((2,), 500),
+        ((1, 3), np.inf),
+    ],
+)
+def test_average_of_5(dnf_attempts, expected):
+    values, dnf = kernel_input([300, 600, 200, 400, 500], dnf_attempts)
+
+    assert average_of_5(values, dnf)[0] == expected
+
+
+@pytest.mark.parametrize("dnf_attempts, expected", [((), 500), ((2,), np.inf)])
+def test_mean_of_n(dnf_attempts, expected):
+    values, dnf = kernel_input([400, 500, 600], dnf_attempts)
+
+    assert mean_of_n(values, dnf)[0] == expected
+
+
+@pytest.mark.parametrize(
+    "dnf_attempts, expected", [((), 400), ((1,), 500), ((0, 1, 2), np.inf)]
+)
+def test_best_of_n(dnf_attempts, expected):
+    values, dnf = kernel_input([500, 400, 600], dnf_attempts)
+
+    assert best_of_n(values, dnf)[0] == expected
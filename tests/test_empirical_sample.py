@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from empirical_sample import EmpiricalSamplingSimulator, build_tables
+from filesummarystore import FileSummaryStore
+from multi_table import TABLE_SIZE, draw_table_attempts
+
+
+def results_frame(rows):
+    """
+    Builds a results frame of same-day rounds from (personId, values) rows.
+    """
+    frame = pd.DataFrame(
+        [values for _, values in rows],
+        columns=[f"value{i}" for i in range(1, 6)],
+    )
+    return frame.assign(
+        date=pd.Timestamp("2024-01-01"), personId=[id for id, _ in rows]
+    )
+
+
+def test_rejects_summary_store(tmp_path):
+    with pytest.raises(ValueError, match="does not use summaries"):
+        EmpiricalSamplingSimulator(None, FileSummaryStore(str(tmp_path / "s.feather")))
+
+
+def test_table_size_fits_uint16_indices():
+    assert 0 < TABLE_SIZE <= 1 << 16
+
+
+@pytest.mark.parametrize("table_size", [TABLE_SIZE, 1 << 16])
+def test_draw_table_attempts_index_bounds(table_size):
+    tables = np.arange(table_size, dtype=np.float64)[None]
+    field = np.zeros((1, 1), dtype=np.int64)
+
+    values, dnf = draw_table_attempts(
+        np.random.default_rng(0), tables, field, (table_size * 20, 1, 1)
+    )
+
+    # Every index is drawn, including the last, and none wraps around.
+    assert not dnf.any()
+    assert len(np.unique(values)) == table_size
+
+
+def test_build_tables():
+    rows = [
+        ("2010AAAA01", [100, 200, 300, 400, 500]),
+        ("2010AAAA01", [600, 700, 800, 900, -1]),
+        # A skipped attempt is not a result.
+        ("2010BBBB02", [400, 300, 0, 0, 0]),
+    ]
+
+    person_ids, tables = build_tables(results_frame(rows), 5, "180 days")
+
+    assert list(person_ids) == ["2010AAAA01", "2010BBBB02"]
+    assert tables.shape == (2, TABLE_SIZE)
+
+    solved = np.isfinite(tables)
+    # The single DNF is a tenth of the first competitor's attempts.
+    assert solved[0].mean() == pytest.approx(0.9, abs=1 / TABLE_SIZE)
+    assert solved[1].all()
+    # Solves come first, in increasing order and within the range of the results.
+    assert (np.diff(tables[0][solved[0]]) >= 0).all()
+    assert not solved[0][solved[0].sum() :].any()
+    assert tables[0][solved[0]].min() >= 100 and tables[0][solved[0]].max() <= 900
+    assert tables[1].min() >= 300 and tables[1].max() <= 400
+
+
+def test_build_tables_without_solves():
+    rows = [("2010AAAA01", [-1, -1, -1, -1, -1])]
+
+    _, tables = build_tables(results_frame(rows), 5, "180 days")
+
+    assert np.isinf(tables).all()
+
+
+def test_draws_match_source_results():
+    rng = np.random.default_rng(0)
+    source = rng.gamma(20, 50, (400, 5)).round()
+    source[rng.random(source.shape) < 0.2] = -1
+    rows = [("2010AAAA01", list(values)) for values in source]
+
+    _, tables = build_tables(results_frame(rows), 5, "180 days")
+    values, dnf = draw_table_attempts(
+        np.random.default_rng(1),
+        tables,
+        np.zeros((1, 1), dtype=np.int64),
+        (200000, 1, 1),
+    )
+
+    assert dnf.mean() == pytest.approx((source == -1).mean(), abs=0.01)
+    solves = source[source > 0]
+    quantiles = [0.1, 0.25, 0.5, 0.75, 0.9]
+    np.testing.assert_allclose(
+        np.quantile(values[~dnf], quantiles), np.quantile(solves, quantiles), rtol=0.02
+    )
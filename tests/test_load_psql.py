@@ -0,0 +1,39 @@
+from contextlib import contextmanager
+
+import load_psql
+
+
+class StubConnection:
+    def exec_driver_sql(self, statement):
+        pass
+
+
+class StubEngine:
+    """
+    Accepts every statement without a database.
+    """
+
+    @contextmanager
+    def begin(self):
+        yield StubConnection()
+
+
+def test_load_skips_results_of_missing_competitions(export_zip, monkeypatch, capsys):
+    copied = {}
+
+    def copy_rows(engine, table, columns, rows):
+        copied[table] = b"".join(rows)
+
+    monkeypatch.setattr(load_psql, "copy_rows", copy_rows)
+    monkeypatch.setattr(load_psql, "execute", lambda engine, statement: None)
+
+    load_psql.load(StubEngine(), export_zip)
+
+    assert "Skipped 1 results" in capsys.readouterr().out
+    assert copied["Competitions"] == b"CompA\t2024\t3\t9\nCompB\t2024\t5\t18\n"
+    assert copied["Results"] == (
+        b"CompA\t333\tf\tPerson A\t2010PERA01\ta\t900\t950\t-1\t1000\t1010\t"
+        b"2024-03-09\n"
+        b"CompB\t333\tf\tPerson \\\\ B\t2010PERB01\ta\t800\t850\t900\t950\t1000\t"
+        b"2024-05-18\n"
+    )
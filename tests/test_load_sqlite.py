@@ -0,0 +1,28 @@
+import sqlite3
+
+from load_sqlite import load
+
+
+def test_load_skips_results_of_missing_competitions(tmp_path, export_zip, capsys):
+    db_path = tmp_path / "wca_results.sqlite3"
+
+    load(str(db_path), export_zip)
+
+    assert "Skipped 1 results" in capsys.readouterr().out
+    with sqlite3.connect(db_path) as connection:
+        rows = connection.execute(
+            "SELECT competitionId, personName, value1, value3, date FROM Results "
+            "ORDER BY date"
+        ).fetchall()
+        competitions = connection.execute(
+            "SELECT id, year, date FROM Competitions ORDER BY id"
+        ).fetchall()
+
+    assert rows == [
+        ("CompA", "Person A", 900, -1, "2024-03-09"),
+        ("CompB", "Person \\ B", 800, 900, "2024-05-18"),
+    ]
+    assert competitions == [
+        ("CompA", 2024, "2024-03-09"),
+        ("CompB", 2024, "2024-05-18"),
+    ]
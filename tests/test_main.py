@@ -0,0 +1,53 @@
+import sys
+
+import pytest
+
+import main
+import request_info
+
+COMPETITORS = [{"id": f"2010PERS{i:02d}", "name": f"Person {i}"} for i in range(3)]
+
+
+@pytest.fixture
+def run_main(monkeypatch, capsys):
+    """
+    Runs the command line against a stub backend and WCIF, returning its output.
+    """
+
+    def run(wrapper, competitors, *args):
+        monkeypatch.setattr(request_info, "get_wcif", lambda *args: {})
+        monkeypatch.setattr(
+            request_info, "get_competitors", lambda *args, **kwargs: competitors
+        )
+        monkeypatch.setattr(main, "open_backend", lambda *args: (wrapper, None))
+        monkeypatch.setattr(
+            sys, "argv", ["main.py", "Comp2024", "333", "-n", "1000", *args]
+        )
+        main.main()
+        return capsys.readouterr().out
+
+    return run
+
+
+def test_results(run_main, stub_wrapper):
+    output = run_main(stub_wrapper(), COMPETITORS, "--seed", "1")
+
+    assert "Results for 333:" in output
+    assert all(competitor["name"] in output for competitor in COMPETITORS)
+
+
+@pytest.mark.parametrize(
+    "args", [[], ["--tolerance", "0.01"], ["--simulator", "empirical"]]
+)
+def test_no_competitors_with_results(run_main, stub_wrapper, args):
+    wrapper = stub_wrapper(missing=[competitor["id"] for competitor in COMPETITORS])
+
+    output = run_main(wrapper, COMPETITORS, *args)
+
+    assert "No competitors with recent results to simulate" in output
+
+
+def test_no_competitors(run_main, stub_wrapper):
+    output = run_main(stub_wrapper(), [])
+
+    assert "No competitors with recent results to simulate" in output
@@ -0,0 +1,166 @@
+import numpy as np
+import pytest
+
+from competitionround import CompetitionRound
+from dist_sample import DistributionSamplingSimulator
+from multi_round import advance, iter_sampled_rounds, simulate_round
+from request_info import get_rounds
+
+
+def attempts(*rows):
+    """
+    Builds (attempts, places, simulations) values and DNFs for a single simulation.
+    """
+    values = np.array(rows, dtype=np.float64).T[:, :, None]
+    return values, np.zeros(values.shape, dtype=bool)
+
+
+def test_cutoff_no_one_meets():
+    values, dnf = attempts([1000, 900, 800, 700, 600], [1100, 1000, 900, 800, 700])
+    competition_round = CompetitionRound(
+        id="333-r1", format="a", cutoff_attempts=2, cutoff_result=500
+    )
+
+    result, best = simulate_round(values, dnf, competition_round)
+
+    # The attempts after the cutoff are not taken, so there is no average.
+    assert dnf[2:].all() and not dnf[:2].any()
+    assert np.isinf(result).all()
+    np.testing.assert_array_equal(best[:, 0], [900, 1000])
+
+
+def test_cutoff_made_in_second_attempt():
+    values, dnf = attempts([600, 400, 500, 700, 800])
+    competition_round = CompetitionRound(
+        id="333-r1", format="a", cutoff_attempts=2, cutoff_result=500
+    )
+
+    result, _ = simulate_round(values, dnf, competition_round)
+
+    assert not dnf.any()
+    assert result[0, 0] == 600
+
+
+def test_time_limit():
+    values, dnf = attempts([500, 1200, 600, 700, 800])
+    competition_round = CompetitionRound(id="333-r1", format="a", time_limit=1000)
+
+    result, best = simulate_round(values, dnf, competition_round)
+
+    # The attempt over the time limit is the dropped worst attempt.
+    assert dnf[:, 0, 0].tolist() == [False, True, False, False, False]
+    assert result[0, 0] == 700
+    assert best[0, 0] == 500
+
+
+def test_cumulative_time_limit():
+    values, dnf = attempts([400, 500, 300])
+    competition_round = CompetitionRound(
+        id="333bf-r1", format="3", time_limit=1000, cumulative=True
+    )
+
+    result, _ = simulate_round(values, dnf, competition_round)
+
+    # The third attempt takes the total to 1200, over the shared limit.
+    assert dnf[:, 0, 0].tolist() == [False, False, True]
+    assert result[0, 0] == 400
+
+
+def test_untimed_event_ignores_time_limit():
+    values, dnf = attempts([30, 40, 50])
+    competition_round = CompetitionRound(id="333fm-r1", format="m", time_limit=10)
+
+    result, _ = simulate_round(values, dnf, competition_round, timed=False)
+
+    assert not dnf.any()
+    assert result[0, 0] == 40
+
+
+def ranked_field(num_competitors):
+    """
+    Builds a one simulation field where competitor i finishes in place i.
+    """
+    result = np.arange(num_competitors, dtype=np.float64)[:, None] + 1
+    field = np.arange(num_competitors)[:, None]
+    filled = np.ones(field.shape, dtype=bool)
+    return result, result.copy(), field, filled
+
+
+def test_advance_capped_at_max_advancing():
+    competition_round = CompetitionRound(
+        id="333-r1", format="a", advancement_type="ranking", advancement_level=8
+    )
+
+    next_field, next_filled = advance(*ranked_field(8), competition_round)
+
+    # At least 25% are eliminated even if the condition lets everyone through.
+    assert next_field[next_filled].tolist() == [0, 1, 2, 3, 4, 5]
+
+
+@pytest.mark.parametrize(
+    "advancement_type, level, advancing",
+    [("ranking", 3, 3), ("percent", 50, 4), ("attemptResult", 3, 2)],
+)
+def test_advance_condition(advancement_type, level, advancing):
+    competition_round = CompetitionRound(
+        id="333-r1",
+        format="a",
+        advancement_type=advancement_type,
+        advancement_level=level,
+    )
+
+    next_field, next_filled = advance(*ranked_field(8), competition_round)
+
+    assert next_field[next_filled].tolist() == list(range(advancing))
+
+
+def test_advance_needs_successful_attempt():
+    result, best, field, filled = ranked_field(8)
+    result[1:] = np.inf
+    best[1:] = np.inf
+    competition_round = CompetitionRound(
+        id="333-r1", format="a", advancement_type="ranking", advancement_level=4
+    )
+
+    next_field, next_filled = advance(result, best, field, filled, competition_round)
+
+    assert next_field[next_filled].tolist() == [0]
+
+
+def test_iter_sampled_rounds_deterministic():
+    # Competitor i always solves in 100 * (i + 1).
+    def draw(rng, field, size, dtype):
+        values = np.broadcast_to(100.0 * (field + 1), size).astype(dtype)
+        return values, np.zeros(size, dtype=bool)
+
+    rounds = [
+        CompetitionRound(
+            id="333-r1", format="a", advancement_type="ranking", advancement_level=4
+        ),
+        CompetitionRound(id="333-r2", format="a", cutoff_attempts=2, cutoff_result=150),
+    ]
+
+    chunks = list(iter_sampled_rounds(draw, 6, "333", rounds, 10, seed=0))
+    tallies = sum(chunk for chunk, _ in chunks)
+
+    assert sum(count for _, count in chunks) == 10
+    # Four of six advance. Only the fastest makes the cutoff of the final, and the
+    # others are ranked below by their best single.
+    np.testing.assert_array_equal(tallies[0], [10, 0, 0, 0, 0, 0])
+    np.testing.assert_array_equal(tallies[1], [10, 10, 10, 0, 0, 0])
+    np.testing.assert_array_equal(tallies[2], [10, 10, 10, 10, 0, 0])
+
+
+def test_get_rounds_rejects_event_without_rounds():
+    wcif = {"events": [{"id": "333", "rounds": []}]}
+
+    with pytest.raises(ValueError, match="no rounds"):
+        get_rounds("Comp2024", "333", wcif=wcif)
+
+
+def test_run_simulation_rejects_empty_rounds():
+    simulator = DistributionSamplingSimulator(None)
+    simulator.event = "333"
+
+    with pytest.raises(ValueError, match="final round"):
+        simulator.run_simulation(1000, rounds=[])
@@ -0,0 +1,72 @@
+from threading import Event, Thread
+
+import pandas as pd
+
+import oddsservice
+from dist_sample import DistributionSamplingSimulator
+from empirical_sample import EmpiricalSamplingSimulator
+from oddsservice import OddsService
+
+
+def test_simulation_does_not_hold_lock(monkeypatch):
+    prepared = Event()
+    waited = []
+
+    def prepare_data(self, event, competitors):
+        self.event = event
+        if competitors == "second":
+            prepared.set()
+
+    def run_simulation(self, count, **options):
+        # The first request simulates until the second has prepared its data.
+        waited.append(prepared.wait(timeout=5))
+        return pd.DataFrame()
+
+    monkeypatch.setattr(
+        oddsservice,
+        "fetch_field",
+        lambda competition_id, *args, **kwargs: (competition_id, None),
+    )
+    monkeypatch.setattr(DistributionSamplingSimulator, "prepare_data", prepare_data)
+    monkeypatch.setattr(DistributionSamplingSimulator, "run_simulation", run_simulation)
+
+    with OddsService(None, processes=1) as service:
+        first = Thread(target=service.odds, args=("first", "333"))
+        first.start()
+        second = Thread(target=service.odds, args=("second", "333"))
+        second.start()
+        first.join()
+        second.join()
+
+    assert waited[0]
+
+
+def test_odds_many_simulator(monkeypatch, stub_wrapper):
+    prepared = []
+    prepare_data = EmpiricalSamplingSimulator.prepare_data
+
+    def record_prepare_data(self, event, competitors):
+        prepared.append(event)
+        prepare_data(self, event, competitors)
+
+    competitors = [{"id": f"2010PERS{i:02d}", "name": f"Person {i}"} for i in range(4)]
+    monkeypatch.setattr(
+        oddsservice,
+        "get_wcifs",
+        lambda competition_ids, offline: dict.fromkeys(competition_ids, {}),
+    )
+    monkeypatch.setattr(
+        oddsservice, "fetch_field", lambda *args, **kwargs: (competitors, None)
+    )
+    monkeypatch.setattr(EmpiricalSamplingSimulator, "prepare_data", record_prepare_data)
+
+    # The empirical simulator does not use summaries, so is not given the store.
+    with OddsService(stub_wrapper(), object(), processes=1) as service:
+        # The second event has no format, so preparing it fails.
+        results = service.odds_many(
+            [("Comp", "333"), ("Comp", "unknown")], 1000, simulator="empirical"
+        )
+
+    assert prepared == ["333", "unknown"]
+    assert list(results) == [("Comp", "333")]
+    assert results[("Comp", "333")]["name"].iloc[0] == "Person 3"
@@ -0,0 +1,121 @@
+import json
+import socket
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+
+import pytest
+from requests.exceptions import ConnectionError, HTTPError
+
+from request_info import get_wcif
+
+WCIF_PATH = "/competitions/Comp2024/wcif/public"
+
+
+class WCIFHandler(BaseHTTPRequestHandler):
+    """
+    Serves the WCIF in `server.wcif` with its ETag, answering 304 while it matches.
+    """
+
+    def do_GET(self):
+        self.server.requests.append(dict(self.headers))
+
+        if self.path != WCIF_PATH:
+            self.send_response(HTTPStatus.NOT_FOUND)
+            self.end_headers()
+            return
+
+        etag = f'"{self.server.version}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        data = json.dumps(self.server.wcif).encode()
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), WCIFHandler)
+    server.requests = []
+    server.version = 1
+    server.wcif = {"id": "Comp2024", "events": []}
+    Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+
+    monkeypatch.setenv("WCA_API_URL", f"http://127.0.0.1:{server.server_address[1]}")
+    monkeypatch.setenv("WCIF_CACHE_PATH", str(tmp_path / "wcif_cache"))
+    monkeypatch.setenv("WCIF_CACHE_TTL", "3600")
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+def test_cached_within_ttl(api):
+    assert get_wcif("Comp2024") == api.wcif
+    api.wcif = {"id": "Comp2024", "events": ["changed"]}
+
+    assert get_wcif("Comp2024") == {"id": "Comp2024", "events": []}
+    assert len(api.requests) == 1
+
+
+def test_revalidated_after_ttl(api, monkeypatch):
+    wcif = get_wcif("Comp2024")
+    monkeypatch.setenv("WCIF_CACHE_TTL", "0")
+
+    # Unchanged: the cached copy is confirmed with a 304 and kept.
+    assert get_wcif("Comp2024") == wcif
+    assert api.requests[1]["If-None-Match"] == '"1"'
+    assert "If-Modified-Since" in api.requests[1]
+
+    # Changed: the new version is downloaded and replaces the cached copy.
+    api.version = 2
+    api.wcif = {"id": "Comp2024", "events": ["changed"]}
+    assert get_wcif("Comp2024") == api.wcif
+
+    monkeypatch.setenv("WCIF_CACHE_TTL", "3600")
+    assert get_wcif("Comp2024") == api.wcif
+    assert len(api.requests) == 3
+
+
+def test_unknown_competition(api):
+    with pytest.raises(HTTPError):
+        get_wcif("Unknown2024")
+
+
+def test_offline(api):
+    with pytest.raises(ConnectionError):
+        get_wcif("Comp2024", offline=True)
+    assert api.requests == []
+
+    wcif = get_wcif("Comp2024")
+    assert get_wcif("Comp2024", offline=True) == wcif
+    assert len(api.requests) == 1
+
+
+def test_unreachable(api, monkeypatch):
+    # A port nothing listens on once the socket is closed.
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        unreachable = f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+    wcif = get_wcif("Comp2024")
+    monkeypatch.setenv("WCA_API_URL", unreachable)
+    monkeypatch.setenv("WCIF_CACHE_TTL", "0")
+
+    # A stale cached copy is still used, but there is nothing to fall back on for
+    # a competition that was never fetched.
+    assert get_wcif("Comp2024") == wcif
+    with pytest.raises(ConnectionError):
+        get_wcif("Other2024")
@@ -0,0 +1,106 @@
+import json
+from http.server import ThreadingHTTPServer
+from threading import Thread
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import pandas as pd
+import pytest
+
+from server import OddsRequestHandler
+
+
+class StubService:
+    """
+    Answers odds requests with a fixed frame, or raises a fixed error.
+    """
+
+    def __init__(self, results=None, error=None):
+        self.results = results
+        self.error = error
+
+    def odds(self, competition_id, event, count, **options):
+        if self.error is not None:
+            raise self.error
+        return self.results
+
+
+def odds_frame(win):
+    results = pd.DataFrame(
+        {"name": ["A"], "win": [win], "podium": [1.0], "win_ci": [0.0]}
+    )
+    results.attrs["simulations"] = 100
+    return results
+
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def start(service):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), OddsRequestHandler)
+        server.service = service
+        server.default_simulations = 100
+        Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}"
+
+    yield start
+
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def get(url):
+    try:
+        with urlopen(url) as response:
+            return response.status, json.load(response)
+    except HTTPError as e:
+        return e.code, json.load(e)
+
+
+def test_odds(serve):
+    url = serve(StubService(odds_frame(0.5)))
+
+    status, body = get(f"{url}/odds?competitionId=Comp&event=333")
+
+    assert status == 200
+    assert body["simulations"] == 100
+    assert body["results"][0]["win"] == 0.5
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "competitionId=Comp&event=333&n=0",
+        "competitionId=Comp&event=333&n=-5",
+        "competitionId=Comp&event=999",
+        "competitionId=Comp&event=333&tolerance=0",
+        "competitionId=Comp&event=333&simulator=unknown",
+        "competitionId=Comp",
+    ],
+)
+def test_bad_request(serve, query):
+    url = serve(StubService(error=AssertionError("the service was called")))
+
+    status, body = get(f"{url}/odds?{query}")
+
+    assert status == 400
+    assert body["error"].startswith("Bad request")
+
+
+@pytest.mark.parametrize(
+    "service",
+    [
+        StubService(error=ZeroDivisionError("division by zero")),
+        StubService(odds_frame(float("nan"))),
+    ],
+)
+def test_simulation_error(serve, service):
+    url = serve(service)
+
+    status, body = get(f"{url}/odds?competitionId=Comp&event=333")
+
+    assert status == 500
+    assert body["error"].startswith("Simulation failed")
@@ -0,0 +1,27 @@
+import pytest
+
+from load_sqlite import load
+from sqliteconnection import SQLiteConnection
+
+
+@pytest.fixture
+def connection(tmp_path, export_zip):
+    db_path = str(tmp_path / "wca_results.sqlite3")
+    load(db_path, export_zip)
+    return SQLiteConnection(db_path)
+
+
+def test_empty_results_keep_schema(connection):
+    found = connection.query("333", ["2010PERA01"], length=100000)["2010PERA01"]
+    empty = connection.query("333", ["2010NONE01"], length=100000)["2010NONE01"]
+
+    assert len(found) == 1 and empty.empty
+    assert dict(empty.dtypes) == dict(found.dtypes)
+    assert str(found["value1"].dtype) == "int32"
+
+    frame = connection.query_frame("333", ["2010PERA01", "2010PERB01"], length=100000)
+    empty_frame = connection.query_frame("333", ["2010NONE01"], length=100000)
+
+    assert len(frame) == 2 and empty_frame.empty
+    assert dict(empty_frame.dtypes) == dict(frame.dtypes)
+    assert list(frame.columns)[-1] == "personId"
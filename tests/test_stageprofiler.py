@@ -0,0 +1,24 @@
+import pytest
+
+from competitor import Competitor
+from dist_sample import DistributionSamplingSimulator
+from stageprofiler import StageProfiler
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_draw_recorded_once_per_block(stream):
+    profiler = StageProfiler(trace_memory=False)
+    simulator = DistributionSamplingSimulator(None, profiler=profiler)
+    simulator.event = "333"
+    simulator.competitors = [
+        Competitor(id=str(i), name=str(i), dnf_rate=0.05, mean=1000 + i, stdev=100)
+        for i in range(4)
+    ]
+
+    simulator.run_simulation(1000, engine="vectorized", stream=stream, seed=1)
+
+    stages = profiler.summary()["stages"]
+    assert set(stages) == {"draw", "aggregate"}
+    assert stages["draw"]["calls"] == stages["aggregate"]["calls"]
+    if not stream:
+        assert stages["draw"]["calls"] == 1
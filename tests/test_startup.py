@@ -0,0 +1,31 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "bench")
+)
+
+from bench_startup import (  # noqa: E402
+    BUDGET,
+    ENTRY_POINTS,
+    added_time,
+    heavy_imports,
+    import_times,
+)
+
+
+@pytest.fixture(scope="module")
+def baseline():
+    return set(import_times(["-c", "pass"]))
+
+
+@pytest.mark.parametrize("entry_point", ENTRY_POINTS)
+def test_help_stays_light(entry_point, baseline):
+    measured = added_time([entry_point, "--help"], baseline, repeat=3)
+    assert measured is not None, f"{entry_point} --help failed"
+
+    milliseconds, modules = measured
+    assert heavy_imports(modules, baseline) == []
+    assert milliseconds <= BUDGET